@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Benchmark bulk layer and source ingestion against the per-call path.
+
+A synthetic style with one vector source per group of layers is loaded into
+a fresh :class:`~maplibreum.core.Map` twice: once with a loop over
+``add_source``/``add_layer`` and once with ``add_sources``/``add_layers``
+(the latter fed the whole style fragment in a single call). A garbage
+collection runs before every timed load so both paths start from the same
+heap state.
+"""
+
+import argparse
+import copy
+import gc
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import maplibreum
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from maplibreum.core import Map
+
+
+def generate_style(layer_count, layers_per_source=10):
+    """Generate a MapLibre style fragment.
+
+    Parameters
+    ----------
+    layer_count : int
+        Number of layers to generate.
+    layers_per_source : int, optional
+        Number of layers sharing each vector source.
+
+    Returns
+    -------
+    dict
+        A style dictionary with ``sources`` and ``layers``.
+    """
+    source_count = max(1, layer_count // layers_per_source)
+    sources = {
+        f"tiles_{i}": {"type": "vector", "url": f"https://example.com/{i}.json"}
+        for i in range(source_count)
+    }
+    layers = [
+        {
+            "id": f"layer_{i}",
+            "type": "line",
+            "source": f"tiles_{i % source_count}",
+            "source-layer": "roads",
+            "paint": {"line-color": "#333", "line-width": 1 + i % 3},
+        }
+        for i in range(layer_count)
+    ]
+    return {"version": 8, "sources": sources, "layers": layers}
+
+
+def per_call(style):
+    """Load ``style`` with one ``add_source``/``add_layer`` call per entry."""
+    m = Map()
+    for name, definition in style["sources"].items():
+        m.add_source(name, definition)
+    for layer in style["layers"]:
+        m.add_layer(layer)
+    return m
+
+
+def bulk(style):
+    """Load ``style`` with a single ``add_layers`` call."""
+    m = Map()
+    m.add_layers(style)
+    return m
+
+
+def benchmark(layer_counts, iterations=5):
+    """Time both ingestion paths for each layer count.
+
+    Returns
+    -------
+    dict
+        Mapping ``{layer_count: {"per-call": s, "bulk": s}}`` of best times.
+    """
+    results = {}
+    for count in layer_counts:
+        print(f"\nBenchmarking {count:,} layers...")
+        results[count] = {}
+        for label, loader in (("per-call", per_call), ("bulk", bulk)):
+            timings = []
+            for _ in range(iterations):
+                style = copy.deepcopy(generate_style(count))
+                gc.collect()
+                start = time.perf_counter()
+                loader(style)
+                timings.append(time.perf_counter() - start)
+            results[count][label] = min(timings)
+            print(f"  {label:>8}: {results[count][label] * 1e3:.1f} ms")
+    return results
+
+
+def print_summary(results):
+    """Print a summary table of the bulk speedup per layer count."""
+    print("\n" + "=" * 52)
+    print("BENCHMARK SUMMARY")
+    print("=" * 52)
+    print(f"{'Layers':>8} | {'Per-call':>10} | {'Bulk':>10} | {'Speedup':>7}")
+    print("-" * 52)
+    for count, timings in results.items():
+        speedup = timings["per-call"] / timings["bulk"]
+        print(
+            f"{count:>8,} | {timings['per-call'] * 1e3:>8.1f}ms | "
+            f"{timings['bulk'] * 1e3:>8.1f}ms | {speedup:>6.2f}x"
+        )
+    print("=" * 52)
+
+
+def main(argv=None):
+    """Run the bulk ingestion benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--layers", type=int, nargs="+", default=[300, 3_000, 30_000])
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print("MapLibreum Bulk Ingestion Benchmark")
+    print("=" * 52)
+    print_summary(benchmark(args.layers, iterations=args.iterations))
+
+
+if __name__ == "__main__":
+    main()
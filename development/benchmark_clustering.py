@@ -5,15 +5,19 @@ This script benchmarks the clustering performance of MapLibreum with various
 dataset sizes to provide guidance on expected performance characteristics.
 """
 
+import os
 import random
 import time
+import tracemalloc
 import sys
 from pathlib import Path
 
+import numpy as np
+
 # Add parent directory to path to import maplibreum
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from maplibreum.cluster import cluster_features
+from maplibreum.cluster import Supercluster, cluster_features
 
 
 def generate_random_features(count):
@@ -175,6 +179,99 @@ def print_guidance(results):
     print("=" * 70 + "\n")
 
 
+def benchmark_columnar(point_counts, radius=40, max_zoom=16, seed=0):
+    """Benchmark building the index from coordinate arrays.
+
+    No per-point dictionaries are created: the coordinates go straight into
+    :meth:`~maplibreum.cluster.Supercluster.load_arrays`. The peak memory
+    of the build, excluding the input arrays, is traced with
+    :mod:`tracemalloc` (which NumPy reports its buffers to) in a second,
+    untimed build, since tracing slows allocation down.
+
+    Parameters
+    ----------
+    point_counts : list of int
+        List of point counts to benchmark.
+    radius : int, optional
+        Cluster radius in pixels (default: 40).
+    max_zoom : int, optional
+        Maximum zoom level for clustering (default: 16).
+    seed : int, optional
+        Random seed.
+
+    Returns
+    -------
+    dict
+        Mapping ``{count: (build_seconds, query_milliseconds, peak_mib)}``.
+    """
+    rng = np.random.default_rng(seed)
+    results = {}
+    print("\nColumnar input (NumPy arrays)")
+    for count in point_counts:
+        lng = rng.uniform(-180, 180, count)
+        lat = rng.uniform(-85, 85, count)
+        start = time.perf_counter()
+        index = Supercluster(radius=radius, max_zoom=max_zoom).load_arrays(lng, lat)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for zoom in range(max_zoom + 2):
+            index.get_clusters([-10, 40, 10, 55], zoom)
+        query = (time.perf_counter() - start) / (max_zoom + 2) * 1000
+        del index
+
+        tracemalloc.start()
+        Supercluster(radius=radius, max_zoom=max_zoom).load_arrays(lng, lat)
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+        results[count] = (build, query, peak)
+        print(
+            f"  {count:>10,} points: build {build:.2f}s, viewport query {query:.3f}ms, "
+            f"peak {peak:,.0f} MiB"
+        )
+    return results
+
+
+def benchmark_workers(count, worker_counts=(1, 2, 4, 8), radius=40, max_zoom=16, seed=0):
+    """Benchmark building the index with a process pool.
+
+    The index is identical for every worker count, so only the wall time
+    changes; speedups need as many free cores as workers. The greedy
+    grouping itself stays in the parent process, which bounds the scaling.
+
+    Parameters
+    ----------
+    count : int
+        Number of points.
+    worker_counts : sequence of int, optional
+        Worker counts to time (default: 1, 2, 4 and 8).
+    radius : int, optional
+        Cluster radius in pixels (default: 40).
+    max_zoom : int, optional
+        Maximum zoom level for clustering (default: 16).
+    seed : int, optional
+        Random seed.
+
+    Returns
+    -------
+    dict
+        Mapping ``{workers: build_seconds}``.
+    """
+    rng = np.random.default_rng(seed)
+    lng = rng.uniform(-180, 180, count)
+    lat = rng.uniform(-85, 85, count)
+    results = {}
+    print(f"\nParallel build, {count:,} points ({os.cpu_count()} CPUs available)")
+    for workers in worker_counts:
+        start = time.perf_counter()
+        Supercluster(radius=radius, max_zoom=max_zoom, workers=workers).load_arrays(lng, lat)
+        results[workers] = time.perf_counter() - start
+    baseline = results[worker_counts[0]]
+    for workers, elapsed in results.items():
+        print(f"  {workers:>2} worker(s): {elapsed:.2f}s ({baseline / elapsed:.2f}x)")
+    return results
+
+
 def main():
     """Run the benchmarking suite."""
     print("MapLibreum Clustering Performance Benchmark")
@@ -192,6 +289,8 @@ def main():
     # Print results
     print_summary(results)
     print_guidance(results)
+    benchmark_columnar([100_000, 1_000_000, 10_000_000])
+    benchmark_workers(1_000_000)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Benchmark the JSON serialization backends on large FeatureCollections.
+
+Each available backend (``stdlib``, ``compact`` and, when installed,
+``orjson``) encodes the same synthetic point and polygon FeatureCollections,
+once as plain Python lists and once with NumPy-backed coordinates. The
+output size is reported alongside the timings because the compact backends
+also shrink the generated HTML.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import maplibreum
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from maplibreum.serialization import available_json_backends, get_json_backend
+
+
+def generate_points(count, use_numpy=False):
+    """Generate a FeatureCollection of random points.
+
+    Parameters
+    ----------
+    count : int
+        Number of features to generate.
+    use_numpy : bool, optional
+        Store each coordinate pair as a NumPy array instead of a list.
+
+    Returns
+    -------
+    dict
+        A GeoJSON FeatureCollection.
+    """
+    if use_numpy:
+        import numpy as np
+
+        coords = np.random.uniform([-180, -90], [180, 90], size=(count, 2))
+    else:
+        coords = [
+            [random.uniform(-180, 180), random.uniform(-90, 90)] for _ in range(count)
+        ]
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": coords[i]},
+                "properties": {"id": i, "name": f"feature {i}", "value": i * 0.5},
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def generate_polygons(count, vertices=64, use_numpy=False):
+    """Generate a FeatureCollection of random polygons.
+
+    Parameters
+    ----------
+    count : int
+        Number of polygons to generate.
+    vertices : int, optional
+        Number of vertices per ring.
+    use_numpy : bool, optional
+        Store each ring as a NumPy array instead of nested lists.
+
+    Returns
+    -------
+    dict
+        A GeoJSON FeatureCollection.
+    """
+    import math
+
+    features = []
+    for i in range(count):
+        lon = random.uniform(-170, 170)
+        lat = random.uniform(-80, 80)
+        ring = [
+            [
+                lon + math.cos(2 * math.pi * k / vertices) * 0.1,
+                lat + math.sin(2 * math.pi * k / vertices) * 0.1,
+            ]
+            for k in range(vertices)
+        ]
+        ring.append(ring[0])
+        if use_numpy:
+            import numpy as np
+
+            ring = np.asarray(ring)
+        features.append(
+            {
+                "type": "Feature",
+                "geometry": {"type": "Polygon", "coordinates": [ring]},
+                "properties": {"id": i},
+            }
+        )
+    return {"type": "FeatureCollection", "features": features}
+
+
+def benchmark_backends(datasets, iterations=3):
+    """Time every available backend on each dataset.
+
+    Parameters
+    ----------
+    datasets : dict
+        Mapping of dataset labels to GeoJSON objects.
+    iterations : int, optional
+        Number of timed runs per backend and dataset.
+
+    Returns
+    -------
+    dict
+        Nested mapping ``{dataset: {backend: {"best": s, "bytes": n}}}``.
+    """
+    results = {}
+    for label, data in datasets.items():
+        print(f"\nBenchmarking {label}...")
+        results[label] = {}
+        for name in available_json_backends():
+            backend = get_json_backend(name)
+            timings = []
+            size = None
+            try:
+                for _ in range(iterations):
+                    start = time.perf_counter()
+                    text = backend.dumps(data)
+                    timings.append(time.perf_counter() - start)
+                    size = len(text.encode("utf-8"))
+            except TypeError as exc:
+                print(f"  {name:>8}: unsupported ({exc})")
+                continue
+            best = min(timings)
+            results[label][name] = {"best": best, "bytes": size}
+            print(f"  {name:>8}: {best:.3f}s, {size / 1e6:.1f} MB")
+    return results
+
+
+def print_summary(results):
+    """Print a summary table relative to the ``stdlib`` backend.
+
+    Parameters
+    ----------
+    results : dict
+        Results returned by :func:`benchmark_backends`.
+    """
+    print("\n" + "=" * 70)
+    print("BENCHMARK SUMMARY")
+    print("=" * 70)
+    print(f"{'Dataset':>28} | {'Backend':>8} | {'Time':>8} | {'Speedup':>7} | {'Size':>7}")
+    print("-" * 70)
+    for label, backends in results.items():
+        baseline = backends.get("stdlib")
+        for name, data in backends.items():
+            speedup = baseline["best"] / data["best"] if baseline else float("nan")
+            relative = data["bytes"] / baseline["bytes"] if baseline else float("nan")
+            print(
+                f"{label:>28} | {name:>8} | {data['best']:>7.3f}s | "
+                f"{speedup:>6.2f}x | {relative:>6.0%}"
+            )
+    print("=" * 70)
+
+
+def main(argv=None):
+    """Run the serialization benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=200_000)
+    parser.add_argument("--polygons", type=int, default=5_000)
+    parser.add_argument("--iterations", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print("MapLibreum JSON Serialization Benchmark")
+    print("=" * 70)
+    print("Backends available: " + ", ".join(available_json_backends()))
+
+    datasets = {
+        f"{args.points:,} points": generate_points(args.points),
+        f"{args.polygons:,} polygons": generate_polygons(args.polygons),
+    }
+    try:
+        datasets[f"{args.points:,} points (numpy)"] = generate_points(
+            args.points, use_numpy=True
+        )
+        datasets[f"{args.polygons:,} polygons (numpy)"] = generate_polygons(
+            args.polygons, use_numpy=True
+        )
+    except ImportError:
+        print("NumPy is not installed; skipping NumPy-backed datasets.")
+
+    results = benchmark_backends(datasets, iterations=args.iterations)
+    print_summary(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Benchmark writing a static vector tile pyramid with a process pool.
+
+Synthetic street-like line strings are written to a temporary directory with
+:func:`~maplibreum.tiling.write_tile_pyramid`, once per worker count. The
+pyramid is byte-identical for every worker count; only the wall time
+changes, so speedups need as many free cores as workers.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path to import maplibreum
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from maplibreum.tiling import write_tile_pyramid
+
+
+def generate_lines(count, vertices=8, seed=0):
+    """Generate a FeatureCollection of short random-walk line strings.
+
+    Parameters
+    ----------
+    count : int
+        Number of features.
+    vertices : int, optional
+        Vertices per line.
+    seed : int, optional
+        Random seed.
+
+    Returns
+    -------
+    dict
+        A GeoJSON FeatureCollection.
+    """
+    rng = np.random.default_rng(seed)
+    starts = rng.uniform([-10, 40], [10, 55], size=(count, 2))
+    steps = rng.normal(0, 0.01, size=(count, vertices, 2))
+    lines = starts[:, None, :] + np.cumsum(steps, axis=1)
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "LineString", "coordinates": line.tolist()},
+                "properties": {"id": i, "name": f"street {i % 50}"},
+            }
+            for i, line in enumerate(lines)
+        ],
+    }
+
+
+def benchmark(count, max_zoom, worker_counts):
+    """Time ``write_tile_pyramid`` for each worker count.
+
+    Returns
+    -------
+    dict
+        Mapping ``{workers: (seconds, tile_count, total_bytes)}``.
+    """
+    data = generate_lines(count)
+    results = {}
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            metadata = write_tile_pyramid(data, directory, 0, max_zoom, workers=workers)
+            elapsed = time.perf_counter() - start
+        results[workers] = (elapsed, metadata["tile_count"], metadata["total_bytes"])
+        print(
+            f"  {workers:>2} worker(s): {elapsed:.2f}s, "
+            f"{metadata['tile_count']:,} tiles, {metadata['total_bytes'] / 1e6:.1f} MB"
+        )
+    return results
+
+
+def main(argv=None):
+    """Run the tile pyramid benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--features", type=int, default=50_000)
+    parser.add_argument("--max-zoom", type=int, default=10)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1})
+    )
+    args = parser.parse_args(argv)
+
+    print("MapLibreum Tile Pyramid Benchmark")
+    print("=" * 52)
+    print(f"{args.features:,} lines, zoom 0-{args.max_zoom}")
+    results = benchmark(args.features, args.max_zoom, args.workers)
+    baseline = results[args.workers[0]][0]
+    for workers, (elapsed, _, _) in results.items():
+        print(f"  {workers:>2} worker(s): {baseline / elapsed:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Performance benchmark suite for the maplibreum pipeline.
+
+The suite times map rendering with many sources and layers, GeoJSON
+serialization, ``Choropleth.add_to``, ``GeoJson.add_to`` styling,
+clustering, ``interpolate_along_line`` and marker emission. Results are
+stored as a versioned JSON baseline, and later runs are compared against it
+with a relative tolerance::
+
+    python development/benchmarks run                 # record a baseline
+    python development/benchmarks compare             # re-run and compare
+    python development/benchmarks compare old.json new.json --tolerance 0.1
+
+Baselines default to ``baselines/maplibreum-<version>.json`` in this
+directory. Timings only compare meaningfully on the machine that recorded
+them; the baseline stores the environment next to the results.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the repository root to the path to import maplibreum
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from . import cases  # noqa: E402  (registers the cases)
+from .suite import (  # noqa: E402
+    CASES,
+    DEFAULT_TOLERANCE,
+    SCHEMA_VERSION,
+    compare,
+    default_baseline_path,
+    load_baseline,
+    run,
+    save_baseline,
+)
+
+__all__ = [
+    "CASES",
+    "DEFAULT_TOLERANCE",
+    "SCHEMA_VERSION",
+    "cases",
+    "compare",
+    "default_baseline_path",
+    "load_baseline",
+    "run",
+    "save_baseline",
+]
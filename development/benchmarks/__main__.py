@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Command line interface of the benchmark suite.
+
+Run as ``python development/benchmarks <command>`` from the repository root
+or as ``python -m benchmarks <command>`` from ``development/``.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+if __package__ in (None, ""):
+    # Executed as a directory: make the package importable by name.
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    __package__ = "benchmarks"
+
+from benchmarks import CASES, DEFAULT_TOLERANCE
+from benchmarks.suite import (
+    compare,
+    default_baseline_path,
+    load_baseline,
+    run,
+    save_baseline,
+    select,
+)
+
+
+def _progress(name, result):
+    timings = f"{result['min'] * 1000:>10.1f} ms  (median {result['median'] * 1000:.1f})"
+    print(f"  {name:<40} {timings}")
+
+
+def _add_run_options(parser, defaults=True):
+    parser.add_argument(
+        "-k",
+        "--select",
+        action="append",
+        metavar="PATTERN",
+        help="glob pattern of case names to run; may be repeated",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5 if defaults else None,
+        help="timed runs per case (default: 5, or the baseline's for compare)",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0 if defaults else None,
+        help="multiplier for every problem size (default: 1, or the baseline's for compare)",
+    )
+
+
+def _print_comparison(rows, tolerance):
+    print(f"\n{'case':<40} {'baseline':>12} {'current':>12} {'ratio':>8}  status")
+    print("-" * 86)
+    for row in rows:
+        before = "-" if row["baseline"] is None else f"{row['baseline'] * 1000:.1f} ms"
+        after = "-" if row["current"] is None else f"{row['current'] * 1000:.1f} ms"
+        ratio = "-" if row["ratio"] is None else f"{row['ratio']:.2f}x"
+        print(f"{row['name']:<40} {before:>12} {after:>12} {ratio:>8}  {row['status']}")
+    regressions = [row["name"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        names = ", ".join(regressions)
+        print(f"\n{len(regressions)} regression(s) above {tolerance:.0%}: {names}")
+    else:
+        print(f"\nNo regressions above {tolerance:.0%}.")
+    return regressions
+
+
+def main(argv=None):
+    """Run the benchmark command line interface and return the exit status."""
+
+    parser = argparse.ArgumentParser(prog="benchmarks", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="list the benchmark cases")
+
+    run_parser = commands.add_parser("run", help="run the suite and write a baseline")
+    run_parser.add_argument(
+        "-o", "--output", help="baseline file (default: baselines/maplibreum-<version>.json)"
+    )
+    _add_run_options(run_parser)
+
+    compare_parser = commands.add_parser(
+        "compare", help="compare a new run (or a second file) against a baseline"
+    )
+    compare_parser.add_argument("baseline", nargs="?", help="baseline file (default: as for run)")
+    compare_parser.add_argument(
+        "current", nargs="?", help="results to compare; runs the suite when omitted"
+    )
+    compare_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"relative slowdown flagged as a regression (default: {DEFAULT_TOLERANCE})",
+    )
+    compare_parser.add_argument(
+        "--statistic",
+        choices=["min", "median", "mean"],
+        default="min",
+        help="timing statistic to compare (default: min)",
+    )
+    compare_parser.add_argument("-o", "--output", help="also save the new run to this file")
+    _add_run_options(compare_parser, defaults=False)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for item in CASES.values():
+            sizes = ", ".join(f"{key}={value:,}" for key, value in item.params.items())
+            print(f"{item.name:<40} {sizes:<28} {item.description}")
+        return 0
+
+    if args.command == "run":
+        if not select(args.select):
+            parser.error(f"no case matches {args.select}")
+        print(f"Running {len(select(args.select))} benchmark case(s)")
+        document = run(args.select, args.repeat, args.scale, progress=_progress)
+        path = save_baseline(document, args.output or default_baseline_path())
+        print(f"Baseline written to {path}")
+        return 0
+
+    baseline = load_baseline(args.baseline or default_baseline_path())
+    if args.current:
+        current = load_baseline(args.current)
+    else:
+        settings = baseline.get("settings", {})
+        repeat = args.repeat or settings.get("repeat", 5)
+        scale = args.scale or settings.get("scale", 1.0)
+        patterns = args.select or list(baseline["results"])
+        print(f"Running {len(select(patterns))} benchmark case(s)")
+        current = run(patterns, repeat, scale, progress=_progress)
+        if args.output:
+            save_baseline(current, args.output)
+    if args.select:
+        # Cases left out on purpose are not reported as missing.
+        selected = {item.name for item in select(args.select)}
+        results = baseline["results"]
+        results = {name: results[name] for name in results if name in selected}
+        baseline = {**baseline, "results": results}
+    rows = compare(baseline, current, args.tolerance, args.statistic)
+    return 1 if _print_comparison(rows, args.tolerance) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""Benchmark cases covering the map building and rendering pipeline.
+
+Each case generates its input in ``setup`` and returns the operation to
+time. Sizes are the defaults at ``--scale 1``; the whole suite then runs in
+about a minute.
+"""
+
+import copy
+import math
+
+import numpy as np
+
+from maplibreum.animation import interpolate_along_line
+from maplibreum.choropleth import Choropleth
+from maplibreum.cluster import MarkerCluster, Supercluster, cluster_features
+from maplibreum.core import GeoJson, Map
+from maplibreum.serialization import available_json_backends, get_json_backend
+
+from .suite import case
+
+
+def points(count, seed=0):
+    """Return a FeatureCollection of random points with a few properties."""
+
+    rng = np.random.default_rng(seed)
+    coords = rng.uniform([-180, -85], [180, 85], size=(count, 2)).tolist()
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "id": i,
+                "geometry": {"type": "Point", "coordinates": coord},
+                "properties": {"id": i, "name": f"feature {i}", "value": i * 0.5},
+            }
+            for i, coord in enumerate(coords)
+        ],
+    }
+
+
+def polygons(count, vertices=32, seed=0):
+    """Return a FeatureCollection of random circular polygons with string ids."""
+
+    rng = np.random.default_rng(seed)
+    centres = rng.uniform([-170, -70], [170, 70], size=(count, 2))
+    angles = np.linspace(0, 2 * math.pi, vertices, endpoint=False)
+    ring = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+    features = []
+    for i, (lon, lat) in enumerate(centres.tolist()):
+        coords = ([lon, lat] + ring * 0.5).tolist()
+        coords.append(coords[0])
+        features.append(
+            {
+                "type": "Feature",
+                "id": f"region-{i}",
+                "geometry": {"type": "Polygon", "coordinates": [coords]},
+                "properties": {"name": f"region {i}"},
+            }
+        )
+    return {"type": "FeatureCollection", "features": features}
+
+
+def mixed(count, seed=0):
+    """Return points, lines and polygons in equal parts."""
+
+    third = max(1, count // 3)
+    features = points(third, seed)["features"] + polygons(third, 16, seed)["features"]
+    rng = np.random.default_rng(seed)
+    for i in range(third):
+        line = np.cumsum(rng.normal(0, 0.1, (8, 2)), axis=0) + rng.uniform(-60, 60, 2)
+        features.append(
+            {
+                "type": "Feature",
+                "geometry": {"type": "LineString", "coordinates": line.tolist()},
+                "properties": {"id": i},
+            }
+        )
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _map_with_sources(sources, features):
+    m = Map()
+    for i in range(sources):
+        name = f"source-{i}"
+        m.add_source(name, points(features, seed=i))
+        m.add_layer(
+            {"id": f"circles-{i}", "type": "circle", "source": name, "paint": {"circle-radius": 3}}
+        )
+        m.add_layer(
+            {
+                "id": f"labels-{i}",
+                "type": "symbol",
+                "source": name,
+                "layout": {"text-field": ["get", "name"]},
+            }
+        )
+    return m
+
+
+@case("render.sources_layers", sources=200, features=50)
+def render_sources_layers(sources, features):
+    """First Map.render() of a map with many small sources, two layers each."""
+
+    return _map_with_sources(sources, features).render
+
+
+@case("render.cached", sources=200, features=50)
+def render_cached(sources, features):
+    """Map.render() again after one layer changed, reusing cached fragments."""
+
+    m = _map_with_sources(sources, features)
+    m.render()
+    m.add_layer({"id": "extra", "type": "circle", "source": "source-0"})
+    return m.render
+
+
+def _serialization_case(backend):
+    def serialize(features):
+        data = points(features)
+        encode = get_json_backend(backend).dumps
+        return lambda: encode(data)
+
+    serialize.__doc__ = f"Encode a point FeatureCollection with the {backend!r} backend."
+    return serialize
+
+
+# Backends that are not installed are absent from the results; ``compare``
+# reports them as new or missing instead of failing.
+for _backend in available_json_backends():
+    case(f"serialization.geojson_{_backend}", features=50_000)(_serialization_case(_backend))
+
+
+@case("serialization.geojson_numpy", features=50_000)
+def serialization_numpy(features):
+    """Default backend on a FeatureCollection with NumPy coordinates."""
+
+    data = points(features)
+    coords = np.array([feature["geometry"]["coordinates"] for feature in data["features"]])
+    for feature, coord in zip(data["features"], coords):
+        feature["geometry"]["coordinates"] = coord
+    encode = get_json_backend().dumps
+    return lambda: encode(data)
+
+
+@case("choropleth.add_to", features=5_000)
+def choropleth_add_to(features):
+    """Choropleth.add_to(): join values, bin them and colour every polygon."""
+
+    data = polygons(features)
+    values = {feature["id"]: i % 97 for i, feature in enumerate(data["features"])}
+    choropleth = Choropleth(data, values, color_scale="quantile", legend_title="Value")
+    return lambda: choropleth.add_to(Map())
+
+
+@case("geojson.add_to", features=30_000)
+def geojson_add_to(features):
+    """GeoJson.add_to(): apply a style function to every feature."""
+
+    data = mixed(features)
+
+    def style(feature):
+        value = feature["properties"].get("id", 0)
+        return {"color": "#ff0000" if value % 2 else "#0000ff", "weight": 1 + value % 3}
+
+    overlay = GeoJson(copy.deepcopy(data), style_function=style)
+    return lambda: overlay.add_to(Map())
+
+
+@case("cluster.features", features=50_000)
+def cluster_geojson(features):
+    """cluster_features() over GeoJSON point features."""
+
+    data = points(features)["features"]
+    return lambda: cluster_features(data, radius=40, max_zoom=16)
+
+
+@case("cluster.arrays", points=500_000)
+def cluster_arrays(points):
+    """Supercluster.load_arrays() over coordinate columns."""
+
+    rng = np.random.default_rng(0)
+    lng, lat = rng.uniform(-180, 180, points), rng.uniform(-85, 85, points)
+    return lambda: Supercluster(radius=40, max_zoom=16).load_arrays(lng, lat)
+
+
+@case("cluster.queries", points=500_000, queries=200)
+def cluster_queries(points, queries):
+    """Supercluster.get_clusters() over random viewports at every zoom."""
+
+    rng = np.random.default_rng(0)
+    index = Supercluster().load_arrays(
+        rng.uniform(-180, 180, points), rng.uniform(-85, 85, points)
+    )
+    boxes = []
+    for i in range(queries):
+        zoom = i % 18
+        width, height = 360 / 2**zoom, 160 / 2**zoom
+        west, south = rng.uniform(-180, 180 - width), rng.uniform(-80, 80 - height)
+        boxes.append(([west, south, west + width, south + height], zoom))
+
+    def query():
+        for bbox, zoom in boxes:
+            index.get_clusters(bbox, zoom)
+
+    return query
+
+
+@case("animation.interpolate_along_line", vertices=2_000, steps=50_000)
+def animation_interpolate(vertices, steps):
+    """interpolate_along_line() over a long random-walk line."""
+
+    rng = np.random.default_rng(0)
+    line = [tuple(point) for point in np.cumsum(rng.normal(0, 0.05, (vertices, 2)), axis=0)]
+    return lambda: interpolate_along_line(line, steps=steps)
+
+
+@case("markers.emit", markers=2_000)
+def markers_emit(markers):
+    """Map.add_marker() with popups, then Map.render() emitting every marker."""
+
+    rng = np.random.default_rng(0)
+    coords = rng.uniform([-180, -85], [180, 85], size=(markers, 2)).tolist()
+
+    def emit():
+        m = Map()
+        for i, coord in enumerate(coords):
+            m.add_marker(coordinates=coord, popup=f"<b>marker {i}</b>")
+        return m.render()
+
+    return emit
+
+
+@case("markers.cluster_points", points=200_000)
+def markers_cluster_points(points):
+    """MarkerCluster.add_points(), then Map.render() streaming the features."""
+
+    rng = np.random.default_rng(0)
+    lng, lat = rng.uniform(-180, 180, points), rng.uniform(-85, 85, points)
+
+    def emit():
+        m = Map()
+        MarkerCluster().add_to(m).add_points(lng, lat, colors="#007cbf")
+        return m.render()
+
+    return emit
@@ -0,0 +1,230 @@
+"""Registry, timing and baseline comparison for the benchmark suite."""
+
+import fnmatch
+import gc
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from maplibreum import __version__
+
+#: Version of the baseline file layout; bump it when the layout changes.
+SCHEMA_VERSION = 1
+
+#: Default relative slowdown above which a case counts as a regression.
+DEFAULT_TOLERANCE = 0.2
+
+#: Registered cases, in registration order.
+CASES = {}
+
+
+class Case:
+    """A named benchmark.
+
+    Parameters
+    ----------
+    name : str
+        Dotted name, ``group.case``.
+    setup : callable
+        Called as ``setup(scale)`` before every timed run; returns the
+        zero-argument callable that is timed. Work done in ``setup`` (data
+        generation, a fresh map) is not timed.
+    params : dict
+        Problem sizes at ``scale=1``, recorded in the baseline.
+    """
+
+    def __init__(self, name, setup, params):
+        self.name = name
+        self.setup = setup
+        self.params = params
+        self.description = (setup.__doc__ or "").strip().split("\n")[0]
+
+    def sizes(self, scale):
+        """Return :attr:`params` with every integer size multiplied by ``scale``."""
+
+        return {
+            key: max(1, int(value * scale)) if isinstance(value, int) else value
+            for key, value in self.params.items()
+        }
+
+
+def case(name, **params):
+    """Register the decorated ``setup(**sizes)`` function as a benchmark case.
+
+    Integer ``params`` are problem sizes and are scaled by ``--scale``.
+    """
+
+    def register(setup):
+        def scaled(scale, setup=setup):
+            return setup(**CASES[name].sizes(scale))
+
+        scaled.__doc__ = setup.__doc__
+        CASES[name] = Case(name, scaled, params)
+        return setup
+
+    return register
+
+
+def select(patterns=None):
+    """Return the cases whose names match any of the glob ``patterns``."""
+
+    if not patterns:
+        return list(CASES.values())
+    return [
+        item
+        for name, item in CASES.items()
+        if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+    ]
+
+
+def time_case(item, repeat=5, scale=1.0):
+    """Time one case ``repeat`` times, each with a fresh ``setup``.
+
+    Returns
+    -------
+    dict
+        ``min``, ``median`` and ``mean`` seconds plus the run settings.
+    """
+
+    timings = []
+    for _ in range(repeat):
+        target = item.setup(scale)
+        gc.collect()
+        start = time.perf_counter()
+        target()
+        timings.append(time.perf_counter() - start)
+        del target
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "repeat": repeat,
+        "params": item.sizes(scale),
+    }
+
+
+def environment():
+    """Describe the interpreter and machine the results were measured on."""
+
+    import numpy
+
+    return {
+        "maplibreum": __version__,
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run(patterns=None, repeat=5, scale=1.0, progress=None):
+    """Run the selected cases and return a baseline document.
+
+    Parameters
+    ----------
+    patterns : list of str, optional
+        Glob patterns selecting cases by name; all cases by default.
+    repeat : int, optional
+        Timed runs per case.
+    scale : float, optional
+        Multiplier for every problem size, e.g. ``0.1`` for a quick run.
+    progress : callable, optional
+        Called with ``(name, result)`` after each case.
+
+    Returns
+    -------
+    dict
+        The versioned baseline: ``schema``, ``created``, ``environment``,
+        ``settings`` and ``results`` keyed by case name.
+    """
+
+    results = {}
+    for item in select(patterns):
+        results[item.name] = time_case(item, repeat, scale)
+        if progress is not None:
+            progress(item.name, results[item.name])
+    return {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "settings": {"repeat": repeat, "scale": scale},
+        "results": results,
+    }
+
+
+def default_baseline_path():
+    """Return ``baselines/maplibreum-<version>.json`` next to this package."""
+
+    return Path(__file__).resolve().parent / "baselines" / f"maplibreum-{__version__}.json"
+
+
+def save_baseline(document, path):
+    """Write a baseline document as indented JSON."""
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return path
+
+
+def load_baseline(path):
+    """Read a baseline document, rejecting unknown schema versions."""
+
+    document = json.loads(Path(path).read_text(encoding="utf-8"))
+    schema = document.get("schema")
+    if schema != SCHEMA_VERSION:
+        raise ValueError(
+            f"{path}: baseline schema {schema!r} is not supported "
+            f"(expected {SCHEMA_VERSION}); re-record it with the 'run' command"
+        )
+    return document
+
+
+def compare(baseline, current, tolerance=DEFAULT_TOLERANCE, statistic="min"):
+    """Compare two baseline documents case by case.
+
+    A case regresses when its ``statistic`` grew by more than
+    ``tolerance`` (``0.2`` is 20% slower) and improves when it shrank by
+    the same factor. Cases measured with different problem sizes are
+    reported as ``"resized"`` rather than compared.
+
+    Returns
+    -------
+    list of dict
+        One row per case with ``name``, ``baseline``, ``current``,
+        ``ratio`` (current / baseline) and ``status``: ``"ok"``,
+        ``"regression"``, ``"improvement"``, ``"resized"``, ``"new"`` or
+        ``"missing"``.
+    """
+
+    old, new = baseline["results"], current["results"]
+    rows = []
+    for name in list(old) + [name for name in new if name not in old]:
+        before, after = old.get(name), new.get(name)
+        row = {
+            "name": name,
+            "baseline": before and before[statistic],
+            "current": after and after[statistic],
+            "ratio": None,
+        }
+        if after is None:
+            row["status"] = "missing"
+        elif before is None:
+            row["status"] = "new"
+        elif before.get("params") != after.get("params"):
+            row["status"] = "resized"
+        else:
+            row["ratio"] = after[statistic] / before[statistic]
+            if row["ratio"] > 1 + tolerance:
+                row["status"] = "regression"
+            elif row["ratio"] < 1 / (1 + tolerance):
+                row["status"] = "improvement"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    return rows
@@ -2,10 +2,13 @@ from ._version import __version__
 from .babylon import BabylonLayer
 from .three import ThreeLayer
 from .choropleth import Choropleth
-from .cluster import ClusteredGeoJson, MarkerCluster, cluster_features
+from .cluster import ClusteredGeoJson, MarkerCluster, Supercluster, cluster_features
 from .core import (GeoJson, GeoJsonPopup, GeoJsonTooltip, LayerControl,
                    MAPLIBRE_VERSION, LatLngPopup, Legend, Map, Marker, Popup,
                    StateToggle, Tooltip)
+from .simplify import SimplifiedGeoJson
+from .server import TileServer
+from .tiling import write_tile_pyramid
 from .overlays import ImageOverlay, VideoOverlay
 from .markers import BeautifyIcon, DivIcon, Icon
 from .animation import AnimationLoop, TemporalInterval
@@ -15,6 +18,7 @@ from . import controls
 from . import sources
 from . import layers
 from . import experimental
+from . import serialization
 from .custom import CustomGlobeLayer
 from .protocols import PMTilesProtocol, PMTilesSource
 
@@ -42,13 +46,18 @@ __all__ = [
     "TimeDimension",
     "MarkerCluster",
     "ClusteredGeoJson",
+    "Supercluster",
     "cluster_features",
+    "SimplifiedGeoJson",
+    "TileServer",
+    "write_tile_pyramid",
     "__version__",
     "StorytellingControl",
     "StyleSwitcherControl",
     "controls",
     "sources",
     "layers",
+    "serialization",
     "AnimationLoop",
     "TemporalInterval",
     "CustomGlobeLayer",
@@ -0,0 +1,132 @@
+"""Caching of encoded page fragments between renders.
+
+Re-rendering a map after a small change (a new layer, a paint tweak) should
+not re-encode every inline GeoJSON payload. :class:`FragmentCache` keeps the
+JSON text of each source definition together with a fingerprint of the
+definition; a render reuses the text while the fingerprint is unchanged.
+
+Fingerprints hash the small parts of a definition by content. Inline GeoJSON
+``data`` is identified by object identity and feature count instead, since
+hashing it would cost as much as encoding it; together with the per-source
+revision that :class:`maplibreum.core.Map` bumps whenever a source is added,
+replaced or invalidated, a cached render costs O(changed data). Code that
+edits inline data in place must call :meth:`maplibreum.core.Map.invalidate`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from .export import inline_geojson_data
+
+
+def payload_length(data: Any) -> Optional[int]:
+    """Return a cheap length (feature or position count) for inline GeoJSON."""
+
+    if isinstance(data, dict):
+        for key in ("features", "geometries", "coordinates"):
+            if key in data:
+                try:
+                    return len(data[key])
+                except TypeError:
+                    return None
+    return None
+
+
+def source_fingerprint(definition: Any, *extra: Hashable) -> Optional[Tuple]:
+    """Return a cache key for a source definition, or ``None`` if uncacheable.
+
+    Parameters
+    ----------
+    definition : dict
+        The source definition as stored on the map.
+    *extra : hashable
+        Additional render inputs that change the encoded text, such as the
+        JSON backend, coordinate precision or source revision.
+    """
+
+    data = inline_geojson_data(definition)
+    if data is None:
+        rest, payload = definition, None
+    else:
+        rest = {key: value for key, value in definition.items() if key != "data"}
+        payload = (id(data), payload_length(data))
+    try:
+        text = json.dumps(rest, sort_keys=True, default=repr)
+    except (TypeError, ValueError):
+        return None
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+    return (digest, payload) + extra
+
+
+def payload_digest(chunks: Iterable[str]) -> str:
+    """Hash encoded JSON ``chunks`` incrementally and return the hex digest."""
+
+    digest = hashlib.blake2b(digest_size=16)
+    for chunk in chunks:
+        digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class FragmentCache:
+    """Rendered fragments stored per slot and validated by fingerprint.
+
+    Each slot (a source name) holds at most one fragment, so the cache never
+    grows beyond the current contents of the map. Entries keep a reference
+    to the inline data they were encoded from, which keeps identity-based
+    fingerprints from being reused by another object.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[Hashable, Tuple[Tuple, str, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, slot: Hashable, key: Optional[Tuple]) -> Optional[str]:
+        """Return the fragment stored for ``slot`` if it matches ``key``."""
+
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(slot)
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, slot: Hashable, key: Optional[Tuple], fragment: str, pin: Any = None) -> None:
+        """Store ``fragment`` for ``slot``; ``pin`` is kept alive with it."""
+
+        if key is None:
+            return
+        with self._lock:
+            self._entries[slot] = (key, fragment, pin)
+
+    def discard(self, slots: Optional[Iterable[Hashable]] = None) -> None:
+        """Drop the given slots, or every entry when ``slots`` is ``None``."""
+
+        with self._lock:
+            if slots is None:
+                self._entries.clear()
+            else:
+                for slot in slots:
+                    self._entries.pop(slot, None)
+
+    def retain(self, slots: Iterable[Hashable]) -> None:
+        """Drop every slot not listed in ``slots``."""
+
+        keep = set(slots)
+        with self._lock:
+            for slot in [slot for slot in self._entries if slot not in keep]:
+                del self._entries[slot]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+__all__ = ["FragmentCache", "payload_digest", "payload_length", "source_fingerprint"]
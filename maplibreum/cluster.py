@@ -1,4 +1,15 @@
-from .utils import get_id, get_geojson_dict
+import json
+import math
+import os
+import struct
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from .serialization import STREAM_BATCH_SIZE, get_json_backend
+from .utils import get_id, get_geojson_dict, round_geojson
 
 from .expressions import get as expr_get
 
@@ -22,6 +33,7 @@ class MarkerCluster:
         self.cluster_radius = cluster_radius
         self.cluster_max_zoom = cluster_max_zoom
         self.features = []
+        self._columns = []
         self.map = None
         self.source_name = None
         self._source = None
@@ -43,15 +55,79 @@ class MarkerCluster:
             "properties": {"color": marker.color},
         }
         self.features.append(feature)
+        self._update_source()
+
+    def add_points(self, lons, lats, colors=None, properties=None):
+        """Add many points to the cluster at once from coordinate columns.
+
+        The columns are stored as NumPy arrays; GeoJSON features are only
+        built in batches while the map is rendered, so no per-point
+        :class:`~maplibreum.Marker` or dictionary is kept. Points render
+        after the markers added with :meth:`add_marker`.
+
+        Parameters
+        ----------
+        lons, lats : array-like
+            Point coordinates in degrees.
+        colors : str or array-like of str, optional
+            One color for all points or one per point, written to the
+            ``color`` property used by the unclustered layer.
+        properties : dict or list of dict, optional
+            Further per-point properties, either as columns
+            (``{"name": array}``) or one dictionary per point.
+
+        Returns
+        -------
+        self
+        """
+        lons = np.asarray(lons, dtype=np.float64).reshape(-1)
+        lats = np.asarray(lats, dtype=np.float64).reshape(-1)
+        if len(lons) != len(lats):
+            raise ValueError("lons and lats must have the same length")
+        columns = {}
+        if colors is not None:
+            columns["color"] = (
+                np.full(len(lons), colors, dtype=object)
+                if isinstance(colors, str)
+                else np.asarray(colors)
+            )
+        rows = None
+        if isinstance(properties, dict):
+            columns.update((name, np.asarray(column)) for name, column in properties.items())
+        elif properties is not None:
+            rows = list(properties)
+        for name, column in [*columns.items(), ("properties", rows)]:
+            if column is not None and len(column) != len(lons):
+                raise ValueError(f"{name} must have one entry per point")
+        self._columns.append(_PointColumns(lons, lats, columns, rows))
+        self._update_source()
+        return self
+
+    def _source_features(self):
+        """Return the features of the source: the marker list or a columnar view."""
+
+        if not self._columns:
+            return self.features
+        return PointFeatures(self.features, self._columns)
+
+    def _update_source(self):
+        """Point the map source at the current features.
+
+        The features are changed in place, so the source revision is bumped
+        (an O(1) :meth:`~maplibreum.core.Map.invalidate`) to make the next
+        render re-encode it.
+        """
+
         if self.map and self.source_name:
             if self._source is None:
-                for src in self.map.sources:
-                    if src["name"] == self.source_name:
-                        self._source = src
-                        break
+                self._source = self.map.sources.get(self.source_name)
 
             if self._source:
-                self._source["definition"]["data"]["features"] = self.features
+                data = self._source["definition"]["data"]
+                if self._columns or data["features"] is not self.features:
+                    data["features"] = self._source_features()
+                if hasattr(self.map, "invalidate"):  # FeatureGroups keep no cache
+                    self.map.invalidate(self.source_name)
 
     def add_to(self, map_instance):
         """Add the marker cluster to a map instance.
@@ -72,17 +148,13 @@ class MarkerCluster:
         self.source_name = f"{self.name}_source"
         source = {
             "type": "geojson",
-            "data": {"type": "FeatureCollection", "features": self.features},
+            "data": {"type": "FeatureCollection", "features": self._source_features()},
             "cluster": True,
             "clusterRadius": self.cluster_radius,
             "clusterMaxZoom": self.cluster_max_zoom,
         }
         map_instance.add_source(self.source_name, source)
-        # Find the source by name to avoid relying on its position in the list
-        for src in map_instance.sources:
-            if src["name"] == self.source_name:
-                self._source = src
-                break
+        self._source = map_instance.sources.get(self.source_name)
 
         self.cluster_layer_id = f"{self.name}_clusters"
         cluster_layer = {
@@ -140,6 +212,127 @@ class MarkerCluster:
         return self
 
 
+class _PointColumns:
+    """One batch of points added with :meth:`MarkerCluster.add_points`."""
+
+    def __init__(self, lng, lat, columns, rows=None):
+        self.lng = lng
+        self.lat = lat
+        self.columns = columns
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.lng)
+
+    def features(self, start, stop):
+        """Build the GeoJSON features of rows ``start`` to ``stop``."""
+
+        names = list(self.columns)
+        values = zip(*(self.columns[name][start:stop].tolist() for name in names))
+        if names:
+            properties = [dict(zip(names, row)) for row in values]
+        else:
+            properties = [{} for _ in range(stop - start)]
+        if self.rows is not None:
+            for row, extra in zip(properties, self.rows[start:stop]):
+                row.update(extra)
+        return [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [lng, lat]},
+                "properties": row,
+            }
+            for lng, lat, row in zip(
+                self.lng[start:stop].tolist(), self.lat[start:stop].tolist(), properties
+            )
+        ]
+
+    def round(self, precision):
+        """Return a copy with coordinates rounded to ``precision`` decimals."""
+
+        return _PointColumns(
+            np.round(self.lng, precision), np.round(self.lat, precision), self.columns, self.rows
+        )
+
+
+class PointFeatures(Sequence):
+    """Read-only sequence of point features backed by coordinate columns.
+
+    This is the ``features`` list of a :class:`MarkerCluster` source once
+    points were added with :meth:`MarkerCluster.add_points`. Features are
+    built on access, and slices are built column-wise, so the renderer,
+    which encodes long feature lists in slices, never holds more than one
+    batch of dictionaries.
+
+    Parameters
+    ----------
+    features : list of dict
+        Features stored as dictionaries, listed first.
+    columns : list
+        Columnar point batches, listed after ``features``.
+    """
+
+    def __init__(self, features, columns):
+        self._features = features
+        self._columns = columns
+
+    def __len__(self):
+        return len(self._features) + sum(len(batch) for batch in self._columns)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return list(self._slice(start, stop))
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("feature index out of range")
+        return next(self._slice(index, index + 1))
+
+    def __iter__(self):
+        return self._slice(0, len(self))
+
+    def _slice(self, start, stop):
+        """Yield the features from ``start`` to ``stop``."""
+
+        offset = len(self._features)
+        yield from self._features[start:stop]
+        for batch in self._columns:
+            first, last = max(start - offset, 0), min(stop - offset, len(batch))
+            for begin in range(first, last, STREAM_BATCH_SIZE):
+                yield from batch.features(begin, min(begin + STREAM_BATCH_SIZE, last))
+            offset += len(batch)
+            if offset >= stop:
+                break
+
+    def round(self, precision):
+        """Return a copy with coordinates rounded to ``precision`` decimals.
+
+        Used by :func:`~maplibreum.utils.round_geojson`; columns are rounded
+        with one vectorized call each.
+        """
+
+        return PointFeatures(
+            round_geojson({"type": "FeatureCollection", "features": self._features}, precision)[
+                "features"
+            ],
+            [batch.round(precision) for batch in self._columns],
+        )
+
+    def __eq__(self, other):
+        if isinstance(other, (PointFeatures, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"PointFeatures({len(self)} features)"
+
+
 class ClusteredGeoJson:
     """Cluster arbitrary GeoJSON features using MapLibre's clustering."""
 
@@ -249,111 +442,1355 @@ class ClusteredGeoJson:
         return self
 
 
-def cluster_features(features, radius=40, max_zoom=16):
-    """Cluster features using a simple grid-based algorithm.
-
-    This is a lightweight stand-in for ``supercluster`` suitable for testing
-    and benchmarking purposes."""
-
-    class SimpleSupercluster:
-        """A very simple grid-based clustering algorithm."""
-
-        def __init__(self, radius, max_zoom):
-            """Initialize the SimpleSupercluster.
-
-            Parameters
-            ----------
-            radius : int
-                Cluster radius in pixels.
-            max_zoom : int
-                Maximum zoom level at which to cluster.
-            """
-            self.radius = radius
-            self.max_zoom = max_zoom
-            self.points = []
-            self.index = None
-
-        def load(self, features):
-            """Load features into the clusterer.
-
-            Parameters
-            ----------
-            features : list
-                A list of GeoJSON features to cluster.
-            """
-            self.points = [f["geometry"]["coordinates"] for f in features]
-            try:
-                import rtree
-                # Bulk load the R-tree index for better performance
-                if not self.points:
-                    self.index = rtree.index.Index()
+def _unproject(x, y):
+    """Convert Web Mercator units in ``[0, 1]`` back to longitudes and latitudes."""
+
+    lng = (np.asarray(x) - 0.5) * 360.0
+    lat = np.degrees(2.0 * np.arctan(np.exp((0.5 - np.asarray(y)) * 2.0 * math.pi))) - 90.0
+    return lng, lat
+
+
+def _abbreviate(count):
+    """Abbreviate a point count the way ``supercluster`` does (``1.2k``, ``35k``).
+
+    Halves round up like JavaScript's ``Math.round``, not to even.
+    """
+
+    if count >= 10000:
+        return f"{math.floor(count / 1000 + 0.5)}k"
+    if count >= 1000:
+        return f"{math.floor(count / 100 + 0.5) / 10:g}k"
+    return count
+
+
+def _ranges(starts, stops):
+    """Concatenate ``arange(start, stop)`` for every pair without a Python loop."""
+
+    starts = np.asarray(starts, dtype=np.int64)
+    lengths = np.asarray(stops, dtype=np.int64) - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return np.arange(total, dtype=np.int64) + offsets
+
+
+def _index_dtype(size):
+    """Smallest signed integer type that can index ``size`` items."""
+
+    return np.int32 if size < 2**31 else np.int64
+
+
+class _KDTree:
+    """Static 2D KD-tree stored as a flat array in the ``kdbush`` layout.
+
+    ``ids`` is sorted so that every node of at most ``node_size`` items is a
+    contiguous slice and every split point sits at the middle of its slice;
+    queries walk the implicit tree with an explicit stack. Coordinates are
+    not copied: ``x[ids]`` and ``y[ids]`` are read from the arrays the ids
+    point into, so every zoom level costs one integer per item.
+    """
+
+    def __init__(self, ids, x, y, node_size=256):
+        self.ids = ids
+        self.x = x
+        self.y = y
+        self.node_size = node_size
+
+    @classmethod
+    def build(cls, x, y, node_size=256):
+        """Sort the positions of ``x``/``y`` into KD order."""
+
+        ids = np.arange(len(x), dtype=_index_dtype(len(x)))
+        kx = np.array(x, dtype=np.float64)
+        ky = np.array(y, dtype=np.float64)
+        stack = [(0, len(ids) - 1, 0)]
+        while stack:
+            left, right, axis = stack.pop()
+            if right - left <= node_size:
+                continue
+            middle = (left + right) >> 1
+            window = slice(left, right + 1)
+            order = np.argpartition((kx if axis == 0 else ky)[window], middle - left)
+            ids[window] = ids[window][order]
+            kx[window] = kx[window][order]
+            ky[window] = ky[window][order]
+            stack.append((left, middle - 1, 1 - axis))
+            stack.append((middle + 1, right, 1 - axis))
+        return cls(ids, x, y, node_size)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _search(self, descend, accept):
+        """Walk the tree; return ids accepted at split points and leaf slots."""
+
+        ids, x, y, node_size = self.ids, self.x, self.y, self.node_size
+        hits, starts, stops = [], [], []
+        stack = [(0, len(ids) - 1, 0)]
+        while stack:
+            left, right, axis = stack.pop()
+            if right - left <= node_size:
+                if right >= left:
+                    starts.append(left)
+                    stops.append(right + 1)
+                continue
+            middle = (left + right) >> 1
+            item = ids[middle]
+            mx = float(x[item])
+            my = float(y[item])
+            if accept(mx, my):
+                hits.append(item)
+            lower, upper = descend(mx if axis == 0 else my, axis)
+            if lower:
+                stack.append((left, middle - 1, 1 - axis))
+            if upper:
+                stack.append((middle + 1, right, 1 - axis))
+        return np.asarray(hits, dtype=ids.dtype), ids[_ranges(starts, stops)]
+
+    def range(self, min_x, min_y, max_x, max_y):
+        """Return the ids of all points inside a bounding box."""
+
+        def descend(value, axis):
+            if axis == 0:
+                return min_x <= value, max_x >= value
+            return min_y <= value, max_y >= value
+
+        hits, candidates = self._search(
+            descend, lambda mx, my: min_x <= mx <= max_x and min_y <= my <= max_y
+        )
+        cx, cy = self.x[candidates], self.y[candidates]
+        inside = (cx >= min_x) & (cx <= max_x) & (cy >= min_y) & (cy <= max_y)
+        return np.concatenate((hits, candidates[inside]))
+
+    def within(self, qx, qy, radius):
+        """Return the ids of all points within ``radius`` of ``(qx, qy)``."""
+
+        r2 = radius * radius
+
+        def descend(value, axis):
+            centre = qx if axis == 0 else qy
+            return centre - radius <= value, centre + radius >= value
+
+        hits, candidates = self._search(
+            descend, lambda mx, my: (mx - qx) ** 2 + (my - qy) ** 2 <= r2
+        )
+        inside = (self.x[candidates] - qx) ** 2 + (self.y[candidates] - qy) ** 2 <= r2
+        return np.concatenate((hits, candidates[inside]))
+
+
+def _neighbour_pairs(x, y, radius, max_candidates, chunk=1 << 22):
+    """Find all pairs of points closer than ``radius`` with a uniform grid.
+
+    Returns ``(lo, hi)`` position arrays with ``lo < hi``, or ``None`` when
+    the points are so dense that more than ``max_candidates`` pairs would
+    have to be checked.
+    """
+
+    cx = np.floor(x / radius).astype(np.int64)
+    cy = np.floor(y / radius).astype(np.int64)
+    cx -= cx.min()
+    cy -= cy.min()
+    width = int(cy.max()) + 3
+    key = cx * width + cy + 1
+    order = np.argsort(key)
+    key = key[order]
+    first = np.flatnonzero(np.concatenate(([True], key[1:] != key[:-1])))
+    cells = key[first]
+    count = np.diff(np.append(first, len(key)))
+
+    # Half of the 3x3 neighbourhood, so that every pair of cells is visited
+    # once: the same cell, the next cell up and the three in the next column.
+    # Cells are sorted, so the latter are consecutive after one search.
+    last = len(cells) - 1
+    same = np.flatnonzero(count > 1)
+    up = np.flatnonzero(cells[1:] == cells[:-1] + 1)
+    plan = [(same, same, True), (up, up + 1, False)]
+    found = np.searchsorted(cells, cells + width - 1)
+    for offset in (width - 1, width, width + 1):
+        at = np.minimum(found, last)
+        hit = cells[at] == cells + offset
+        plan.append((np.flatnonzero(hit), at[hit], False))
+        found = found + hit
+    plan = [(a, b, count[a] * count[b], same_cell) for a, b, same_cell in plan]
+    candidates = sum(int(pairs.sum()) for _, _, pairs, _ in plan)
+    if candidates > max_candidates:
+        return None
+
+    r2 = radius * radius
+    lows, highs = [], []
+    for a, b, pairs, same_cell in plan:
+        bounds = np.searchsorted(np.cumsum(pairs), np.arange(chunk, int(pairs.sum()), chunk))
+        for part in np.split(np.arange(len(a)), bounds):
+            ca, cb, n = a[part], b[part], pairs[part]
+            owner = np.repeat(np.arange(len(part)), n)
+            k = np.arange(int(n.sum()), dtype=np.int64) - np.repeat(np.cumsum(n) - n, n)
+            i = first[ca][owner] + k // count[cb][owner]
+            j = first[cb][owner] + k % count[cb][owner]
+            if same_cell:
+                keep = i < j
+                i, j = i[keep], j[keep]
+            i, j = order[i], order[j]
+            close = (x[i] - x[j]) ** 2 + (y[i] - y[j]) ** 2 <= r2
+            i, j = i[close], j[close]
+            lows.append(np.minimum(i, j))
+            highs.append(np.maximum(i, j))
+    if not lows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(lows), np.concatenate(highs)
+
+
+def _greedy_seeds(x, y, radius, node_size=256, max_rounds=64, pairs=_neighbour_pairs):
+    """Group points the way ``supercluster`` does at a single zoom level.
+
+    Points are visited in order; an unvisited point becomes a seed and takes
+    every unvisited point within ``radius``. The seeds are therefore the
+    lexicographically first maximal independent set of the neighbour graph,
+    which is resolved here in vectorized rounds: a point is a seed once none
+    of its lower neighbours can still become one, and is taken as soon as
+    one of them is. Very dense inputs and long dependency chains fall back
+    to the sequential walk over a KD-tree. ``pairs`` finds the neighbour
+    graph, with the signature of :func:`_neighbour_pairs`.
+
+    Returns
+    -------
+    numpy.ndarray
+        For every point, the position of the seed whose group it joins.
+    """
+
+    size = len(x)
+    seed = np.arange(size, dtype=np.int64)
+    if size < 2:
+        return seed
+    pairs = pairs(x, y, radius, max_candidates=32 * size + (1 << 20))
+    if pairs is None:
+        return _sequential_seeds(x, y, radius, node_size)
+    lo, hi = pairs
+
+    # 0: undecided, 1: seed, 2: taken by a lower seed
+    state = np.ones(size, dtype=np.int8)
+    state[hi] = 0
+    work_lo, work_hi = lo, hi
+    for _ in range(max_rounds):
+        open_edges = state[work_hi] == 0
+        work_lo, work_hi = work_lo[open_edges], work_hi[open_edges]
+        if not len(work_lo):
+            break
+        lower = state[work_lo]
+        taken = np.zeros(size, dtype=bool)
+        taken[work_hi[lower == 1]] = True
+        blocked = np.zeros(size, dtype=bool)
+        blocked[work_hi[lower == 0]] = True
+        undecided = state == 0
+        state[undecided & taken] = 2
+        state[undecided & ~taken & ~blocked] = 1
+    else:
+        open_edges = state[work_hi] == 0
+        work_lo, work_hi = work_lo[open_edges], work_hi[open_edges]
+        order = np.argsort(work_hi, kind="stable")
+        work_lo, work_hi = work_lo[order], work_hi[order]
+        points, starts = np.unique(work_hi, return_index=True)
+        stops = np.append(starts[1:], len(work_hi))
+        for point, start, stop in zip(points.tolist(), starts.tolist(), stops.tolist()):
+            state[point] = 2 if (state[work_lo[start:stop]] == 1).any() else 1
+
+    links = (state[lo] == 1) & (state[hi] == 2)
+    owner = np.full(size, size, dtype=np.int64)
+    np.minimum.at(owner, hi[links], lo[links])
+    taken = state == 2
+    seed[taken] = owner[taken]
+    return seed
+
+
+def _sequential_seeds(x, y, radius, node_size=256):
+    """Sequential form of :func:`_greedy_seeds`, one neighbour query per seed."""
+
+    tree = _KDTree.build(x, y, node_size)
+    seed = np.full(len(x), -1, dtype=np.int64)
+    for point in range(len(x)):
+        if seed[point] >= 0:
+            continue
+        seed[point] = point
+        neighbours = tree.within(float(x[point]), float(y[point]), radius)
+        neighbours = neighbours[seed[neighbours] < 0]
+        seed[neighbours] = point
+    return seed
+
+
+_SHARED = {}
+
+
+def _attach_shared(names, capacity):
+    """Map the coordinate buffers of a :class:`_ClusterPool` in a worker process."""
+
+    _SHARED["memory"] = [SharedMemory(name=name) for name in names]
+    _SHARED["x"], _SHARED["y"] = (
+        np.ndarray((capacity,), dtype=np.float64, buffer=memory.buf)
+        for memory in _SHARED["memory"]
+    )
+
+
+def _strip_pairs(size, radius, first, last):
+    """Neighbour pairs of the shared points in grid columns ``first`` to ``last``.
+
+    Column ``last`` is a halo owned by the next strip: pairs reaching into
+    it are kept, pairs entirely inside it are left to that strip.
+    """
+
+    x, y = _SHARED["x"][:size], _SHARED["y"][:size]
+    column = np.floor(x / radius)
+    inside = np.flatnonzero((column >= first) & (column <= last))
+    pairs = _neighbour_pairs(
+        x[inside], y[inside], radius, max_candidates=32 * len(inside) + (1 << 20)
+    )
+    if pairs is None:
+        return None
+    lo, hi = pairs
+    halo = column[inside] == last
+    keep = ~(halo[lo] & halo[hi])
+    return inside[lo[keep]], inside[hi[keep]]
+
+
+def _shared_tree(nodes, node_size):
+    """KD-tree order of the shared points ``nodes``."""
+
+    return _KDTree.build(_SHARED["x"][nodes], _SHARED["y"][nodes], node_size).ids
+
+
+class _ClusterPool:
+    """Process pool for building a :class:`Supercluster` index.
+
+    Coordinates are written to two shared-memory buffers that the workers
+    map once, so tasks only carry scalars and index arrays. Neighbour pairs
+    are searched in vertical strips of grid columns, one per worker, and
+    KD-trees are built one per task. Both results are independent of how
+    the work is split, so the index is identical for every worker count.
+    With one worker everything runs in-process, and levels with fewer than
+    ``min_size`` points are always searched in-process.
+    """
+
+    min_size = 1 << 16
+
+    def __init__(self, workers, capacity):
+        self.workers = workers
+        self._pool = None
+        self._memory = []
+        if workers <= 1:
+            return
+        self._memory = [SharedMemory(create=True, size=8 * capacity) for _ in range(2)]
+        self._x, self._y = (
+            np.ndarray((capacity,), dtype=np.float64, buffer=memory.buf)
+            for memory in self._memory
+        )
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_attach_shared,
+            initargs=([memory.name for memory in self._memory], capacity),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stop the workers and release the shared memory."""
+
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            del self._x, self._y
+        for memory in self._memory:
+            memory.close()
+            memory.unlink()
+        self._memory = []
+
+    def pairs(self, x, y, radius, max_candidates):
+        """:func:`_neighbour_pairs`, split into strips of grid columns."""
+
+        size = len(x)
+        if self._pool is None or size < self.min_size:
+            return _neighbour_pairs(x, y, radius, max_candidates)
+        self._x[:size] = x
+        self._y[:size] = y
+        cuts = np.floor(np.quantile(x, np.linspace(0, 1, self.workers + 1)[1:-1]) / radius)
+        bounds = [-np.inf, *np.unique(cuts).tolist(), np.inf]
+        futures = [
+            self._pool.submit(_strip_pairs, size, radius, first, last)
+            for first, last in zip(bounds[:-1], bounds[1:])
+        ]
+        strips = [future.result() for future in futures]
+        if any(strip is None for strip in strips):
+            return None
+        return tuple(np.concatenate(side) for side in zip(*strips))
+
+    def trees(self, x, y, groups, node_size):
+        """Return the KD-tree order of each group of node indices."""
+
+        if self._pool is None:
+            return [_KDTree.build(x[nodes], y[nodes], node_size).ids for nodes in groups]
+        self._x[: len(x)] = x
+        self._y[: len(y)] = y
+        futures = [self._pool.submit(_shared_tree, nodes, node_size) for nodes in groups]
+        return [future.result() for future in futures]
+
+
+def _lng_lat_xy(lng, lat):
+    """Project longitude and latitude columns to Web Mercator units in ``[0, 1]``."""
+
+    x = np.asarray(lng, dtype=np.float64) / 360.0 + 0.5
+    sin = np.sin(np.radians(np.clip(lat, -85.0511287798, 85.0511287798)))
+    y = 0.5 - 0.25 * np.log((1 + sin) / (1 - sin)) / math.pi
+    return x, y
+
+
+def _arrow_points(array):
+    """Return ``(lng, lat, rows)`` for a GeoArrow-style point or multipoint array.
+
+    Accepts interleaved (fixed-size list) and separated (``x``/``y`` struct)
+    coordinates, optionally nested in a list array of multipoints; ``rows``
+    maps every point back to its row, or is ``None`` for one point per row.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    rows = None
+    if array.null_count:
+        rows = np.flatnonzero(array.is_valid().to_numpy(zero_copy_only=False))
+        array = array.filter(array.is_valid())
+    if pa.types.is_list(array.type) or pa.types.is_large_list(array.type):
+        parents = pc.list_parent_indices(array).to_numpy(zero_copy_only=False)
+        rows = parents if rows is None else rows[parents]
+        array = array.flatten()
+    if pa.types.is_fixed_size_list(array.type):
+        size = array.type.list_size
+        coords = array.flatten().to_numpy(zero_copy_only=False).reshape(-1, size)
+        return coords[:, 0], coords[:, 1], rows
+    if pa.types.is_struct(array.type):
+        lng = array.field("x").to_numpy(zero_copy_only=False)
+        lat = array.field("y").to_numpy(zero_copy_only=False)
+        return lng, lat, rows
+    raise TypeError(f"Unsupported Arrow point type: {array.type}")
+
+
+def _point_columns(data, properties=None):
+    """Split point input into ``(lng, lat, properties, features)``.
+
+    ``properties`` is a mapping of column arrays, a list of dictionaries or
+    ``None``; ``features`` is the list of loaded GeoJSON features when the
+    input was GeoJSON, so that leaves can be returned as they were given.
+    """
+
+    if isinstance(data, np.ndarray):
+        coords = np.asarray(data, dtype=np.float64).reshape(len(data), -1)
+        return coords[:, 0], coords[:, 1], properties, None
+
+    geometry = getattr(data, "geometry", None)
+    if geometry is not None and hasattr(geometry, "geom_type"):
+        # GeoDataFrame: every other column becomes a property column.
+        points = (geometry.geom_type == "Point").to_numpy()
+        columns = {
+            str(name): data[name].to_numpy()[points]
+            for name in data.columns
+            if name != geometry.name
+        }
+        geometry = geometry[points]
+        return geometry.x.to_numpy(), geometry.y.to_numpy(), columns, None
+    if hasattr(data, "geom_type") and hasattr(data, "x"):
+        points = (data.geom_type == "Point").to_numpy()
+        return data[points].x.to_numpy(), data[points].y.to_numpy(), properties, None
+
+    if type(data).__module__.split(".")[0] == "pyarrow":
+        columns = properties
+        if hasattr(data, "column_names"):
+            columns = {
+                name: data.column(name).to_numpy(zero_copy_only=False)
+                for name in data.column_names
+                if name != "geometry"
+            }
+            data = data.column("geometry")
+        lng, lat, rows = _arrow_points(data)
+        if rows is not None and columns is not None:
+            columns = _take_properties(columns, rows)
+        return lng, lat, columns, None
+
+    if isinstance(data, dict):
+        data = data.get("features", [])
+    features = [feature for feature in data if feature.get("geometry")]
+    coords = np.array(
+        [feature["geometry"]["coordinates"][:2] for feature in features], dtype=np.float64
+    ).reshape(-1, 2)
+    return coords[:, 0], coords[:, 1], None, features
+
+
+def _take_properties(properties, rows):
+    """Select ``rows`` from a mapping of property columns or a list of dictionaries."""
+
+    if properties is None:
+        return None
+    if isinstance(properties, dict):
+        return {name: np.asarray(column)[rows] for name, column in properties.items()}
+    return [properties[row] for row in np.asarray(rows).tolist()]
+
+
+_REDUCERS = {"sum": np.add, "mean": np.add, "min": np.minimum, "max": np.maximum}
+
+
+def _aggregate_spec(name, spec):
+    """Validate an ``aggregates`` entry and normalise it to ``(reduce, property, value)``."""
+
+    spec = tuple(spec)
+    reduce = spec[0] if spec else None
+    if reduce == "count" and len(spec) == 3:
+        return spec
+    if len(spec) == 2:
+        if isinstance(reduce, str) and reduce in _REDUCERS:
+            return spec + (None,)
+        if isinstance(reduce, np.ufunc) and reduce.nin == 2 and reduce.nout == 1:
+            return spec + (None,)
+    raise ValueError(
+        f"Invalid aggregate {name!r}: expected (reduce, property) with reduce one of "
+        f"{sorted(_REDUCERS)} or a binary NumPy ufunc, or ('count', property, value)"
+    )
+
+
+def _reducer_name(name, reduce):
+    """Return how :meth:`Supercluster.save` stores an aggregate's reducer."""
+
+    if isinstance(reduce, str):
+        return reduce
+    if getattr(np, reduce.__name__, None) is not reduce:
+        raise ValueError(
+            f"Cannot save aggregate {name!r}: ufunc {reduce.__name__!r} is not a "
+            "NumPy attribute, so it could not be restored when the index is opened"
+        )
+    return reduce.__name__
+
+
+def _json_value(value):
+    """Return a ``count`` aggregate value in a JSON-serializable form."""
+
+    if isinstance(value, (set, frozenset)):
+        try:
+            return sorted(value)
+        except TypeError:
+            return sorted(value, key=repr)
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+
+def _numeric(column):
+    """Return a property column as numbers, with missing values as NaN."""
+
+    column = np.asarray(column)
+    if column.dtype.kind in "biu":
+        return column.astype(np.int64)
+    if column.dtype.kind == "f":
+        return column.astype(np.float64)
+    values = [np.nan if value is None else value for value in column.tolist()]
+    return np.array(values, dtype=np.float64)
+
+
+_INDEX_MAGIC = b"MLCLUSTR"
+_INDEX_VERSION = 1
+_INDEX_PREFIX = struct.Struct("<8sIQ")
+
+
+def _align(offset, alignment=64):
+    """Round ``offset`` up to a multiple of ``alignment``."""
+
+    return -(-offset // alignment) * alignment
+
+
+def _json_arrays(name, values):
+    """Encode ``values`` as JSON into a byte array plus ``n + 1`` offsets."""
+
+    encode = get_json_backend("compact").dumps
+    encoded = [encode(value).encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    return {
+        name: np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        f"{name}:offsets": offsets,
+    }
+
+
+class _JSONColumn:
+    """Values stored as concatenated JSON documents, decoded on access."""
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if np.ndim(index) == 0:
+            begin, end = self.offsets[index], self.offsets[index + 1]
+            return json.loads(self.data[begin:end].tobytes())
+        values = np.empty(len(index), dtype=object)
+        for position, item in enumerate(np.asarray(index).tolist()):
+            values[position] = self[item]
+        return values
+
+
+class Supercluster:
+    """Multi-zoom point clustering index, a NumPy port of ``supercluster``.
+
+    Points are projected to Web Mercator and clustered greedily from
+    ``max_zoom`` down to ``min_zoom``: at every zoom, points closer than
+    ``radius`` pixels are merged into a cluster at their weighted centroid.
+    Zoom levels are queried through KD-trees over their clusters (levels
+    that barely differ share one), so viewport queries only touch the
+    clusters they return, and every cluster knows its children and the
+    contiguous run of original points it contains.
+
+    Parameters
+    ----------
+    radius : float, optional
+        Cluster radius in pixels.
+    max_zoom : int, optional
+        Maximum zoom level at which clusters are generated; points are
+        returned unclustered above it.
+    min_zoom : int, optional
+        Minimum zoom level at which clusters are generated.
+    min_points : int, optional
+        Minimum number of points that form a cluster.
+    extent : int, optional
+        Tile extent the radius is relative to.
+    node_size : int, optional
+        Leaf size of the KD-trees.
+    aggregates : dict, optional
+        Cluster properties computed while the index is built, the Python
+        counterpart of MapLibre's ``clusterProperties``. Maps an output
+        property name to ``(reduce, property)``, where ``reduce`` is
+        ``"sum"``, ``"min"``, ``"max"``, ``"mean"`` or a binary NumPy ufunc
+        such as ``numpy.maximum``, or to ``("count", property, value)``,
+        which counts the points whose ``property`` equals ``value`` (or is
+        in ``value`` when it is a list, tuple or set). Missing numeric
+        values are NaN. Every cluster feature carries the reduced values,
+        so clustered output can drive :class:`~maplibreum.layers.HTMLClusterLayer`
+        donut charts without re-aggregating in the browser.
+    workers : int, optional
+        Worker processes used by :meth:`load`; ``None`` uses the CPU count.
+        Neighbour searches are split into spatial strips and KD-trees are
+        built in parallel over shared-memory coordinates; the index is the
+        same for every worker count. Inputs under 65,536 points are always
+        clustered in-process.
+
+    Examples
+    --------
+    >>> index = Supercluster(radius=40, max_zoom=16).load(features)
+    >>> clusters = index.get_clusters([-180, -85, 180, 85], zoom=2)
+
+    >>> index = Supercluster(
+    ...     aggregates={"total": ("sum", "mag"), "strong": ("count", "kind", "strong")}
+    ... ).load(features)
+    """
+
+    def __init__(
+        self,
+        radius=40,
+        max_zoom=16,
+        min_zoom=0,
+        min_points=2,
+        extent=512,
+        node_size=256,
+        aggregates=None,
+        workers=1,
+    ):
+        if min_zoom > max_zoom:
+            raise ValueError("min_zoom must not exceed max_zoom")
+        self.aggregates = {
+            name: _aggregate_spec(name, spec) for name, spec in (aggregates or {}).items()
+        }
+        self.radius = radius
+        self.max_zoom = max_zoom
+        self.min_zoom = min_zoom
+        self.min_points = min_points
+        self.extent = extent
+        self.node_size = node_size
+        self.workers = (os.cpu_count() or 1) if workers is None else max(1, workers)
+        self.points = None
+        self._lng = np.zeros(0)
+        self._lat = np.zeros(0)
+        self._properties = None
+        self._trees = []
+        self._level_tree = []
+        self._set_nodes(np.zeros(0), np.zeros(0))
+        self._aggregated = self._aggregate()
+
+    @property
+    def num_points(self):
+        """Number of points in the index."""
+        return len(self._lng)
+
+    def load(self, data, properties=None):
+        """Build the index from point data.
+
+        Parameters
+        ----------
+        data : list of dict, dict, numpy.ndarray, GeoDataFrame or Arrow data
+            GeoJSON ``Point`` features or a ``FeatureCollection``; an
+            ``(N, 2)`` array of ``[lng, lat]`` rows; a GeoDataFrame or
+            GeoSeries (non-point geometries are skipped and the remaining
+            columns become properties); or a pyarrow array, chunked array
+            or table (``geometry`` column) of GeoArrow points, either
+            interleaved (fixed-size lists) or separated (``x``/``y``
+            structs), optionally as ragged lists of multipoints.
+        properties : dict or list of dict, optional
+            Per-point properties for array input, either as columns
+            (``{"name": array}``) or one dictionary per point.
+
+        Returns
+        -------
+        Supercluster
+            The index itself, to allow chaining.
+
+        Notes
+        -----
+        Only GeoJSON input keeps one dictionary per point; for every other
+        input, points are stored as columns and the features returned by
+        queries are built on demand.
+        """
+        lng, lat, properties, features = _point_columns(data, properties)
+        self.points = features
+        return self._load(lng, lat, properties)
+
+    def load_arrays(self, lng, lat, properties=None):
+        """Build the index from longitude and latitude arrays.
+
+        Parameters
+        ----------
+        lng, lat : array-like
+            Point coordinates in degrees.
+        properties : dict or list of dict, optional
+            Per-point properties, either as columns (``{"name": array}``)
+            or one dictionary per point.
+
+        Returns
+        -------
+        Supercluster
+            The index itself, to allow chaining.
+        """
+        self.points = None
+        return self._load(lng, lat, properties)
+
+    def _load(self, lng, lat, properties):
+        """Drop non-finite points, project the rest and build the index."""
+
+        lng = np.asarray(lng, dtype=np.float64)
+        lat = np.asarray(lat, dtype=np.float64)
+        if isinstance(properties, dict):
+            properties = {name: np.asarray(column) for name, column in properties.items()}
+        finite = np.isfinite(lng) & np.isfinite(lat)
+        if not finite.all():
+            rows = np.flatnonzero(finite)
+            lng, lat = lng[rows], lat[rows]
+            properties = _take_properties(properties, rows)
+            if self.points is not None:
+                self.points = [self.points[row] for row in rows.tolist()]
+        self._lng, self._lat, self._properties = lng, lat, properties
+        self._build(*_lng_lat_xy(lng, lat))
+        return self
+
+    def _set_nodes(self, x, y):
+        """Reset the node arrays to the unclustered input points."""
+
+        size = len(x)
+        dtype = _index_dtype(2 * size)
+        self._x = x
+        self._y = y
+        self._count = np.ones(size, dtype=dtype)
+        self._parent = np.full(size, -1, dtype=dtype)
+        self._zoom = np.full(size, self.max_zoom + 1, dtype=np.int8)
+        self._children = np.zeros(0, dtype=dtype)
+        self._child_start = np.zeros(1, dtype=dtype)
+        self._leaf_start = np.arange(size, dtype=dtype)
+        self._leaf_order = np.arange(size, dtype=dtype)
+        self._hidden = np.full(size, self.min_zoom - 1, dtype=np.int8)
+
+    def _build(self, x, y):
+        """Cluster the projected points level by level, bottom-up."""
+
+        points = len(x)
+        capacity = max(2 * points - 1, 0)
+        dtype = _index_dtype(capacity)
+        node_x = np.empty(capacity)
+        node_y = np.empty(capacity)
+        node_count = np.empty(capacity, dtype=dtype)
+        node_parent = np.full(capacity, -1, dtype=dtype)
+        node_zoom = np.empty(capacity, dtype=np.int8)
+        node_x[:points] = x
+        node_y[:points] = y
+        node_count[:points] = 1
+        node_zoom[:points] = self.max_zoom + 1
+
+        workers = self.workers if points >= _ClusterPool.min_size else 1
+        with _ClusterPool(workers, capacity) as pool:
+            size = self._cluster_levels(
+                pool, node_x, node_y, node_count, node_parent, node_zoom, points
+            )
+            self._set_nodes(node_x[:size].copy(), node_y[:size].copy())
+            self._count = node_count[:size].copy()
+            self._parent = node_parent[:size].copy()
+            self._zoom = node_zoom[:size].copy()
+            del node_x, node_y, node_count, node_parent, node_zoom
+            self._hidden = np.full(size, self.min_zoom - 1, dtype=np.int8)
+            clustered = self._parent >= 0
+            self._hidden[clustered] = self._zoom[self._parent[clustered]]
+            self._link(points, np.flatnonzero(~clustered))
+            self._aggregated = self._aggregate()
+            self._build_trees(pool)
+
+    def _cluster_levels(self, pool, node_x, node_y, node_count, node_parent, node_zoom, points):
+        """Fill the node arrays level by level and return the number of nodes."""
+
+        dtype = node_parent.dtype
+        size = points
+        items = np.arange(points, dtype=dtype)
+        for zoom in range(self.max_zoom, self.min_zoom - 1, -1):
+            radius = self.radius / (self.extent * 2.0**zoom)
+            ix, iy, counts = node_x[items], node_y[items], node_count[items]
+            seed = _greedy_seeds(ix, iy, radius, self.node_size, pairs=pool.pairs)
+
+            positions = np.arange(len(items))
+            totals = np.bincount(seed, weights=counts, minlength=len(items))
+            grouped = np.bincount(seed, minlength=len(items)) > 1
+            seeds = np.flatnonzero(grouped & (totals >= self.min_points))
+            clustered = np.zeros(len(items), dtype=bool)
+            clustered[seeds] = True
+            clustered = clustered[seed]
+
+            ids = np.arange(size, size + len(seeds), dtype=dtype)
+            wx = np.bincount(seed, weights=ix * counts, minlength=len(items))[seeds]
+            wy = np.bincount(seed, weights=iy * counts, minlength=len(items))[seeds]
+            node_x[ids] = wx / totals[seeds]
+            node_y[ids] = wy / totals[seeds]
+            node_count[ids] = totals[seeds]
+            node_zoom[ids] = zoom
+            cluster_of = np.full(len(items), -1, dtype=dtype)
+            cluster_of[seeds] = ids
+            node_parent[items[clustered]] = cluster_of[seed[clustered]]
+            size += len(seeds)
+
+            # Next level, in visiting order: each cluster replaces its seed,
+            # points left unclustered follow the seed that visited them.
+            keep = np.flatnonzero(~clustered | (seed == positions))
+            keep = keep[np.argsort(seed[keep], kind="stable")]
+            items = np.where(clustered, cluster_of[seed], items)[keep]
+        return size
+
+    def _build_trees(self, pool, overlap=0.25):
+        """Build the KD-trees, sharing one tree between similar zoom levels.
+
+        A node is visible from zoom ``hidden + 1`` (the zoom below which its
+        parent takes over) up to its own ``zoom``. Consecutive levels whose
+        union of visible nodes is at most ``1 + overlap`` times larger than
+        any single level share one tree, and queries drop the nodes that are
+        not visible at the requested zoom. High zoom levels, where few points
+        merge, then cost one tree instead of one each.
+        """
+        low = self.min_zoom - 1
+        span = self.max_zoom + 3 - low
+        pairs = np.bincount(
+            (self._hidden.astype(np.int64) - low) * span + (self._zoom - low),
+            minlength=span * span,
+        ).reshape(span, span)
+        # union[a, b]: nodes visible somewhere in [a, b] (hidden < b, zoom >= a).
+        union = np.cumsum(pairs, axis=0)[:, ::-1].cumsum(axis=1)[:, ::-1]
+
+        def visible(first, last):
+            return union[last - 1 - low, first - low]
+
+        groups = []
+        self._level_tree = []
+        last = self.max_zoom + 1
+        while last >= self.min_zoom:
+            first = last
+            while first > self.min_zoom and visible(first - 1, last) <= (1 + overlap) * min(
+                visible(first - 1, first - 1), visible(last, last)
+            ):
+                first -= 1
+            groups.append(np.flatnonzero((self._hidden < last) & (self._zoom >= first)))
+            self._level_tree[:0] = [len(groups) - 1] * (last - first + 1)
+            last = first - 1
+        orders = pool.trees(self._x, self._y, groups, self.node_size)
+        self._trees = [
+            _KDTree(nodes.astype(self._parent.dtype)[order], self._x, self._y, self.node_size)
+            for nodes, order in zip(groups, orders)
+        ]
+
+    def _link(self, points, top):
+        """Fill the child lists and the contiguous leaf ranges of every cluster."""
+
+        size = len(self._x)
+        dtype = self._parent.dtype
+        children = np.flatnonzero(self._parent >= 0).astype(dtype)
+        children = children[np.argsort(self._parent[children], kind="stable")]
+        per_cluster = np.bincount(self._parent[children] - points, minlength=size - points)
+        self._children = children
+        self._child_start = np.concatenate(([0], np.cumsum(per_cluster))).astype(dtype)
+
+        # Leaves are laid out depth-first, top level first, so each node owns
+        # the slice ``leaf_start:leaf_start + count`` of ``leaf_order``.
+        start = np.zeros(size, dtype=dtype)
+        start[top] = np.cumsum(self._count[top]) - self._count[top]
+        for zoom in range(self.min_zoom, self.max_zoom + 1):
+            clusters = np.flatnonzero(self._zoom[points:] == zoom) + points
+            if not len(clusters):
+                continue
+            lo = self._child_start[clusters[0] - points]
+            hi = self._child_start[clusters[-1] - points + 1]
+            group = children[lo:hi]
+            counts = self._count[group]
+            offsets = np.cumsum(counts) - counts
+            sizes = per_cluster[clusters - points]
+            firsts = np.repeat(offsets[self._child_start[clusters - points] - lo], sizes)
+            start[group] = start[self._parent[group]] + offsets - firsts
+        self._leaf_start = start
+        self._leaf_order = np.empty(points, dtype=dtype)
+        self._leaf_order[start[:points]] = np.arange(points, dtype=dtype)
+
+    def _property_values(self, name):
+        """Return the values of one property for every point, as an array."""
+
+        if isinstance(self._properties, dict):
+            if name in self._properties:
+                return np.asarray(self._properties[name])
+            values = [None] * self.num_points
+        elif self.points is not None:
+            values = [(feature.get("properties") or {}).get(name) for feature in self.points]
+        elif self._properties is not None:
+            values = [row.get(name) for row in self._properties]
+        else:
+            values = [None] * self.num_points
+        array = np.empty(len(values), dtype=object)
+        array[:] = values
+        return array
+
+    def _aggregate(self):
+        """Map and reduce the ``aggregates`` over every node, bottom-up.
+
+        Points take their mapped value; clusters are reduced from their
+        children one creation zoom at a time, deepest first, so every
+        reduction reads finished children through the child lists.
+        """
+        points = self.num_points
+        size = len(self._x)
+        clusters = points + np.arange(size - points)
+        # Clusters are numbered level by level from max_zoom down.
+        levels = [
+            np.searchsorted(-self._zoom[points:], [-zoom, 1 - zoom]) + points
+            for zoom in range(self.max_zoom, self.min_zoom - 1, -1)
+        ]
+        aggregated = {}
+        for name, (reduce, prop, value) in self.aggregates.items():
+            column = self._property_values(prop)
+            if reduce == "count":
+                if isinstance(value, (list, tuple, set, frozenset)):
+                    mapped = np.isin(column, list(value))
                 else:
-                    def generator():
-                        for i, (lng, lat) in enumerate(self.points):
-                            yield (i, (lng, lat, lng, lat), None)
-                    self.index = rtree.index.Index(generator())
-            except ImportError:
-                self.index = None
-
-        def get_clusters(self, bbox, zoom):
-            """Get clusters for a given bounding box and zoom level.
-
-            Parameters
-            ----------
-            bbox : tuple
-                Bounding box in the form ``(west, south, east, north)``.
-            zoom : int
-                The current zoom level.
-
-            Returns
-            -------
-            list
-                A list of clustered GeoJSON features.
-            """
-            cell_x = (bbox[2] - bbox[0]) / max(self.radius, 1)
-            cell_y = (bbox[3] - bbox[1]) / max(self.radius, 1)
-            clusters = {}
-
-            if self.index:
-                # Query the R-tree for point IDs in the bounding box
-                point_ids = self.index.intersection(bbox)
-                points_to_cluster = (self.points[i] for i in point_ids)
+                    mapped = column == value
+                mapped = np.asarray(mapped, dtype=np.int64).reshape(-1)
+                ufunc = np.add
             else:
-                # Fallback to checking all points
-                points_to_cluster = self.points
-
-            for lng, lat in points_to_cluster:
-                if self.index is None:
-                    # If we didn't use an index, we need to filter points here
-                    if not (bbox[0] <= lng <= bbox[2] and bbox[1] <= lat <= bbox[3]):
-                        continue
-
-                gx = int((lng - bbox[0]) / cell_x)
-                gy = int((lat - bbox[1]) / cell_y)
-                key = (gx, gy)
-                data = clusters.setdefault(key, {"count": 0, "lng": 0.0, "lat": 0.0})
-                data["count"] += 1
-                data["lng"] += lng
-                data["lat"] += lat
-
-            features = []
-            for data in clusters.values():
-                count = data["count"]
-                features.append(
-                    {
-                        "type": "Feature",
-                        "geometry": {
-                            "type": "Point",
-                            "coordinates": [data["lng"] / count, data["lat"] / count],
-                        },
-                        "properties": {
-                            "cluster": count > 1,
-                            "point_count": count,
-                        },
-                    }
+                mapped = _numeric(column)
+                ufunc = _REDUCERS.get(reduce, reduce)
+            values = np.zeros(size, dtype=mapped.dtype)
+            values[:points] = mapped
+            for lo, hi in levels:
+                if lo == hi:
+                    continue
+                first = self._child_start[lo - points]
+                last = self._child_start[hi - points]
+                values[lo:hi] = ufunc.reduceat(
+                    values[self._children[first:last]],
+                    self._child_start[lo - points : hi - points] - first,
+                )
+            if reduce == "mean":
+                values = values / np.concatenate(
+                    (np.ones(points), self._count[clusters].astype(np.float64))
                 )
-            return features
+            aggregated[name] = values
+        return aggregated
+
+    def _range(self, zoom, min_x, min_y, max_x, max_y):
+        """Return the nodes visible at ``zoom`` inside a projected bounding box."""
+
+        zoom = max(self.min_zoom, min(math.floor(zoom), self.max_zoom + 1))
+        nodes = self._trees[self._level_tree[zoom - self.min_zoom]].range(
+            min_x, min_y, max_x, max_y
+        )
+        return nodes[(self._hidden[nodes] < zoom) & (self._zoom[nodes] >= zoom)]
+
+    def _cluster_node(self, cluster_id):
+        """Validate ``cluster_id`` and return it as a node index."""
+
+        node = int(cluster_id)
+        if not self.num_points <= node < len(self._x):
+            raise ValueError(f"No cluster with the specified id: {cluster_id}")
+        return node
+
+    def _point_features(self, leaves):
+        """Return the features of points by index, building them for columnar input."""
+
+        if self.points is not None:
+            return [self.points[leaf] for leaf in leaves.tolist()]
+        if self._properties is None:
+            rows = [{} for _ in range(len(leaves))]
+        elif isinstance(self._properties, dict):
+            names = list(self._properties)
+            values = zip(*(self._properties[name][leaves].tolist() for name in names))
+            rows = [dict(zip(names, row)) for row in values] if names else [{} for _ in leaves]
+        else:
+            rows = [self._properties[leaf] for leaf in leaves.tolist()]
+        return [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [lng, lat]},
+                "properties": properties,
+            }
+            for lng, lat, properties in zip(
+                self._lng[leaves].tolist(), self._lat[leaves].tolist(), rows
+            )
+        ]
+
+    def _features(self, nodes):
+        """Return GeoJSON features for node indices, clusters and points alike."""
+
+        points = self.num_points
+        nodes = np.asarray(nodes, dtype=np.int64)
+        is_cluster = nodes >= points
+        clusters = nodes[is_cluster]
+        lng, lat = _unproject(self._x[clusters], self._y[clusters])
+        built = [
+            {
+                "type": "Feature",
+                "id": node,
+                "properties": {
+                    "cluster": True,
+                    "cluster_id": node,
+                    "point_count": count,
+                    "point_count_abbreviated": _abbreviate(count),
+                },
+                "geometry": {"type": "Point", "coordinates": [x, y]},
+            }
+            for node, count, x, y in zip(
+                clusters.tolist(),
+                self._count[clusters].tolist(),
+                lng.tolist(),
+                lat.tolist(),
+            )
+        ]
+        for name, values in self._aggregated.items():
+            for feature, value in zip(built, values[clusters].tolist()):
+                feature["properties"][name] = value
+        if len(clusters) == len(nodes):
+            return built
+        loose = iter(self._point_features(nodes[~is_cluster]))
+        built = iter(built)
+        return [next(built) if flag else next(loose) for flag in is_cluster.tolist()]
+
+    def get_clusters(self, bbox, zoom):
+        """Return the clusters and points inside a bounding box at a zoom level.
+
+        Parameters
+        ----------
+        bbox : sequence of float
+            ``(west, south, east, north)`` in degrees. Boxes crossing the
+            antimeridian (``west > east``) are supported.
+        zoom : float
+            Zoom level; fractional zooms are floored.
+
+        Returns
+        -------
+        list of dict
+            Cluster features (with ``cluster``, ``cluster_id``,
+            ``point_count`` and ``point_count_abbreviated`` properties) and
+            the loaded point features that are not clustered at ``zoom``.
+        """
+        west, south, east, north = (float(value) for value in bbox)
+        min_lng = (west + 180) % 360 - 180
+        max_lng = 180.0 if east == 180 else (east + 180) % 360 - 180
+        south = max(-90.0, min(90.0, south))
+        north = max(-90.0, min(90.0, north))
+        if east - west >= 360:
+            min_lng, max_lng = -180.0, 180.0
+        elif min_lng > max_lng:
+            return self.get_clusters([min_lng, south, 180, north], zoom) + self.get_clusters(
+                [-180, south, max_lng, north], zoom
+            )
+        (x0, x1), (y0, y1) = _lng_lat_xy([min_lng, max_lng], [north, south])
+        return self._features(self._range(zoom, x0, y0, x1, y1))
+
+    def get_children(self, cluster_id):
+        """Return the clusters and points a cluster splits into one zoom level down.
+
+        Parameters
+        ----------
+        cluster_id : int
+            The ``cluster_id`` of a cluster feature.
+
+        Returns
+        -------
+        list of dict
+            Child cluster and point features.
+        """
+        node = self._cluster_node(cluster_id) - self.num_points
+        children = self._children[self._child_start[node] : self._child_start[node + 1]]
+        return self._features(children)
+
+    def get_leaves(self, cluster_id, limit=10, offset=0):
+        """Return the original points of a cluster.
+
+        Parameters
+        ----------
+        cluster_id : int
+            The ``cluster_id`` of a cluster feature.
+        limit : int or None, optional
+            Maximum number of points to return; ``None`` returns all.
+        offset : int, optional
+            Number of points to skip, for pagination.
+
+        Returns
+        -------
+        list of dict
+            Point features, as loaded for GeoJSON input.
+        """
+        node = self._cluster_node(cluster_id)
+        count = int(self._count[node])
+        stop = count if limit is None else min(count, offset + limit)
+        start = int(self._leaf_start[node])
+        return self._point_features(self._leaf_order[start + min(offset, count) : start + stop])
+
+    def get_cluster_expansion_zoom(self, cluster_id):
+        """Return the zoom level at which a cluster splits into its children.
+
+        Parameters
+        ----------
+        cluster_id : int
+            The ``cluster_id`` of a cluster feature.
+
+        Returns
+        -------
+        int
+        """
+        return int(self._zoom[self._cluster_node(cluster_id)]) + 1
+
+    def to_geojson(self, zoom):
+        """Return all clusters and points at ``zoom`` as a ``FeatureCollection``.
+
+        This pre-computes what a clustered GeoJSON source would show at that
+        zoom, e.g. to ship one clustered snapshot per zoom band.
+        """
+        return {
+            "type": "FeatureCollection",
+            "features": self.get_clusters([-180, -90, 180, 90], zoom),
+        }
+
+    def save(self, path):
+        """Write the index to a compact binary file.
+
+        Nodes, parent and child links, leaf order, KD-trees and point
+        columns are stored as flat, 64-byte aligned arrays behind a small
+        JSON header; GeoJSON features and non-numeric properties are stored
+        as JSON per point. :meth:`open` maps the file back without copying.
+
+        Parameters
+        ----------
+        path : str or path-like
+            Destination file.
+
+        Raises
+        ------
+        ValueError
+            If an aggregate reduces with a ufunc that is not a NumPy
+            attribute (e.g. one made by :func:`numpy.frompyfunc`), since
+            :meth:`open` could not rebuild it.
+        """
+        aggregates = {
+            name: [_reducer_name(name, reduce), prop, _json_value(value)]
+            for name, (reduce, prop, value) in self.aggregates.items()
+        }
+        arrays = {
+            "x": self._x,
+            "y": self._y,
+            "count": self._count,
+            "parent": self._parent,
+            "zoom": self._zoom,
+            "hidden": self._hidden,
+            "children": self._children,
+            "child_start": self._child_start,
+            "leaf_start": self._leaf_start,
+            "leaf_order": self._leaf_order,
+            "lng": self._lng,
+            "lat": self._lat,
+            "tree_ids": np.concatenate([tree.ids for tree in self._trees] or [self._parent[:0]]),
+            "tree_start": np.cumsum([0] + [len(tree) for tree in self._trees]),
+            "level_tree": np.asarray(self._level_tree, dtype=np.int64),
+        }
+        for name, values in self._aggregated.items():
+            arrays[f"aggregate:{name}"] = values
+        columns = []
+        if self.points is not None:
+            kind = "geojson"
+            arrays.update(_json_arrays("points", self.points))
+        elif isinstance(self._properties, dict):
+            kind = "columns"
+            for name, column in self._properties.items():
+                if getattr(column, "dtype", np.dtype(object)).kind in "biufU":
+                    columns.append([name, "array"])
+                    arrays[f"column:{name}"] = column
+                else:
+                    columns.append([name, "json"])
+                    arrays.update(_json_arrays(f"column:{name}", column))
+        elif self._properties is not None:
+            kind = "rows"
+            arrays.update(_json_arrays("rows", self._properties))
+        else:
+            kind = None
+
+        layout = {}
+        offset = 0
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            arrays[name] = array
+            layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+            offset = _align(offset + array.nbytes)
+        header = json.dumps(
+            {
+                "options": {
+                    "radius": self.radius,
+                    "max_zoom": self.max_zoom,
+                    "min_zoom": self.min_zoom,
+                    "min_points": self.min_points,
+                    "extent": self.extent,
+                    "node_size": self.node_size,
+                    "aggregates": aggregates,
+                },
+                "properties": kind,
+                "columns": columns,
+                "arrays": layout,
+            }
+        ).encode("utf-8")
+
+        with open(path, "wb") as handle:
+            handle.write(_INDEX_PREFIX.pack(_INDEX_MAGIC, _INDEX_VERSION, len(header)))
+            handle.write(header)
+            start = _align(_INDEX_PREFIX.size + len(header))
+            for name, array in arrays.items():
+                handle.write(b"\0" * (start + layout[name]["offset"] - handle.tell()))
+                array.tofile(handle)
+
+    @classmethod
+    def open(cls, path):
+        """Open an index written by :meth:`save` through a read-only memory map.
+
+        Nothing is decoded up front: every array is a view of the mapped
+        file, so opening is near-instant regardless of size and processes
+        that open the same file share its pages instead of holding private
+        copies.
+
+        Parameters
+        ----------
+        path : str or path-like
+            File written by :meth:`save`.
+
+        Returns
+        -------
+        Supercluster
+            A query-ready index; calling :meth:`load` replaces it with an
+            in-memory one.
+        """
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        if len(buffer) < _INDEX_PREFIX.size:
+            raise ValueError(f"Not a cluster index file: {path}")
+        magic, version, length = _INDEX_PREFIX.unpack_from(buffer)
+        if magic != _INDEX_MAGIC:
+            raise ValueError(f"Not a cluster index file: {path}")
+        if version != _INDEX_VERSION:
+            raise ValueError(f"Unsupported cluster index version {version}: {path}")
+        header = json.loads(bytes(buffer[_INDEX_PREFIX.size : _INDEX_PREFIX.size + length]))
+        start = _align(_INDEX_PREFIX.size + length)
+
+        def array(name):
+            spec = header["arrays"][name]
+            dtype = np.dtype(spec["dtype"])
+            begin = start + spec["offset"]
+            size = dtype.itemsize * int(np.prod(spec["shape"], dtype=np.int64))
+            return np.asarray(buffer[begin : begin + size].view(dtype).reshape(spec["shape"]))
+
+        options = header["options"]
+        options["aggregates"] = {
+            name: (reduce if reduce in _REDUCERS else getattr(np, reduce), prop)
+            if reduce != "count"
+            else (reduce, prop, value)
+            for name, (reduce, prop, value) in options["aggregates"].items()
+        }
+        index = cls(**options)
+        index._aggregated = {name: array(f"aggregate:{name}") for name in index.aggregates}
+        for name in (
+            "x",
+            "y",
+            "count",
+            "parent",
+            "zoom",
+            "hidden",
+            "children",
+            "child_start",
+            "leaf_start",
+            "leaf_order",
+            "lng",
+            "lat",
+        ):
+            setattr(index, f"_{name}", array(name))
+        tree_ids, tree_start = array("tree_ids"), array("tree_start")
+        index._trees = [
+            _KDTree(tree_ids[begin:end], index._x, index._y, index.node_size)
+            for begin, end in zip(tree_start[:-1].tolist(), tree_start[1:].tolist())
+        ]
+        index._level_tree = array("level_tree").tolist()
+
+        kind = header["properties"]
+        if kind == "geojson":
+            index.points = _JSONColumn(array("points"), array("points:offsets"))
+        elif kind == "rows":
+            index._properties = _JSONColumn(array("rows"), array("rows:offsets"))
+        elif kind == "columns":
+            index._properties = {
+                name: array(f"column:{name}")
+                if storage == "array"
+                else _JSONColumn(array(f"column:{name}"), array(f"column:{name}:offsets"))
+                for name, storage in header["columns"]
+            }
+        return index
+
+
+def cluster_features(features, radius=40, max_zoom=16, **options):
+    """Build a :class:`Supercluster` index for point data.
+
+    Parameters
+    ----------
+    features : list of dict, dict, numpy.ndarray, GeoDataFrame or Arrow data
+        GeoJSON ``Point`` features or any other input accepted by
+        :meth:`Supercluster.load`.
+    radius : float, optional
+        Cluster radius in pixels.
+    max_zoom : int, optional
+        Maximum zoom level at which clusters are generated.
+    **options
+        Further :class:`Supercluster` options (``min_zoom``, ``min_points``,
+        ``extent``, ``node_size``, ``aggregates``, ``workers``).
 
-    index = SimpleSupercluster(radius, max_zoom)
-    index.load(features)
-    return index
+    Returns
+    -------
+    Supercluster
+        The loaded index.
+    """
+    return Supercluster(radius=radius, max_zoom=max_zoom, **options).load(features)
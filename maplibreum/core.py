@@ -3,17 +3,52 @@ import json
 import math
 import os
 import re
+import shutil
 import subprocess
+import warnings
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Mapping, Optional, Set
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Union
 from urllib.parse import quote
 
-from IPython.display import IFrame, display
-from jinja2 import Environment, FileSystemLoader
-
-from .utils import get_id, get_geojson_dict
+from IPython.display import HTML, display
+from jinja2 import Environment
+
+from .utils import external_stacklevel, get_id, get_geojson_dict, round_geojson
+from .templating import create_environment, get_template
+from .serialization import DeferredJSON, buffered, get_json_backend
+from .registry import OrderedRegistry
+from .cache import FragmentCache, payload_digest, payload_length, source_fingerprint
+from .profiling import (
+    PayloadBudgetExceeded,
+    PayloadBudgetWarning,
+    PayloadReport,
+    RenderProfiler,
+    describe_contributors,
+    geojson_counts,
+)
+from .export import (
+    DEFAULT_COMPRESS_THRESHOLD,
+    DEFAULT_INLINE_THRESHOLD,
+    check_compression,
+    compress_inline_sources,
+    export_sidecar_sources,
+    inline_geojson_data,
+    move_staged_sidecars,
+    sidecar_directory,
+)
+from .notebook import (
+    NOTEBOOK_INLINE_THRESHOLD,
+    NOTEBOOK_TRANSPORTS,
+    comm_bootstrap,
+    frontend_exposes_kernel,
+    get_payload_channel,
+    get_temp_cache,
+    iframe_html,
+    relative_src,
+)
 from .babylon import BABYLON_JS_URL, BABYLON_LOADERS_JS_URL, BabylonLayer
 from .cluster import ClusteredGeoJson, MarkerCluster
+from .simplify import SimplifiedGeoJson
 from .layers import Layer
 from .three import ThreeLayer
 from .threejs import ThreeJSLayer
@@ -34,6 +69,7 @@ from .protocols import (
     Protocol,
 )
 from .overlays import ImageOverlay, VideoOverlay
+from . import pmtiles as pmtiles_archive
 
 
 __all__ = [
@@ -308,6 +344,11 @@ _GEOJSON_TYPES = {
 }
 
 
+# Placeholder emitted by the ``tojson`` filter for payloads streamed by
+# :meth:`Map.render_iter`.
+_DEFERRED_TOKEN = re.compile("(\x00maplibreum-(?:deferred|mark)-\\d+\x00)")
+
+
 def _normalise_source_definition(definition):
     """Return a MapLibre source definition, accepting raw GeoJSON objects."""
 
@@ -320,6 +361,24 @@ def _normalise_source_definition(definition):
     return definition
 
 
+def _style_fragment(value):
+    """Return ``value`` as a style dictionary if it is a style JSON fragment.
+
+    JSON text is parsed; mappings count as style fragments when they carry a
+    ``layers`` list or a ``sources`` mapping next to a ``version``.
+    """
+
+    if isinstance(value, (str, bytes)):
+        value = json.loads(value)
+    if not isinstance(value, Mapping):
+        return None
+    if isinstance(value.get("layers"), list):
+        return value
+    if "version" in value and isinstance(value.get("sources"), Mapping):
+        return value
+    return None
+
+
 def _validate_maplibre_version(version):
     """Require MapLibre GL JS 6 or newer for the generated runtime."""
 
@@ -359,6 +418,11 @@ class Map:
         projection=None,
         map_options=None,
         container_id=None,
+        json_backend=None,
+        coordinate_precision=None,
+        max_payload_bytes=None,
+        payload_budget_action="raise",
+        notebook_transport="inline",
     ):
         """Initialize a map instance.
 
@@ -367,6 +431,30 @@ class Map:
         maplibre_version : str, optional
             Version of MapLibre GL JS to load. Defaults to ``6.0.0``.
             Versions older than 6 are not supported.
+        json_backend : str or maplibreum.serialization.JSONBackend, optional
+            Encoder used for the JSON embedded in the page, such as
+            ``"stdlib"``, ``"compact"``, ``"orjson"`` or ``"auto"``. Defaults
+            to the process-wide backend selected with
+            :func:`maplibreum.serialization.set_default_json_backend`.
+        coordinate_precision : int, optional
+            Number of decimal places kept for the coordinates of inline
+            GeoJSON sources when the page is rendered. Sources may override
+            it; the stored data is never modified.
+        max_payload_bytes : int, optional
+            Size budget in bytes for the rendered HTML. Exceeding it when
+            rendering, displaying or saving the map raises
+            :class:`~maplibreum.profiling.PayloadBudgetExceeded` naming the
+            largest contributors.
+        payload_budget_action : {"raise", "warn"}, optional
+            Emit a :class:`~maplibreum.profiling.PayloadBudgetWarning`
+            instead of raising when the budget is exceeded.
+        notebook_transport : {"inline", "files", "comm"}, optional
+            How :meth:`_repr_html_` delivers the page to a notebook.
+            ``"inline"`` embeds it in the iframe ``srcdoc``; ``"files"``
+            (which saves pages to ``maplibreum_maps`` below the working
+            directory) and ``"comm"`` (classic Notebook only) keep only a
+            small bootstrap in the cell output (see
+            :mod:`maplibreum.notebook`).
         """
         self.title = title
         if isinstance(map_style, str) and map_style in MAP_STYLES:
@@ -433,11 +521,27 @@ class Map:
         self.feature_popups: List[Dict[str, Any]] = []
         self.page_elements_before: List[str] = []
         self.page_elements_after: List[str] = []
+        if json_backend is not None:
+            get_json_backend(json_backend)
+        self.json_backend = json_backend
+        self.coordinate_precision = coordinate_precision
+        if payload_budget_action not in ("raise", "warn"):
+            raise ValueError("payload_budget_action must be 'raise' or 'warn'")
+        self.max_payload_bytes = max_payload_bytes
+        if notebook_transport not in NOTEBOOK_TRANSPORTS:
+            raise ValueError(
+                f"notebook_transport must be one of {', '.join(NOTEBOOK_TRANSPORTS)}"
+            )
+        self.notebook_transport = notebook_transport
+        self.payload_budget_action = payload_budget_action
+        # Encoded source definitions reused across renders; see invalidate().
+        self._fragment_cache = FragmentCache()
+        self._payload_digests = FragmentCache()
+        self._source_revisions: Dict[str, int] = {}
 
-        template_dir = os.path.join(os.path.dirname(__file__), "templates")
-        self.env = Environment(loader=FileSystemLoader(template_dir))
-        self.env.filters["tojson"] = lambda value: json.dumps(value)
-        self.template = self.env.get_template("map_template.html")
+        # The compiled template is shared process-wide until ``env`` is used.
+        self._env = None
+        self.template = get_template("map_template.html")
 
         # Unique ID for the map (important if multiple maps displayed in a notebook)
         self.map_id = container_id or get_id("maplibreum_")
@@ -582,7 +686,140 @@ class Map:
         else:
             self.legends.append(Legend(legend))
 
-    def add_source(self, name, definition):
+    @property
+    def env(self):
+        """Jinja2 environment of this map's template.
+
+        Maps share one environment and compiled template (see
+        :mod:`maplibreum.templating`). The first access gives the map its
+        own environment and recompiles its template against it, so filters
+        or globals added here only affect this map.
+        """
+        if self._env is None:
+            self._env = create_environment()
+            self.template = self._env.get_template("map_template.html")
+        return self._env
+
+    @env.setter
+    def env(self, environment):
+        self._env = environment
+
+    @property
+    def sources(self):
+        """Source entries (``{"name", "definition"}``) in insertion order.
+
+        An :class:`~maplibreum.registry.OrderedRegistry` keyed by source
+        name: it can be iterated and indexed like a list, and also supports
+        O(1) ``get``, ``replace``, ``discard`` and ``insert_before``.
+        """
+        return self._sources
+
+    @sources.setter
+    def sources(self, entries):
+        if not isinstance(entries, OrderedRegistry):
+            entries = OrderedRegistry("name", entries)
+        self._sources = entries
+
+    @property
+    def layers(self):
+        """Layer entries (``{"id", "definition", "before"}``) in order.
+
+        An :class:`~maplibreum.registry.OrderedRegistry` keyed by layer id;
+        see :attr:`sources`.
+        """
+        return self._layers
+
+    @layers.setter
+    def layers(self, entries):
+        if not isinstance(entries, OrderedRegistry):
+            entries = OrderedRegistry("id", entries)
+        self._layers = entries
+
+    def get_source(self, name):
+        """Return the definition of the source called ``name``.
+
+        Raises
+        ------
+        KeyError
+            If no such source has been added.
+        """
+        entry = self.sources.get(name)
+        if entry is None:
+            raise KeyError(f"Unknown source '{name}'")
+        return entry["definition"]
+
+    def replace_source(self, name, definition, coordinate_precision=None):
+        """Replace the definition of an existing source, keeping its position.
+
+        Parameters
+        ----------
+        name : str
+            The name of the source to replace.
+        definition : dict or :class:`maplibreum.sources.Source`
+            The new source definition.
+        coordinate_precision : int, optional
+            Decimal places kept for the coordinates of inline GeoJSON data.
+
+        Raises
+        ------
+        KeyError
+            If no such source has been added.
+        """
+        if not self.sources.has(name):
+            raise KeyError(f"Unknown source '{name}'")
+        entry = self._source_entry(name, definition, coordinate_precision)
+        self.sources.replace(name, entry)
+        self._source_revisions[name] = self._source_revisions.get(name, 0) + 1
+        return name
+
+    def remove_source(self, name):
+        """Remove a source and return its definition.
+
+        Layers using the source are left in place.
+
+        Raises
+        ------
+        KeyError
+            If no such source has been added.
+        """
+        entry = self.sources.discard(name)
+        if entry is None:
+            raise KeyError(f"Unknown source '{name}'")
+        self.invalidate(name)
+        return entry["definition"]
+
+    def get_layer(self, layer_id):
+        """Return the definition of the layer ``layer_id``.
+
+        Raises
+        ------
+        KeyError
+            If no such layer has been added.
+        """
+        entry = self.layers.get(layer_id)
+        if entry is None:
+            raise KeyError(f"Unknown layer '{layer_id}'")
+        return entry["definition"]
+
+    def remove_layer(self, layer_id):
+        """Remove a layer and return its definition.
+
+        Raises
+        ------
+        KeyError
+            If no such layer has been added.
+        """
+        entry = self.layers.discard(layer_id)
+        if entry is None:
+            raise KeyError(f"Unknown layer '{layer_id}'")
+        if entry.get("kind") == "deckgl_overlay":
+            config = self._deckgl_overlay_lookup.pop(layer_id, None)
+            self.deckgl_overlays = [
+                overlay for overlay in self.deckgl_overlays if overlay is not config
+            ]
+        return entry["definition"]
+
+    def add_source(self, name, definition, coordinate_precision=None):
         """Add a source definition to the style.
 
         Parameters
@@ -594,12 +831,57 @@ class Map:
             are converted to the underlying dictionary automatically so both the
             plain MapLibre dictionaries and the convenience wrappers are
             supported.
+        coordinate_precision : int, optional
+            Decimal places kept for the coordinates of inline GeoJSON data
+            when rendering. Overrides the map-wide ``coordinate_precision``.
+
+        Adding a source under an existing name replaces it in place with a
+        :class:`FutureWarning`; this will raise :class:`ValueError` in a
+        future release, so use :meth:`replace_source` to change a source.
         """
 
-        payload = _normalise_source_definition(definition)
-        self.sources.append({"name": name, "definition": payload})
+        self.sources.append(self._source_entry(name, definition, coordinate_precision))
+        self._source_revisions[name] = self._source_revisions.get(name, 0) + 1
         return name
 
+    @staticmethod
+    def _source_entry(name, definition, coordinate_precision=None):
+        """Return the registry entry stored for a source."""
+
+        entry = {"name": name, "definition": _normalise_source_definition(definition)}
+        if coordinate_precision is not None:
+            entry["coordinate_precision"] = coordinate_precision
+        elif getattr(definition, "coordinate_precision", None) is not None:
+            # GeoJSONSource.to_dict() already rounded the data; keep the
+            # map-wide precision from rounding it again.
+            entry["coordinate_precision"] = None
+        return entry
+
+    def invalidate(self, *source_names):
+        """Discard cached encodings so the next render re-encodes sources.
+
+        Renders reuse the JSON text of a source until its definition,
+        the identity or feature count of its inline data, or its revision
+        changes. Adding or replacing a source and assigning new ``data``
+        are detected automatically; call this after editing inline data in
+        place, which bumps the revision of the named sources.
+
+        Parameters
+        ----------
+        *source_names : str
+            Sources to invalidate. Without arguments every cached fragment
+            is dropped.
+        """
+        if not source_names:
+            self._fragment_cache.discard()
+            self._payload_digests.discard()
+            return
+        for name in source_names:
+            self._source_revisions[name] = self._source_revisions.get(name, 0) + 1
+        self._fragment_cache.discard(source_names)
+        self._fragment_cache.discard(f"{name}\x00shared" for name in source_names)
+        self._payload_digests.discard(source_names)
+
     def add_layer(self, layer_definition, source=None, before=None):
         """Add a layer to the map.
 
@@ -618,6 +900,12 @@ class Map:
         -------
         str
             The ID of the added layer.
+
+        Notes
+        -----
+        Adding a layer whose ID already exists replaces it in place with a
+        :class:`FutureWarning`; this will raise :class:`ValueError` in a
+        future release.
         """
         if isinstance(layer_definition, BabylonLayer):
             layer_id = layer_definition.id
@@ -647,8 +935,6 @@ class Map:
                 self.add_external_script(script, defer=True)
             config = layer_definition.serialize(before_layer_id=before)
             config.setdefault("enabled", True)
-            self._deckgl_overlay_lookup[layer_id] = config
-            self.deckgl_overlays.append(config)
             self.layers.append(
                 {
                     "id": layer_id,
@@ -658,6 +944,11 @@ class Map:
                     "overlay": config,
                 }
             )
+            replaced = self._deckgl_overlay_lookup.get(layer_id)
+            if replaced is not None:
+                self.deckgl_overlays.remove(replaced)
+            self._deckgl_overlay_lookup[layer_id] = config
+            self.deckgl_overlays.append(config)
             return layer_id
         elif isinstance(layer_definition, CustomGlobeLayer):
             if source is not None:
@@ -690,6 +981,161 @@ class Map:
 
         return layer_id
 
+    def add_sources(self, sources, coordinate_precision=None):
+        """Add several sources in one call.
+
+        Every definition is validated before any source is added, so an
+        invalid entry or a name that is already taken leaves the map
+        unchanged.
+
+        Parameters
+        ----------
+        sources : mapping, iterable of pairs, or style fragment
+            ``{name: definition}``, ``(name, definition)`` pairs, or a
+            MapLibre style dictionary (or JSON text) whose ``sources`` are
+            added.
+        coordinate_precision : int, optional
+            Decimal places kept for inline GeoJSON coordinates of every
+            added source.
+
+        Returns
+        -------
+        list of str
+            The names of the added sources.
+        """
+        fragment = _style_fragment(sources)
+        if fragment is not None:
+            sources = fragment.get("sources") or {}
+        entries = self._source_entries(sources, coordinate_precision)
+        self._insert_sources(entries)
+        return [entry["name"] for entry in entries]
+
+    def _source_entries(self, sources, coordinate_precision=None):
+        """Validate ``sources`` and return their registry entries.
+
+        Raises
+        ------
+        ValueError
+            If a name is not a string or is already taken, or a definition
+            has no ``type``.
+        """
+        items = list(sources.items() if isinstance(sources, Mapping) else sources)
+        entries = []
+        names = set()
+        for name, definition in items:
+            if not isinstance(name, str):
+                raise ValueError(f"Source names must be strings, got {name!r}")
+            if name in names or self.sources.has(name):
+                raise ValueError(f"Source '{name}' already exists")
+            names.add(name)
+            entry = self._source_entry(name, definition, coordinate_precision)
+            if not isinstance(entry["definition"], Mapping) or "type" not in entry["definition"]:
+                raise ValueError(f"Source '{name}' needs a definition with a 'type'")
+            entries.append(entry)
+        return entries
+
+    def _insert_sources(self, entries):
+        """Add validated source entries to the registry."""
+
+        self.sources.extend(entries)
+        revisions = self._source_revisions
+        for entry in entries:
+            revisions[entry["name"]] = revisions.get(entry["name"], 0) + 1
+
+    def add_layers(self, layers, before=None):
+        """Add several layers in one call.
+
+        Plain layer dictionaries skip the per-call type dispatch of
+        :meth:`add_layer`. Every layer (its ``type`` and ``id``, including
+        ids already on the map) is validated up front, so an invalid layer
+        leaves the map unchanged. Layer wrappers (``Layer``, Deck.GL, Three,
+        ...) are still accepted and go through :meth:`add_layer` in order;
+        if one of them fails, everything added by the call is removed again.
+
+        Parameters
+        ----------
+        layers : iterable or style fragment
+            Layer definitions, or a MapLibre style dictionary (or JSON text)
+            whose ``sources`` and ``layers`` are both added. The sources
+            are validated with the layers and only added if every layer is
+            valid.
+        before : str, optional
+            Insert every layer before this layer id.
+
+        Returns
+        -------
+        list of str
+            The IDs of the added layers.
+        """
+        source_entries = []
+        fragment = _style_fragment(layers)
+        if fragment is not None:
+            source_entries = self._source_entries(fragment.get("sources") or {})
+            layers = fragment.get("layers") or []
+        layers = list(layers)
+        ids = set()
+        for position, layer in enumerate(layers):
+            if isinstance(layer, dict):
+                if "type" not in layer:
+                    raise ValueError(f"Layer at position {position} has no 'type'")
+                if "id" in layer and not isinstance(layer["id"], str):
+                    raise ValueError(f"Layer at position {position} has a non-string 'id'")
+                if layer["type"] == "html_cluster":
+                    continue
+            layer_id = layer.get("id") if isinstance(layer, dict) else getattr(layer, "id", None)
+            if layer_id is not None:
+                if layer_id in ids or self.layers.has(layer_id):
+                    raise ValueError(f"Layer '{layer_id}' at position {position} already exists")
+                ids.add(layer_id)
+
+        # Wrappers append to these lists; they are truncated on failure.
+        appended = (
+            self.external_scripts,
+            self._on_load_callbacks,
+            self.deckgl_overlays,
+            self.html_cluster_layers,
+        )
+        lengths = [len(items) for items in appended]
+        revisions = {
+            entry["name"]: self._source_revisions.get(entry["name"])
+            for entry in source_entries
+        }
+        # Sources go in only once every layer has passed validation.
+        self._insert_sources(source_entries)
+        layer_ids = []
+        batch = []
+        try:
+            for layer in layers:
+                if not isinstance(layer, dict):
+                    self.layers.extend(batch)
+                    batch = []
+                    layer_ids.append(self.add_layer(layer, before=before))
+                    continue
+                layer_id = layer.get("id")
+                if layer_id is None:
+                    layer_id = layer["id"] = get_id("layer_")
+                if layer["type"] == "html_cluster":
+                    self.html_cluster_layers.append(layer)
+                else:
+                    batch.append({"id": layer_id, "definition": layer, "before": before})
+                layer_ids.append(layer_id)
+        except BaseException:
+            # Valid ids are all new, so the failing wrapper's id is free to drop.
+            for layer_id in layer_ids + [getattr(layer, "id", None)]:
+                self.layers.discard(layer_id)
+                self._deckgl_overlay_lookup.pop(layer_id, None)
+            for items, length in zip(appended, lengths):
+                del items[length:]
+            for name, revision in revisions.items():
+                self.sources.discard(name)
+                if revision is None:
+                    self._source_revisions.pop(name, None)
+                else:
+                    self._source_revisions[name] = revision
+            raise
+        self.layers.extend(batch)
+        return layer_ids
+
     def set_deckgl_overlay_initial_state(self, overlay_id: str, enabled: bool) -> None:
         """Mark a Deck.GL overlay as enabled/disabled when the map loads."""
 
@@ -982,9 +1428,32 @@ class Map:
         return protocol
 
     def add_pmtiles_source(
-        self, source: Optional[PMTilesSource] = None, **kwargs: Any
+        self,
+        source: Optional[PMTilesSource] = None,
+        *,
+        name: Optional[str] = None,
+        path: Optional[Union[str, os.PathLike]] = None,
+        add_layers: bool = False,
+        **kwargs: Any,
     ) -> PMTilesSource:
-        """Register a PMTiles archive so it is preloaded for MapLibre."""
+        """Register a PMTiles archive so it is preloaded for MapLibre.
+
+        Parameters
+        ----------
+        source : PMTilesSource, optional
+            The archive to register; built from ``kwargs`` when omitted.
+        name : str, optional
+            Also add a map source with this id for the archive. When the
+            archive can be read locally (``path``, or an ``archive_url``
+            naming an existing file) its zoom range, bounds, attribution and
+            tile type are filled in from the archive header and metadata.
+        path : str or path-like, optional
+            Local copy of the archive to inspect.
+        add_layers : bool, optional
+            Also add :meth:`~maplibreum.pmtiles.PMTilesReader.suggested_layers`
+            drawing every layer of the archive. Requires ``name`` and a
+            local archive.
+        """
 
         if source is None:
             source = PMTilesSource(**kwargs)
@@ -1028,6 +1497,19 @@ class Map:
             source.protocol, DEFAULT_PM_TILES_SCRIPT
         )
         self._ensure_pmtiles_script(script_url)
+
+        if path is None and os.path.isfile(source.archive_url):
+            path = source.archive_url
+        if add_layers and (name is None or path is None):
+            raise ValueError("add_layers requires a name and a local archive to inspect")
+        if name is not None:
+            if path is None:
+                self.add_source(name, pmtiles_archive.PMTilesSource(source.style_url))
+            else:
+                with pmtiles_archive.PMTilesReader(path) as reader:
+                    self.add_source(name, reader.source(source.style_url))
+                    if add_layers:
+                        self.add_layers(reader.suggested_layers(name))
         return source
 
     def add_image(self, name, url=None, data=None, options=None):
@@ -2218,6 +2700,8 @@ map.getCanvas().style.cursor = '';
         cluster : MarkerCluster, optional
             Marker cluster to which the marker will be added. When provided,
             the marker is added to the cluster instead of directly to the map.
+            For many points, :meth:`MarkerCluster.add_points` takes
+            coordinate arrays without creating a marker per point.
         icon : Icon, optional
             Custom icon for the marker. If provided, ``color`` is ignored.
         tooltip : str or Tooltip, optional
@@ -2271,6 +2755,51 @@ map.getCanvas().style.cursor = '';
         cluster.add_to(self)
         return cluster
 
+    def add_simplified_geojson(
+        self,
+        data,
+        layers,
+        name=None,
+        bands=None,
+        tolerance=1.0,
+        method="douglas-peucker",
+        before=None,
+    ):
+        """Add GeoJSON as a zoom-banded, pre-simplified set of sources.
+
+        Parameters
+        ----------
+        data : dict or object with ``__geo_interface__``
+            GeoJSON ``FeatureCollection`` to display.
+        layers : list of dict
+            Layer definitions (without ``source``) repeated for every band.
+        name : str, optional
+            Base name for the generated sources and layers.
+        bands : sequence of tuple, optional
+            ``(minzoom, maxzoom)`` pairs; ``maxzoom=None`` keeps the original
+            geometry. Defaults to :data:`maplibreum.simplify.DEFAULT_BANDS`.
+        tolerance : float, optional
+            Simplification tolerance in screen pixels.
+        method : str, optional
+            ``"douglas-peucker"`` (default) or ``"visvalingam"``.
+        before : str, optional
+            Insert the generated layers before this layer id.
+
+        Returns
+        -------
+        SimplifiedGeoJson
+        """
+        simplified = SimplifiedGeoJson(
+            data,
+            layers,
+            name=name,
+            bands=bands,
+            tolerance=tolerance,
+            method=method,
+        )
+        simplified.add_to(self, before=before)
+        return simplified
+
     def add_circle_layer(
         self, name, source, paint=None, layout=None, before=None, filter=None
     ):
@@ -2518,14 +3047,26 @@ map.getCanvas().style.cursor = '';
         
         return button
 
-    def render(self):
-        """Render the map to an HTML string.
+    def _prepare_source(self, source):
+        """Return the source entry to render, applying coordinate precision."""
+
+        precision = source.get("coordinate_precision", self.coordinate_precision)
+        if precision is None:
+            return source
+        data = inline_geojson_data(source["definition"])
+        if data is None:
+            return source
+        return {
+            **source,
+            "definition": {
+                **source["definition"],
+                "data": round_geojson(data, precision),
+            },
+        }
+
+    def _render_context(self):
+        """Collect the keyword arguments passed to the map template."""
 
-        Returns
-        -------
-        str
-            The rendered HTML.
-        """
         # Inject custom CSS to adjust the map div if needed
         # The template expects the unique map container ID to control sizing.
         dimension_css = (
@@ -2561,12 +3102,12 @@ map.getCanvas().style.cursor = '';
             part for part in [self.extra_js, *self._extra_js_snippets] if part
         )
 
-        return self.template.render(
+        return dict(
             title=self.title,
             map_options=map_options,
             bounds=self.bounds,
             bounds_padding=self.bounds_padding,
-            sources=self.sources,
+            sources=list(self.sources),
             controls=self.controls,
             include_minimap=include_minimap,
             include_search=include_search,
@@ -2614,23 +3155,307 @@ map.getCanvas().style.cursor = '';
             feature_popups=self.feature_popups,
             page_elements_before=self.page_elements_before,
             page_elements_after=self.page_elements_after,
+            json_backend=self.json_backend,
+            compression=None,
+            shared_payloads=[],
+        )
+
+    def render(self):
+        """Render the map to an HTML string.
+
+        Returns
+        -------
+        str
+            The rendered HTML.
+        """
+        return "".join(self._stream(self._render_context(), populate=True))
+
+    def render_iter(self) -> Iterator[str]:
+        """Render the map as a stream of HTML chunks.
+
+        Source definitions are JSON-encoded incrementally instead of being
+        materialised as one string, so writing the chunks to a file needs
+        roughly constant extra memory regardless of the size of inline
+        GeoJSON data. Joining the chunks gives the same text as
+        :meth:`render`.
+
+        Yields
+        ------
+        str
+            Consecutive pieces of the rendered HTML document. With
+            ``max_payload_bytes`` set, the budget is checked after the last
+            piece, so consumers must discard the output when iteration
+            raises :class:`~maplibreum.profiling.PayloadBudgetExceeded`.
+        """
+        return self._stream(self._render_context())
+
+    def _source_fragment_key(self, source, backend):
+        """Return the fragment cache key for a source entry."""
+
+        precision = source.get("coordinate_precision", self.coordinate_precision)
+        return source_fingerprint(
+            source["definition"],
+            backend,
+            precision,
+            self._source_revisions.get(source.get("owner", source["name"]), 0),
+        )
+
+    def _encode_source(self, source, backend, populate, use_cache=True):
+        """Yield the JSON text of a source definition, using the cache."""
+
+        key = self._source_fragment_key(source, backend) if use_cache else None
+        cached = self._fragment_cache.get(source["name"], key)
+        if cached is not None:
+            yield cached
+            return
+        definition = self._prepare_source(source)["definition"]
+        if source.get("payload"):
+            definition = definition["data"]
+        if not populate or key is None:
+            yield from backend.iterencode(definition)
+            return
+        pieces = []
+        for piece in backend.iterencode(definition):
+            pieces.append(piece)
+            yield piece
+        self._fragment_cache.put(
+            source["name"], key, "".join(pieces), pin=source["definition"]
+        )
+
+    def _payload_digest(self, source, backend):
+        """Return the content hash of a source's rendered inline data."""
+
+        key = self._source_fragment_key(source, backend)
+        digest = self._payload_digests.get(source["name"], key)
+        if digest is None:
+            data = self._prepare_source(source)["definition"]["data"]
+            digest = payload_digest(backend.iterencode(data))
+            self._payload_digests.put(
+                source["name"], key, digest, pin=source["definition"]
+            )
+        return digest
+
+    def _share_payloads(self, sources, backend):
+        """Emit inline GeoJSON payloads used by several sources only once.
+
+        Sources holding the same data object are grouped directly. Distinct
+        objects are only hashed when their feature counts collide, so the
+        common case costs nothing; digests are cached like fragments, i.e.
+        computed once per data object and source revision.
+
+        Returns
+        -------
+        tuple
+            The source entries to render, where shared sources have their
+            ``data`` removed and a ``shared_data`` index added, and the list
+            of shared payload entries.
+        """
+
+        groups = {}
+        for index, source in enumerate(sources):
+            data = inline_geojson_data(source["definition"])
+            if data is None or "compressed" in source:
+                continue
+            precision = source.get("coordinate_precision", self.coordinate_precision)
+            groups.setdefault((precision, id(data)), []).append(index)
+
+        buckets = {}
+        for (precision, _), members in groups.items():
+            data = sources[members[0]]["definition"]["data"]
+            length = payload_length(data)
+            if length:
+                buckets.setdefault((precision, length), []).append(members)
+        for candidates in buckets.values():
+            if len(candidates) < 2:
+                continue
+            by_digest = {}
+            for members in candidates:
+                digest = self._payload_digest(sources[members[0]], backend)
+                if digest in by_digest:
+                    by_digest[digest].extend(members)
+                    members.clear()
+                else:
+                    by_digest[digest] = members
+
+        rendered = list(sources)
+        shared = []
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            first = sources[members[0]]
+            shared.append(
+                {
+                    "name": f"{first['name']}\x00shared",
+                    "definition": {"type": "geojson", "data": first["definition"]["data"]},
+                    "coordinate_precision": first.get(
+                        "coordinate_precision", self.coordinate_precision
+                    ),
+                    "payload": True,
+                    "owner": first["name"],
+                }
+            )
+            for index in sorted(members):
+                source = sources[index]
+                definition = {
+                    key: value
+                    for key, value in source["definition"].items()
+                    if key != "data"
+                }
+                rendered[index] = {
+                    **source,
+                    "definition": definition,
+                    "shared_data": len(shared) - 1,
+                }
+        return rendered, shared
+
+    def _stream(self, context, populate=False, profiler=None):
+        """Render ``context`` lazily, encoding source definitions in chunks.
+
+        Source definitions whose fingerprint matches a cached fragment are
+        copied from the cache. With ``populate`` the fragments encoded by
+        this render are stored for the next one. A ``profiler`` disables the
+        cache and receives every output piece and section mark unbuffered.
+        """
+
+        backend = get_json_backend(self.json_backend)
+        deferred = {}
+
+        def defer(entries):
+            wrapped = []
+            for source in entries:
+                token = f"\x00maplibreum-deferred-{len(deferred)}\x00"
+                deferred[token] = source
+                wrapped.append(
+                    {**source, "definition": DeferredJSON(source["definition"], token)}
+                )
+            return wrapped
+
+        sources, shared = self._share_payloads(context["sources"], backend)
+        context["sources"] = defer(sources)
+        context["shared_payloads"] = defer(shared)
+        if populate:
+            slots = [source["name"] for source in sources + shared]
+            self._fragment_cache.retain(slots)
+            self._payload_digests.retain(slots)
+
+        def chunks():
+            for chunk in self.template.generate(**context):
+                if "\x00" not in chunk:
+                    yield chunk
+                    continue
+                for piece in _DEFERRED_TOKEN.split(chunk):
+                    if piece in deferred:
+                        yield from self._encode_source(
+                            deferred[piece], backend, populate, profiler is None
+                        )
+                    elif profiler is not None and profiler.is_mark(piece):
+                        profiler.enter(piece)
+                    elif piece:
+                        yield piece
+
+        if profiler is None:
+            if self.max_payload_bytes is None:
+                return buffered(chunks())
+            return self._enforce_budget(buffered(chunks()))
+        context["profile_mark"] = profiler.mark
+
+        def profiled():
+            profiler.start()
+            for piece in chunks():
+                profiler.record(piece)
+                yield piece
+
+        return profiled()
+
+    def _enforce_budget(self, chunks):
+        """Yield ``chunks`` and check the total size against the budget."""
+
+        size = 0
+        for chunk in chunks:
+            size += len(chunk.encode("utf-8"))
+            yield chunk
+        if size <= self.max_payload_bytes:
+            return
+        message = (
+            f"Rendered map is {size:,} bytes, over the budget of "
+            f"{self.max_payload_bytes:,} bytes. Largest contributors: "
+            f"{describe_contributors(self.payload_report().largest())}"
         )
+        if self.payload_budget_action == "warn":
+            warnings.warn(
+                message, PayloadBudgetWarning, stacklevel=external_stacklevel()
+            )
+        else:
+            raise PayloadBudgetExceeded(message)
+
+    def payload_report(self):
+        """Report the serialized size of every part of the rendered map.
+
+        The map is rendered through the same serializer as :meth:`render`,
+        so the byte counts are exact.
+
+        Returns
+        -------
+        maplibreum.profiling.PayloadReport
+            Bytes per source (with feature and vertex counts), layer,
+            image, marker block and inline script section.
+        """
+        counts = {}
+        for source in self.sources:
+            data = inline_geojson_data(source["definition"])
+            if data is not None:
+                counts[source["name"]] = geojson_counts(get_geojson_dict(data))
+        return PayloadReport(self.render_profile(), counts)
+
+    def render_profile(self, path=None):
+        """Render the map and measure the cost of each part of the page.
+
+        The page is rendered without the fragment cache, so the figures
+        reflect a cold render through the same serializer as :meth:`render`.
+
+        Parameters
+        ----------
+        path : str, optional
+            When given, the profile is also written to this file as JSON.
+
+        Returns
+        -------
+        maplibreum.profiling.RenderProfile
+            Time and UTF-8 bytes per template section (``sources``,
+            ``layers``, ``markers``, ``popups``, ``controls``,
+            ``on_load_js``, ...) and per source name and layer id. The
+            rendered document is available as ``profile.html``.
+        """
+        profiler = RenderProfiler()
+        html = "".join(self._stream(self._render_context(), profiler=profiler))
+        profile = profiler.finish(html)
+        if path is not None:
+            profile.to_json(path)
+        return profile
 
     def _repr_html_(self):
-        """Jupyter Notebook display method."""
+        """Jupyter Notebook display method.
+
+        The output depends on ``notebook_transport``; the ``"comm"``
+        transport falls back to ``"inline"`` when no kernel is running or
+        the frontend gives output scripts no access to it.
+        """
         iframe_id = f"{self.map_id}_iframe"
-        escaped_html = html.escape(self.render(), quote=True)
-        style = f"width: {self.width}; height: {self.height}; border: none;"
-        return (
-            f'<iframe id="{iframe_id}" srcdoc="{escaped_html}" '
-            f'style="{style}" loading="lazy"></iframe>'
-        )
+        if self.notebook_transport == "files":
+            path = self._write_notebook_page()
+            return iframe_html(iframe_id, relative_src(path), self.width, self.height)
+        if self.notebook_transport == "comm" and frontend_exposes_kernel():
+            channel = get_payload_channel()
+            if channel.register():
+                token = channel.publish(self._stream(self._render_context(), populate=True))
+                return comm_bootstrap(iframe_id, token, self.width, self.height)
+        return self._srcdoc_iframe(iframe_id, self.width, self.height)
 
     def display_in_notebook(self, width="100%", height="500px"):
         """Display the map in a Jupyter Notebook with a specific size.
 
-        This method writes the map to a temporary HTML file and displays it
-        in an IFrame.
+        The page is embedded in the iframe ``srcdoc``, so the output is
+        self-contained and nothing is written to disk.
 
         Parameters
         ----------
@@ -2639,24 +3464,130 @@ map.getCanvas().style.cursor = '';
         height : str, optional
             The height of the IFrame.
         """
-        # More controlled display using IFrame approach
-        from tempfile import NamedTemporaryFile
+        return display(HTML(self._srcdoc_iframe(f"{self.map_id}_iframe", width, height)))
+
+    def _srcdoc_iframe(self, iframe_id, width, height):
+        """Return an iframe embedding the escaped page in ``srcdoc``."""
+        escaped_html = "".join(
+            html.escape(chunk, quote=True)
+            for chunk in self._stream(self._render_context(), populate=True)
+        )
+        style = f"width: {width}; height: {height}; border: none;"
+        return (
+            f'<iframe id="{iframe_id}" srcdoc="{escaped_html}" '
+            f'style="{style}" loading="lazy"></iframe>'
+        )
 
-        f = NamedTemporaryFile(suffix=".html", delete=False)
-        f.write(self.render().encode("utf-8"))
-        f.close()
-        return display(IFrame(src=f.name, width=width, height=height))
+    def _write_notebook_page(self):
+        """Save the map into the ``"files"`` page cache and return its path."""
+        return get_temp_cache().add(
+            lambda path: self.save(
+                path, data_dir="data", inline_threshold=NOTEBOOK_INLINE_THRESHOLD
+            )
+        )
 
-    def save(self, filepath):
+    def save(
+        self,
+        filepath,
+        data_dir=None,
+        inline_threshold=DEFAULT_INLINE_THRESHOLD,
+        compress=None,
+        compress_threshold=DEFAULT_COMPRESS_THRESHOLD,
+    ):
         """Save the map to an HTML file.
 
+        The document is streamed to disk with :meth:`render_iter`, so large
+        inline sources are never held in memory as a complete HTML string.
+
         Parameters
         ----------
         filepath : str
             The path to the output HTML file.
+        data_dir : str, optional
+            When given, inline GeoJSON sources whose serialized size exceeds
+            ``inline_threshold`` bytes are written to ``.geojson`` files in
+            this directory (relative paths are resolved next to
+            ``filepath``) and referenced by relative URL, so MapLibre fetches
+            and parses them in a web worker. The page must then be served
+            over HTTP rather than opened from ``file://``.
+        inline_threshold : int, optional
+            Size limit in bytes for sources kept inline when ``data_dir`` is
+            set. Defaults to 1 MiB.
+        compress : {"gzip", "deflate"}, optional
+            Keep the page self-contained but store inline GeoJSON sources
+            larger than ``compress_threshold`` bytes as base64-encoded
+            compressed text. The browser inflates them with
+            ``DecompressionStream`` and fills the already registered source
+            with ``setData`` once decoded.
+        compress_threshold : int, optional
+            Size limit in bytes for sources left uncompressed. Defaults to
+            16 KiB.
+
+        Raises
+        ------
+        maplibreum.profiling.PayloadBudgetExceeded
+            If the page is larger than ``max_payload_bytes``. The page and
+            its sidecar files are written to temporary locations first, so
+            ``filepath`` and ``data_dir`` are left untouched.
         """
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(self.render())
+        if compress is not None:
+            compress = check_compression(compress)
+        if self.max_payload_bytes is None:
+            context = self._save_context(
+                filepath, data_dir, inline_threshold, compress, compress_threshold
+            )
+            with open(filepath, "w", encoding="utf-8") as f:
+                f.writelines(self._stream(context))
+            return
+        # The budget is only known to hold once the last chunk is written;
+        # an over-budget page must not replace the file or its sidecars.
+        partial = f"{os.fspath(filepath)}.{os.getpid()}.tmp"
+        target_dir = staging = None
+        if data_dir is not None:
+            target_dir = sidecar_directory(os.fspath(filepath), data_dir)
+            staging = f"{target_dir}.{os.getpid()}.tmp"
+        try:
+            context = self._save_context(
+                filepath, data_dir, inline_threshold, compress, compress_threshold, staging
+            )
+            with open(partial, "w", encoding="utf-8") as f:
+                f.writelines(self._stream(context))
+            if staging is not None:
+                move_staged_sidecars(staging, target_dir)
+            os.replace(partial, filepath)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+            if staging is not None:
+                shutil.rmtree(staging, ignore_errors=True)
+
+    def _save_context(
+        self, filepath, data_dir, inline_threshold, compress, compress_threshold, staging=None
+    ):
+        """Return the render context of :meth:`save`, exporting sources as asked."""
+        context = self._render_context()
+        if data_dir is not None or compress is not None:
+            backend = get_json_backend(self.json_backend)
+            sources = [self._prepare_source(source) for source in context["sources"]]
+            if data_dir is not None:
+                sources = export_sidecar_sources(
+                    sources,
+                    os.fspath(filepath),
+                    data_dir,
+                    inline_threshold,
+                    backend,
+                    staging,
+                )
+            if compress is not None:
+                sources = compress_inline_sources(
+                    sources, compress, compress_threshold, backend
+                )
+                context["compression"] = compress
+            # Coordinates were rounded before export; don't round them again.
+            context["sources"] = [
+                {**source, "coordinate_precision": None} for source in sources
+            ]
+        return context
 
     def export_png(self, filepath, width=None, height=None):
         """Export the map to a PNG image using the MapLibre export CLI.
@@ -2674,9 +3605,8 @@ map.getCanvas().style.cursor = '';
         # to prevent argument injection into the CLI tool.
         abs_filepath = os.path.abspath(filepath)
 
-        html = self.render()
         tmp = NamedTemporaryFile("w", suffix=".html", delete=False, encoding="utf-8")
-        tmp.write(html)
+        tmp.writelines(self.render_iter())
         tmp.close()
 
         cmd = [
@@ -3514,13 +4444,13 @@ class FeatureGroup:
             The name of the feature group.
         """
         self.name = name or get_id("featuregroup_")
-        self.sources = []
-        self.layers = []
+        self.sources = OrderedRegistry("name")
+        self.layers = OrderedRegistry("id")
         self.popups = []
         self.tooltips = []
         self.layer_ids = []
 
-    def add_source(self, name, definition):
+    def add_source(self, name, definition, coordinate_precision=None):
         """Add a source to the feature group.
 
         Parameters
@@ -3529,9 +4459,16 @@ class FeatureGroup:
             The name of the source.
         definition : dict
             The source definition.
+        coordinate_precision : int, optional
+            Decimal places kept for inline GeoJSON coordinates when the map
+            is rendered.
         """
         self.sources.append(
-            {"name": name, "definition": _normalise_source_definition(definition)}
+            {
+                "name": name,
+                "definition": _normalise_source_definition(definition),
+                "coordinate_precision": coordinate_precision,
+            }
         )
 
     def add_layer(self, layer_definition, source=None, before=None):
@@ -3655,7 +4592,11 @@ class FeatureGroup:
         self
         """
         for src in self.sources:
-            map_instance.add_source(src["name"], src["definition"])
+            map_instance.add_source(
+                src["name"],
+                src["definition"],
+                coordinate_precision=src["coordinate_precision"],
+            )
         for layer in self.layers:
             map_instance.add_layer(layer["definition"], before=layer["before"])
         for popup in self.popups:
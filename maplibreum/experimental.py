@@ -6,6 +6,7 @@ import json
 import textwrap
 
 from .core import Map
+from .templating import get_template
 
 
 class MapSynchronizer:
@@ -28,7 +29,7 @@ class MapSynchronizer:
 
     def _render_js(self, map_obj: Map) -> str:
         """Render the JavaScript for synchronization."""
-        template = map_obj.env.get_template("sync_maps.js")
+        template = get_template("sync_maps.js")
         return template.render(
             primary_map_id=self._primary_map.map_id,
             secondary_map_configs=[
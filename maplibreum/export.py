@@ -0,0 +1,348 @@
+"""Helpers for writing map data next to (or compressed inside) a saved page."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+import re
+import zlib
+from pathlib import PurePath
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+from urllib.parse import quote
+
+#: Serialized GeoJSON larger than this many bytes is written to a sidecar file.
+DEFAULT_INLINE_THRESHOLD = 1 << 20
+
+#: Inline GeoJSON larger than this many bytes is compressed by ``save(compress=...)``.
+DEFAULT_COMPRESS_THRESHOLD = 1 << 14
+
+# Formats understood by the browser's DecompressionStream, mapped to zlib wbits.
+COMPRESSION_FORMATS = {"gzip": 31, "deflate": 15}
+
+#: Placeholder data for compressed sources until the browser has inflated them.
+EMPTY_FEATURE_COLLECTION = {"type": "FeatureCollection", "features": []}
+
+
+def inline_geojson_data(definition: Any) -> Optional[Any]:
+    """Return the inline ``data`` of a GeoJSON source definition, if any.
+
+    URLs (string ``data``) and non-GeoJSON sources yield ``None``.
+    """
+
+    if not isinstance(definition, Mapping) or definition.get("type") != "geojson":
+        return None
+    data = definition.get("data")
+    if data is None or isinstance(data, str):
+        return None
+    return data
+
+
+def _sidecar_filename(name: str, used: Set[str], suffix: str) -> str:
+    """Return a filesystem-safe, unique file name for a source."""
+
+    stem = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(name)).strip("._") or "source"
+    candidate = f"{stem}{suffix}"
+    counter = 1
+    while candidate in used:
+        candidate = f"{stem}_{counter}{suffix}"
+        counter += 1
+    used.add(candidate)
+    return candidate
+
+
+def write_if_larger(
+    chunks: Iterable[str], path: str, threshold: int, hasher: Any = None
+) -> bool:
+    """Write ``chunks`` to ``path`` once their UTF-8 size exceeds ``threshold``.
+
+    Chunks are buffered in memory until the threshold is crossed; from then
+    on they are streamed to the file. Returns ``True`` when the file was
+    written and ``False`` when the payload stayed below the threshold (in
+    which case nothing touches the disk). A :mod:`hashlib` object passed as
+    ``hasher`` is updated with every written byte.
+    """
+
+    pending: List[bytes] = []
+    size = 0
+    iterator = iter(chunks)
+    for chunk in iterator:
+        encoded = chunk.encode("utf-8")
+        pending.append(encoded)
+        size += len(encoded)
+        if size > threshold:
+            break
+    else:
+        return False
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as handle:
+        for encoded in pending:
+            if hasher is not None:
+                hasher.update(encoded)
+            handle.write(encoded)
+        pending.clear()
+        for chunk in iterator:
+            encoded = chunk.encode("utf-8")
+            if hasher is not None:
+                hasher.update(encoded)
+            handle.write(encoded)
+    return True
+
+
+def relative_url(path: str, base_dir: str) -> str:
+    """Return ``path`` as a URL relative to ``base_dir``."""
+
+    relative = os.path.relpath(path, base_dir)
+    return quote(PurePath(relative).as_posix())
+
+
+def sidecar_directory(html_path: str, data_dir: str) -> str:
+    """Return the absolute directory sidecar files of ``html_path`` go to."""
+
+    return os.path.join(os.path.dirname(os.path.abspath(html_path)), os.fspath(data_dir))
+
+
+def move_staged_sidecars(staging_dir: str, target_dir: str) -> None:
+    """Move the files staged in ``staging_dir`` into ``target_dir`` and remove it."""
+
+    if not os.path.isdir(staging_dir):
+        return
+    os.makedirs(target_dir, exist_ok=True)
+    for filename in os.listdir(staging_dir):
+        os.replace(os.path.join(staging_dir, filename), os.path.join(target_dir, filename))
+    os.rmdir(staging_dir)
+
+
+def export_sidecar_sources(
+    sources: Iterable[Dict[str, Any]],
+    html_path: str,
+    data_dir: str,
+    inline_threshold: int,
+    backend: Any,
+    staging_dir: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Move large inline GeoJSON payloads into files next to ``html_path``.
+
+    Parameters
+    ----------
+    sources : iterable of dict
+        Source entries as stored in :attr:`maplibreum.core.Map.sources`.
+    html_path : str
+        Path of the HTML document being written.
+    data_dir : str
+        Directory for the sidecar files. Relative paths are resolved
+        against the directory containing ``html_path``.
+    inline_threshold : int
+        Payloads whose serialized size exceeds this many bytes are written
+        to disk; smaller ones stay inline.
+    backend : maplibreum.serialization.JSONBackend
+        Encoder used to write the files.
+    staging_dir : str, optional
+        Write the files here instead, while still referencing them in
+        ``data_dir``; :func:`move_staged_sidecars` moves them into place.
+
+    Returns
+    -------
+    list of dict
+        Source entries to render. Exported entries carry a copy of their
+        definition whose ``data`` is the relative URL of the sidecar file;
+        the caller's definitions are left untouched. Sources with identical
+        payloads share one file.
+    """
+
+    html_dir = os.path.dirname(os.path.abspath(html_path))
+    target_dir = sidecar_directory(html_path, data_dir)
+    write_dir = target_dir if staging_dir is None else staging_dir
+    used: Set[str] = set()
+    by_identity: Dict[int, Tuple[Any, str]] = {}
+    by_digest: Dict[str, str] = {}
+    rendered = []
+    for source in sources:
+        definition = source["definition"]
+        data = inline_geojson_data(definition)
+        if data is None:
+            rendered.append(source)
+            continue
+        known = by_identity.get(id(data))
+        if known is not None:
+            url = known[1]
+        else:
+            filename = _sidecar_filename(source["name"], used, ".geojson")
+            path = os.path.join(write_dir, filename)
+            hasher = hashlib.blake2b(digest_size=16)
+            if not write_if_larger(
+                backend.iterencode(data), path, inline_threshold, hasher
+            ):
+                used.discard(filename)
+                rendered.append(source)
+                continue
+            url = relative_url(os.path.join(target_dir, filename), html_dir)
+            digest = hasher.hexdigest()
+            if digest in by_digest:
+                # Same content as an earlier file: point at that one instead.
+                os.remove(path)
+                used.discard(filename)
+                url = by_digest[digest]
+            else:
+                by_digest[digest] = url
+            by_identity[id(data)] = (data, url)
+        rendered.append({**source, "definition": {**definition, "data": url}})
+    return rendered
+
+
+def check_compression(method: str) -> str:
+    """Validate a ``compress`` argument and return the format name."""
+
+    if method in COMPRESSION_FORMATS:
+        return method
+    if method == "brotli":
+        raise ValueError(
+            "Brotli payloads cannot be decoded with the browser's "
+            "DecompressionStream; use compress='gzip'"
+        )
+    raise ValueError(
+        f"Unknown compression '{method}'. "
+        f"Available formats: {', '.join(COMPRESSION_FORMATS)}"
+    )
+
+
+def compress_chunks(
+    chunks: Iterable[str], method: str, hasher: Any = None, threshold: Optional[int] = None
+) -> Tuple[Optional[bytes], int]:
+    """Compress text chunks incrementally.
+
+    A :mod:`hashlib` object passed as ``hasher`` is updated with the
+    uncompressed bytes. With a ``threshold``, chunks are only buffered
+    until their UTF-8 size exceeds it, as in :func:`write_if_larger`;
+    smaller payloads are measured but neither compressed nor hashed.
+
+    Returns
+    -------
+    tuple
+        The compressed bytes (``None`` when the payload stayed within
+        ``threshold``) and the size of the uncompressed UTF-8 text.
+    """
+
+    pending: List[bytes] = []
+    size = 0
+    iterator = iter(chunks)
+    if threshold is not None:
+        for chunk in iterator:
+            encoded = chunk.encode("utf-8")
+            pending.append(encoded)
+            size += len(encoded)
+            if size > threshold:
+                break
+        else:
+            return None, size
+
+    compressor = zlib.compressobj(9, zlib.DEFLATED, COMPRESSION_FORMATS[method])
+    parts: List[bytes] = []
+    for encoded in pending:
+        if hasher is not None:
+            hasher.update(encoded)
+        parts.append(compressor.compress(encoded))
+    pending.clear()
+    for chunk in iterator:
+        encoded = chunk.encode("utf-8")
+        size += len(encoded)
+        if hasher is not None:
+            hasher.update(encoded)
+        parts.append(compressor.compress(encoded))
+    parts.append(compressor.flush())
+    return b"".join(parts), size
+
+
+def compress_inline_sources(
+    sources: Iterable[Dict[str, Any]],
+    method: str,
+    threshold: int,
+    backend: Any,
+) -> List[Dict[str, Any]]:
+    """Replace large inline GeoJSON payloads with base64 compressed text.
+
+    Parameters
+    ----------
+    sources : iterable of dict
+        Source entries as stored in :attr:`maplibreum.core.Map.sources`.
+    method : str
+        ``"gzip"`` or ``"deflate"``.
+    threshold : int
+        Payloads whose serialized size exceeds this many bytes are
+        compressed; smaller ones stay as plain JSON.
+    backend : maplibreum.serialization.JSONBackend
+        Encoder used for the payload before compression.
+
+    Returns
+    -------
+    list of dict
+        Source entries to render. Compressed entries carry an empty
+        FeatureCollection as ``data`` and the encoded payload under
+        ``"compressed"``, with the names of the sources to fill under
+        ``"inflate"``; the caller's definitions are left untouched. Sources
+        with identical payloads share the first one's and have
+        ``"compressed"`` set to ``None``.
+    """
+
+    by_identity: Dict[int, Tuple[Any, Optional[Dict[str, Any]]]] = {}
+    by_digest: Dict[str, Dict[str, Any]] = {}
+    rendered = []
+    for source in sources:
+        definition = source["definition"]
+        data = inline_geojson_data(definition)
+        if data is None:
+            rendered.append(source)
+            continue
+        known = by_identity.get(id(data))
+        if known is not None:
+            owner = known[1]
+        else:
+            hasher = hashlib.blake2b(digest_size=16)
+            payload, _ = compress_chunks(
+                backend.iterencode(data), method, hasher, threshold
+            )
+            owner = None
+            if payload is not None:
+                digest = hasher.hexdigest()
+                owner = by_digest.get(digest)
+                if owner is None:
+                    owner = by_digest[digest] = {
+                        **source,
+                        "definition": {**definition, "data": EMPTY_FEATURE_COLLECTION},
+                        "compressed": base64.b64encode(payload).decode("ascii"),
+                        "inflate": [source["name"]],
+                    }
+                    by_identity[id(data)] = (data, owner)
+                    rendered.append(owner)
+                    continue
+            by_identity[id(data)] = (data, owner)
+        if owner is None:
+            rendered.append(source)
+            continue
+        # Same content as an earlier source: that payload fills this one too.
+        owner["inflate"].append(source["name"])
+        rendered.append(
+            {
+                **source,
+                "definition": {**definition, "data": EMPTY_FEATURE_COLLECTION},
+                "compressed": None,
+            }
+        )
+    return rendered
+
+
+__all__ = [
+    "COMPRESSION_FORMATS",
+    "DEFAULT_COMPRESS_THRESHOLD",
+    "DEFAULT_INLINE_THRESHOLD",
+    "check_compression",
+    "compress_chunks",
+    "compress_inline_sources",
+    "export_sidecar_sources",
+    "inline_geojson_data",
+    "move_staged_sidecars",
+    "relative_url",
+    "sidecar_directory",
+    "write_if_larger",
+]
@@ -164,7 +164,11 @@ class HTMLClusterLayer(Layer):
         colors : list of str
             A list of colors to use for the cluster visualization.
         properties : list of str
-            A list of property names from the source data to visualize.
+            A list of numeric cluster property names to visualize, computed
+            either in the browser through the source's ``clusterProperties``
+            or ahead of time through the ``aggregates`` of a
+            :class:`~maplibreum.cluster.Supercluster` whose output feeds the
+            source.
         **kwargs : Any
             Additional options.
         """
@@ -0,0 +1,482 @@
+"""Mapbox Vector Tile encoding and decoding without external tooling.
+
+Tiles follow version 2.1 of the Mapbox Vector Tile specification. Geometry is
+given in integer tile coordinates (``0..extent``, plus any buffer); command
+and zigzag-delta encoding is vectorized with NumPy and the protobuf messages
+are written by hand, so no protobuf compiler or runtime is needed.
+
+Features passed to :func:`encode_tile` are dictionaries with
+
+``type``
+    :data:`POINT`, :data:`LINESTRING` or :data:`POLYGON`.
+``geometry``
+    For points and lines, a list of ``(N, 2)`` coordinate arrays (one per
+    point group or line). For polygons, a list of polygons, each a list of
+    rings with the exterior ring first. Rings may repeat their first vertex
+    at the end; winding is corrected to the specification's convention.
+``properties``
+    Optional mapping of attribute values. ``None`` values are skipped,
+    lists and dictionaries are stored as JSON text.
+``id``
+    Optional non-negative integer feature ID.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+POINT = 1
+LINESTRING = 2
+POLYGON = 3
+
+#: Default number of integer units per tile side.
+DEFAULT_EXTENT = 4096
+
+_MOVE_TO = 1
+_LINE_TO = 2
+_CLOSE_PATH = 7
+_CLOSE = (1 << 3) | _CLOSE_PATH
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _write_bytes(out: bytearray, field: int, payload: bytes) -> None:
+    _write_varint(out, (field << 3) | 2)
+    _write_varint(out, len(payload))
+    out += payload
+
+
+def _write_packed(out: bytearray, field: int, values: Iterable[int]) -> None:
+    packed = bytearray()
+    for value in values:
+        _write_varint(packed, value)
+    _write_bytes(out, field, packed)
+
+
+def _command(command: int, count: int) -> int:
+    return (count << 3) | command
+
+
+def _zigzag(values: np.ndarray) -> np.ndarray:
+    return (values << 1) ^ (values >> 63)
+
+
+def _varints(values: np.ndarray) -> Tuple[bytes, np.ndarray]:
+    """Varint-encode non-negative ``values``; return the bytes and end offsets."""
+
+    values = np.asarray(values, dtype=np.uint64)
+    sizes = np.ones(len(values), dtype=np.intp)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        sizes += rest > 0
+        rest >>= np.uint64(7)
+    ends = np.cumsum(sizes)
+    starts = ends - sizes
+    out = np.empty(int(ends[-1]) if len(ends) else 0, dtype=np.uint8)
+    for position in range(int(sizes.max()) if len(sizes) else 0):
+        selected = sizes > position
+        byte = (values[selected] >> np.uint64(7 * position)) & np.uint64(0x7F)
+        more = (sizes[selected] > position + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[selected] + position] = byte | more
+    return out.tobytes(), ends
+
+
+def _encode_geometries(items: List[Tuple[int, Any]]) -> List[List[int]]:
+    """Return command integers for many ``(geom_type, geometry)`` pairs.
+
+    All vertices are opened, rewound and delta-encoded in a single pass, so
+    the cost per feature is a few list operations rather than a round of
+    NumPy calls.
+    """
+
+    arrays: List[np.ndarray] = []
+    owners: List[int] = []
+    rings: List[int] = []
+    for index, (geom_type, geometry) in enumerate(items):
+        if geom_type == POLYGON:
+            for polygon in geometry:
+                for ring_index, ring in enumerate(polygon):
+                    arrays.append(ring)
+                    owners.append(index)
+                    rings.append(ring_index)
+        else:
+            for part in geometry:
+                arrays.append(part)
+                owners.append(index)
+                rings.append(-1)
+    commands: List[List[int]] = [[] for _ in items]
+    if not arrays:
+        return commands
+
+    arrays = [np.asarray(array, dtype=np.int64).reshape(-1, 2) for array in arrays]
+    count = len(arrays)
+    sizes = np.fromiter(map(len, arrays), dtype=np.intp, count=count)
+    vertices = np.concatenate(arrays)
+    part = np.repeat(np.arange(count), sizes)
+    ring_index = np.asarray(rings)
+    is_ring = ring_index >= 0
+
+    if is_ring.any():
+        # Rings are written open (ClosePath repeats the first vertex), and
+        # rings left with fewer than three vertices are dropped.
+        starts = np.cumsum(sizes) - sizes
+        lasts = starts + sizes - 1
+        candidates = np.flatnonzero(is_ring & (sizes > 1))
+        closed = np.zeros(count, dtype=bool)
+        closed[candidates] = (vertices[starts[candidates]] == vertices[lasts[candidates]]).all(1)
+        keep = (is_ring & (sizes - closed < 3))[part]
+        np.logical_not(keep, out=keep)
+        keep[lasts[closed]] = False
+        vertices, part = vertices[keep], part[keep]
+        sizes = np.bincount(part, minlength=count)
+
+        # Exterior rings are clockwise in tile space (y down), which is a
+        # positive shoelace sum; holes are the opposite.
+        starts = np.cumsum(sizes) - sizes
+        following = np.arange(1, len(vertices) + 1)
+        nonempty = sizes > 0
+        following[(starts + sizes - 1)[nonempty]] = starts[nonempty]
+        cross = vertices[:, 0] * vertices[following, 1] - vertices[following, 0] * vertices[:, 1]
+        area = np.bincount(part, cross.astype(float), minlength=count)
+        reverse = (is_ring & nonempty & ((area > 0) != (ring_index == 0)))[part]
+        if reverse.any():
+            order = np.arange(len(vertices))
+            first = starts[part]
+            order[reverse] = (2 * first + sizes[part] - 1 - order)[reverse]
+            vertices = vertices[order]
+
+    owner = np.asarray(owners)[part]
+    previous = np.empty_like(vertices)
+    previous[1:] = vertices[:-1]
+    if len(vertices):
+        previous[0] = 0
+        previous[1:][owner[1:] != owner[:-1]] = 0
+    deltas = vertices - previous
+    encoded = _zigzag(deltas).ravel().tolist()
+
+    totals = np.bincount(owners, sizes, minlength=len(items)).astype(int).tolist()
+    offset = 0
+    for index, size in zip(owners, sizes.tolist()):
+        if not size:
+            continue
+        geom_type = items[index][0]
+        out = commands[index]
+        end = offset + 2 * size
+        if geom_type == POINT:
+            if not out:
+                out.append(_command(_MOVE_TO, totals[index]))
+            out += encoded[offset:end]
+        else:
+            out.append(_command(_MOVE_TO, 1))
+            out += encoded[offset : offset + 2]
+            if size > 1:
+                out.append(_command(_LINE_TO, size - 1))
+                out += encoded[offset + 2 : end]
+            if geom_type == POLYGON:
+                out.append(_CLOSE)
+        offset = end
+    return commands
+
+
+def _pack_all(commands: List[List[int]]) -> List[bytes]:
+    """Varint-pack each list of command integers."""
+
+    counts = [len(values) for values in commands]
+    total = sum(counts)
+    data, ends = _varints(
+        np.fromiter(chain.from_iterable(commands), dtype=np.uint64, count=total)
+    )
+    bounds = np.concatenate(([0], ends))[np.cumsum([0] + counts)].tolist()
+    return [data[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def encode_geometry(geom_type: int, geometry: Any) -> List[int]:
+    """Return the command integers for one feature's geometry.
+
+    Parameters
+    ----------
+    geom_type : int
+        :data:`POINT`, :data:`LINESTRING` or :data:`POLYGON`.
+    geometry : list
+        Coordinate arrays as described in the module documentation.
+    """
+
+    return _encode_geometries([(geom_type, geometry)])[0]
+
+
+class _LayerBuilder:
+    def __init__(self, name: str, extent: int):
+        self.name = name
+        self.extent = extent
+        self.keys: Dict[str, int] = {}
+        self.values: Dict[Tuple[type, Any], int] = {}
+        self.features = bytearray()
+        self._tag_cache: Dict[int, Tuple[Mapping[str, Any], bytes]] = {}
+
+    def _tags(self, properties: Optional[Mapping[str, Any]]) -> bytes:
+        """Return the packed ``tags`` field for ``properties``."""
+
+        if not properties:
+            return b""
+        # Clipped pieces of one feature share its properties mapping.
+        cached = self._tag_cache.get(id(properties))
+        if cached is not None and cached[0] is properties:
+            return cached[1]
+        tags: List[int] = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            if isinstance(value, (dict, list, tuple)):
+                value = json.dumps(value, separators=(",", ":"))
+            elif isinstance(value, np.generic):
+                value = value.item()
+            key_index = self.keys.setdefault(str(key), len(self.keys))
+            value_index = self.values.setdefault((type(value), value), len(self.values))
+            tags += (key_index, value_index)
+        field = bytearray()
+        if tags:
+            _write_packed(field, 2, tags)
+        self._tag_cache[id(properties)] = (properties, bytes(field))
+        return bytes(field)
+
+    def add(self, feature: Mapping[str, Any], geometry: bytes) -> None:
+        """Add ``feature`` with its varint-packed geometry commands."""
+
+        message = bytearray()
+        feature_id = feature.get("id")
+        if isinstance(feature_id, (int, np.integer)) and not isinstance(feature_id, bool):
+            if feature_id >= 0:
+                message.append(1 << 3)
+                _write_varint(message, int(feature_id))
+        message += self._tags(feature.get("properties"))
+        message += bytes((3 << 3, feature["type"], (4 << 3) | 2))
+        _write_varint(message, len(geometry))
+        message += geometry
+        self.features.append((2 << 3) | 2)
+        _write_varint(self.features, len(message))
+        self.features += message
+
+    def to_bytes(self) -> bytes:
+        out = bytearray()
+        _write_varint(out, 15 << 3)
+        _write_varint(out, 2)
+        _write_bytes(out, 1, self.name.encode("utf-8"))
+        out += self.features
+        for key in self.keys:
+            _write_bytes(out, 3, key.encode("utf-8"))
+        for value_type, value in self.values:
+            _write_bytes(out, 4, _encode_value(value_type, value))
+        _write_varint(out, 5 << 3)
+        _write_varint(out, self.extent)
+        return bytes(out)
+
+
+def _encode_value(value_type: type, value: Any) -> bytes:
+    out = bytearray()
+    if value_type is bool:
+        _write_varint(out, 7 << 3)
+        _write_varint(out, int(value))
+    elif value_type is int and -(1 << 63) <= value < (1 << 64):
+        if value >= 0:
+            _write_varint(out, 5 << 3)
+            _write_varint(out, value)
+        else:
+            _write_varint(out, 6 << 3)
+            _write_varint(out, (value << 1) ^ (value >> 63))
+    elif value_type is float:
+        _write_varint(out, (3 << 3) | 1)
+        out += struct.pack("<d", value)
+    else:
+        _write_bytes(out, 1, str(value).encode("utf-8"))
+    return bytes(out)
+
+
+def encode_tile(
+    layers: Mapping[str, Iterable[Mapping[str, Any]]], extent: int = DEFAULT_EXTENT
+) -> bytes:
+    """Encode features into an (uncompressed) vector tile.
+
+    Parameters
+    ----------
+    layers : mapping
+        ``{layer_name: features}``; see the module documentation for the
+        feature format. Layers without encodable features are omitted.
+    extent : int, optional
+        Integer units per tile side.
+
+    Returns
+    -------
+    bytes
+        The protobuf-encoded tile; empty when no layer has features.
+    """
+
+    out = bytearray()
+    for name, features in layers.items():
+        features = list(features)
+        geometries = _pack_all(
+            _encode_geometries([(feature["type"], feature["geometry"]) for feature in features])
+        )
+        builder = _LayerBuilder(name, extent)
+        for feature, geometry in zip(features, geometries):
+            if geometry:
+                builder.add(feature, geometry)
+        if builder.features:
+            _write_bytes(out, 3, builder.to_bytes())
+    return bytes(out)
+
+
+# -- decoding ----------------------------------------------------------------
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _fields(data: bytes):
+    pos, end = 0, len(data)
+    while pos < end:
+        key, pos = _read_varint(data, pos)
+        field, wire = key >> 3, key & 7
+        if wire == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire == 1:
+            value, pos = data[pos : pos + 8], pos + 8
+        elif wire == 2:
+            length, pos = _read_varint(data, pos)
+            value, pos = data[pos : pos + length], pos + length
+        elif wire == 5:
+            value, pos = data[pos : pos + 4], pos + 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire}")
+        yield field, wire, value
+
+
+def _packed(data: bytes) -> List[int]:
+    values, pos = [], 0
+    while pos < len(data):
+        value, pos = _read_varint(data, pos)
+        values.append(value)
+    return values
+
+
+def _unzigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+def _decode_value(data: bytes) -> Any:
+    for field, _, value in _fields(data):
+        if field == 1:
+            return value.decode("utf-8")
+        if field == 2:
+            return struct.unpack("<f", value)[0]
+        if field == 3:
+            return struct.unpack("<d", value)[0]
+        if field == 4:
+            return value - (1 << 64) if value >= 1 << 63 else value
+        if field == 5:
+            return value
+        if field == 6:
+            return _unzigzag(value)
+        if field == 7:
+            return bool(value)
+    return None
+
+
+def _decode_geometry(commands: List[int]) -> List[List[List[int]]]:
+    parts: List[List[List[int]]] = []
+    x = y = 0
+    pos = 0
+    while pos < len(commands):
+        command, count = commands[pos] & 7, commands[pos] >> 3
+        pos += 1
+        if command == _CLOSE_PATH:
+            if parts and parts[-1]:
+                parts[-1].append(list(parts[-1][0]))
+            continue
+        for _ in range(count):
+            x += _unzigzag(commands[pos])
+            y += _unzigzag(commands[pos + 1])
+            pos += 2
+            if command == _MOVE_TO:
+                parts.append([])
+            parts[-1].append([x, y])
+    return parts
+
+
+def decode_tile(data: bytes) -> Dict[str, Dict[str, Any]]:
+    """Decode an (uncompressed) vector tile for inspection.
+
+    Returns
+    -------
+    dict
+        ``{layer_name: {"extent": int, "features": [...]}}`` where each
+        feature has ``type``, ``properties``, ``id`` (or ``None``) and
+        ``geometry`` as a list of parts in tile coordinates (closed rings
+        repeat their first vertex).
+    """
+
+    layers: Dict[str, Dict[str, Any]] = {}
+    for field, _, layer_bytes in _fields(data):
+        if field != 3:
+            continue
+        name, extent = "", DEFAULT_EXTENT
+        keys: List[str] = []
+        values: List[Any] = []
+        raw_features: List[bytes] = []
+        for layer_field, _, value in _fields(layer_bytes):
+            if layer_field == 1:
+                name = value.decode("utf-8")
+            elif layer_field == 2:
+                raw_features.append(value)
+            elif layer_field == 3:
+                keys.append(value.decode("utf-8"))
+            elif layer_field == 4:
+                values.append(_decode_value(value))
+            elif layer_field == 5:
+                extent = value
+        features = []
+        for raw in raw_features:
+            feature: Dict[str, Any] = {"id": None, "type": 0, "properties": {}, "geometry": []}
+            for feature_field, _, value in _fields(raw):
+                if feature_field == 1:
+                    feature["id"] = value
+                elif feature_field == 2:
+                    tags = _packed(value)
+                    feature["properties"] = {
+                        keys[tags[i]]: values[tags[i + 1]] for i in range(0, len(tags), 2)
+                    }
+                elif feature_field == 3:
+                    feature["type"] = value
+                elif feature_field == 4:
+                    feature["geometry"] = _decode_geometry(_packed(value))
+            features.append(feature)
+        layers[name] = {"extent": extent, "features": features}
+    return layers
+
+
+__all__ = [
+    "DEFAULT_EXTENT",
+    "LINESTRING",
+    "POINT",
+    "POLYGON",
+    "decode_tile",
+    "encode_geometry",
+    "encode_tile",
+]
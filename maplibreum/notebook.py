@@ -0,0 +1,407 @@
+"""Notebook display transports that keep map payloads out of the notebook.
+
+The default ``_repr_html_`` output escapes the whole page into an iframe
+``srcdoc`` attribute, so every inline GeoJSON payload is stored (escaped) in
+the ``.ipynb`` file. The transports here keep only a small bootstrap in the
+cell output:
+
+``"files"``
+    The page is saved to a bounded :class:`TempFileCache` in
+    ``maplibreum_maps`` below the kernel's working directory, with large
+    sources written to sidecar ``.geojson`` files, and the output is an
+    iframe referencing it by relative URL. The Jupyter server serves the
+    files, and MapLibre fetches the sidecars in a web worker. Choosing this
+    transport is what creates the directory.
+``"comm"``
+    The page is kept in memory by a :class:`PayloadChannel` and sent to the
+    browser over a Jupyter comm when the output is shown; the bootstrap
+    assembles it into a ``Blob`` and points the iframe at its object URL.
+    This needs a frontend exposing the kernel to output scripts, which only
+    the classic Notebook does. Kernels started by JupyterLab, Notebook 7 or
+    another ``jupyter_server`` frontend (see :func:`frontend_exposes_kernel`)
+    get the inline output instead.
+
+Neither transport can show the map again once the kernel is gone or the
+cached page has been evicted; re-run the cell to redisplay it.
+"""
+
+from __future__ import annotations
+
+import atexit
+import html
+import json
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Set
+
+#: Transports accepted by ``Map(notebook_transport=...)``.
+NOTEBOOK_TRANSPORTS = ("inline", "files", "comm")
+
+#: Sources larger than this many bytes are written next to pages in the cache.
+NOTEBOOK_INLINE_THRESHOLD = 1 << 16
+
+#: Comm target the ``"comm"`` bootstrap opens to request its page.
+COMM_TARGET = "maplibreum.page"
+
+
+def _tree_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class TempFileCache:
+    """Bounded directory of generated pages for notebook IFrames.
+
+    Each entry is a subdirectory holding one page and its sidecar files.
+    Once more than ``max_entries`` entries exist, or they take up more than
+    ``max_bytes``, the oldest entries are deleted; the newest entry is always
+    kept. Caches holding entries are cleared when the interpreter exits.
+
+    Parameters
+    ----------
+    directory : str or path-like, optional
+        Where entries are created. Defaults to a private directory in the
+        system temporary directory, which is removed on exit.
+    max_entries : int, optional
+        Maximum number of cached pages.
+    max_bytes : int, optional
+        Maximum total size of the cached pages and their sidecars.
+    """
+
+    def __init__(self, directory=None, max_entries: int = 16, max_bytes: int = 256 << 20):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self._owned = directory is None
+        self.directory = Path(
+            tempfile.mkdtemp(prefix="maplibreum-") if directory is None else directory
+        )
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, write: Callable[[Path], Any], filename: str = "map.html") -> Path:
+        """Create an entry, let ``write`` fill it and return the page path.
+
+        Parameters
+        ----------
+        write : callable
+            Called with the page path to create inside the new entry.
+        filename : str, optional
+            File name of the page within the entry.
+        """
+
+        _open_caches.add(self)
+        token = uuid.uuid4().hex
+        entry = self.directory / token
+        entry.mkdir(parents=True)
+        path = entry / filename
+        try:
+            write(path)
+        except BaseException:
+            shutil.rmtree(entry, ignore_errors=True)
+            raise
+        with self._lock:
+            self._entries[token] = _tree_size(entry)
+            self._trim()
+        return path
+
+    def _trim(self) -> None:
+        total = sum(self._entries.values())
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or total > self.max_bytes
+        ):
+            token, size = self._entries.popitem(last=False)
+            total -= size
+            shutil.rmtree(self.directory / token, ignore_errors=True)
+
+    def paths(self) -> List[Path]:
+        """Return the page directories currently cached, oldest first."""
+
+        with self._lock:
+            return [self.directory / token for token in self._entries]
+
+    @property
+    def size(self) -> int:
+        """Total size in bytes of the cached entries."""
+
+        with self._lock:
+            return sum(self._entries.values())
+
+    def clear(self) -> None:
+        """Delete every cached entry (and the directory if it was created here)."""
+
+        _open_caches.discard(self)
+        with self._lock:
+            for token in self._entries:
+                shutil.rmtree(self.directory / token, ignore_errors=True)
+            self._entries.clear()
+            if self._owned:
+                shutil.rmtree(self.directory, ignore_errors=True)
+            else:
+                try:
+                    self.directory.rmdir()
+                except OSError:
+                    pass
+
+
+# Caches with entries on disk; a single exit handler clears them all.
+_open_caches: Set[TempFileCache] = set()
+
+
+@atexit.register
+def _clear_open_caches() -> None:
+    for cache in list(_open_caches):
+        cache.clear()
+
+
+def frontend_exposes_kernel() -> bool:
+    """Return whether output scripts can reach the kernel through ``Jupyter``.
+
+    ``jupyter_server`` sets ``JPY_SESSION_NAME`` in the environment of the
+    kernels it starts; its frontends (JupyterLab, Notebook 7, nbclassic on
+    ``jupyter_server``) give output scripts no handle on the kernel, so the
+    ``"comm"`` transport renders inline there. The classic Notebook server
+    does not set it.
+    """
+
+    return "JPY_SESSION_NAME" not in os.environ
+
+
+def _comm_manager():
+    """Return the running kernel's comm manager, or ``None`` outside a kernel."""
+
+    try:
+        from IPython import get_ipython
+    except ImportError:  # pragma: no cover - IPython is a dependency
+        return None
+    shell = get_ipython()
+    kernel = getattr(shell, "kernel", None)
+    if kernel is None:
+        return None
+    try:
+        import comm
+    except ImportError:
+        return getattr(kernel, "comm_manager", None)
+    return comm.get_comm_manager()
+
+
+class PayloadChannel:
+    """Serve rendered pages to notebook outputs over a Jupyter comm.
+
+    Pages are held in a bounded least-recently-used store keyed by a random
+    token embedded in the bootstrap output; they are sent in chunks of
+    ``chunk_size`` characters when the output opens a comm on
+    :data:`COMM_TARGET`.
+
+    Parameters
+    ----------
+    max_entries : int, optional
+        Maximum number of pages kept for redisplay.
+    max_bytes : int, optional
+        Maximum total size of the kept pages.
+    chunk_size : int, optional
+        Characters per comm message.
+    """
+
+    def __init__(
+        self, max_entries: int = 8, max_bytes: int = 256 << 20, chunk_size: int = 1 << 20
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self._pages: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._manager = None
+
+    def register(self) -> bool:
+        """Register the comm target on the running kernel.
+
+        Returns ``False`` when no kernel is running.
+        """
+
+        if self._manager is not None:
+            return True
+        manager = _comm_manager()
+        if manager is None:
+            return False
+        manager.register_target(COMM_TARGET, self._on_open)
+        self._manager = manager
+        return True
+
+    def publish(self, chunks: Iterable[str]) -> str:
+        """Store a page and return the token the bootstrap requests it by."""
+
+        parts: List[str] = []
+        pending: List[str] = []
+        pending_size = 0
+        size = 0
+        for chunk in chunks:
+            pending.append(chunk)
+            pending_size += len(chunk)
+            if pending_size >= self.chunk_size:
+                text = "".join(pending)
+                parts.extend(
+                    text[start : start + self.chunk_size]
+                    for start in range(0, len(text), self.chunk_size)
+                )
+                size += len(text)
+                pending, pending_size = [], 0
+        if pending or not parts:
+            text = "".join(pending)
+            parts.append(text)
+            size += len(text)
+        token = uuid.uuid4().hex
+        with self._lock:
+            self._pages[token] = (parts, size)
+            total = sum(entry[1] for entry in self._pages.values())
+            while len(self._pages) > 1 and (
+                len(self._pages) > self.max_entries or total > self.max_bytes
+            ):
+                total -= self._pages.popitem(last=False)[1][1]
+        return token
+
+    def get(self, token: str) -> Optional[List[str]]:
+        """Return the chunks stored under ``token``, or ``None``."""
+
+        with self._lock:
+            entry = self._pages.get(token)
+            if entry is None:
+                return None
+            self._pages.move_to_end(token)
+            return entry[0]
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def _on_open(self, comm, msg) -> None:
+        token = (msg.get("content", {}).get("data") or {}).get("token")
+        parts = self.get(token)
+        if parts is None:
+            comm.send({"error": "This map is no longer cached; re-run the cell to display it."})
+        else:
+            for index, chunk in enumerate(parts):
+                comm.send({"index": index, "count": len(parts), "chunk": chunk})
+        comm.close()
+
+
+def iframe_html(iframe_id: str, src: str, width: str, height: str) -> str:
+    """Return an iframe tag loading ``src``."""
+
+    style = f"width: {width}; height: {height}; border: none;"
+    return (
+        f'<iframe id="{html.escape(iframe_id)}" src="{html.escape(src)}" '
+        f'style="{html.escape(style)}" loading="lazy"></iframe>'
+    )
+
+
+def comm_bootstrap(iframe_id: str, token: str, width: str, height: str) -> str:
+    """Return the cell output that fetches a published page over a comm."""
+
+    style = f"width: {width}; height: {height}; border: none;"
+    config = json.dumps({"id": iframe_id, "token": token, "target": COMM_TARGET})
+    return (
+        f'<iframe id="{html.escape(iframe_id)}" style="{html.escape(style)}"></iframe>\n'
+        "<script>\n"
+        "(function (config) {\n"
+        "  var frame = document.getElementById(config.id);\n"
+        "  function notice(text) {\n"
+        "    frame.srcdoc = '<p style=\"font-family: sans-serif\">' + text + '</p>';\n"
+        "  }\n"
+        "  var app = window.Jupyter || window.IPython;\n"
+        "  var kernel = app && app.notebook && app.notebook.kernel;\n"
+        "  if (!kernel || !kernel.comm_manager) {\n"
+        "    notice('This frontend cannot reach the kernel; display the map with '\n"
+        "      + 'notebook_transport=\"files\" or \"inline\".');\n"
+        "    return;\n"
+        "  }\n"
+        "  var parts = [], received = 0;\n"
+        "  var comm = kernel.comm_manager.new_comm(config.target, {token: config.token});\n"
+        "  comm.on_msg(function (msg) {\n"
+        "    var data = msg.content.data;\n"
+        "    if (data.error) { notice(data.error); return; }\n"
+        "    parts[data.index] = data.chunk;\n"
+        "    received += 1;\n"
+        "    if (received === data.count) {\n"
+        "      frame.src = URL.createObjectURL(new Blob(parts, {type: 'text/html'}));\n"
+        "      parts = null;\n"
+        "    }\n"
+        "  });\n"
+        f"}})({config});\n"
+        "</script>"
+    )
+
+
+_temp_cache: Optional[TempFileCache] = None
+_payload_channel: Optional[PayloadChannel] = None
+_state_lock = threading.Lock()
+
+
+def get_temp_cache() -> TempFileCache:
+    """Return the page cache of the ``"files"`` transport.
+
+    It is created on first use in ``maplibreum_maps`` below the current
+    working directory, which the Jupyter server serves for notebooks
+    started there.
+    """
+
+    global _temp_cache
+    with _state_lock:
+        if _temp_cache is None:
+            _temp_cache = TempFileCache(Path("maplibreum_maps").absolute())
+        return _temp_cache
+
+
+def set_temp_cache(cache: Optional[TempFileCache]) -> None:
+    """Replace the cache returned by :func:`get_temp_cache` (``None`` resets it)."""
+
+    global _temp_cache
+    with _state_lock:
+        _temp_cache = cache
+
+
+def get_payload_channel() -> PayloadChannel:
+    """Return the process-wide channel used by the ``"comm"`` transport."""
+
+    global _payload_channel
+    with _state_lock:
+        if _payload_channel is None:
+            _payload_channel = PayloadChannel()
+        return _payload_channel
+
+
+def relative_src(path: Path) -> str:
+    """Return ``path`` as a URL relative to the working directory."""
+
+    try:
+        relative = os.path.relpath(path)
+    except ValueError:  # different drive on Windows
+        relative = os.fspath(path)
+    return Path(relative).as_posix()
+
+
+__all__ = [
+    "COMM_TARGET",
+    "NOTEBOOK_INLINE_THRESHOLD",
+    "NOTEBOOK_TRANSPORTS",
+    "PayloadChannel",
+    "TempFileCache",
+    "comm_bootstrap",
+    "frontend_exposes_kernel",
+    "get_payload_channel",
+    "get_temp_cache",
+    "iframe_html",
+    "relative_src",
+    "set_temp_cache",
+]
@@ -1,10 +1,38 @@
-"""PMTiles integration for maplibreum."""
+"""PMTiles integration for maplibreum.
+
+Besides the browser-side helpers, this module writes `PMTiles v3
+<https://github.com/protomaps/PMTiles/blob/main/spec/v3/spec.md>`_
+archives: one file holding every tile of a dataset, addressed by Hilbert
+tile ID through gzip-compressed, run-length encoded directories, which a
+static host can serve with HTTP range requests. :class:`PMTilesWriter`
+streams tile contents to a scratch file as they arrive and keeps a few
+integers per tile in memory, so archives larger than RAM can be written;
+:func:`write_pmtiles` takes any ``(z, x, y, bytes)`` iterator, such as
+:func:`maplibreum.tiling.iter_tile_pyramid`, and :func:`mbtiles_to_pmtiles`
+converts an MBTiles database.
+"""
 
 from __future__ import annotations
 
-from typing import Any, Dict, Optional, Union
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
 
-from .sources import Source
+from .mvt import _varints
+from .sources import RasterSource, Source
 
 
 class PMTilesProtocol:
@@ -81,3 +109,923 @@ class PMTilesSource(Source):
         resolved.update(kwargs)
 
         super().__init__("vector", **resolved)
+
+    @classmethod
+    def from_archive(
+        cls, path: Union[str, "os.PathLike[str]"], url: Optional[str] = None, **kwargs: Any
+    ) -> "PMTilesSource":
+        """Create a source configured from a local vector PMTiles archive.
+
+        The zoom range, bounds and attribution are read from the archive
+        with :class:`PMTilesReader`.
+
+        Parameters
+        ----------
+        path : str or path-like
+            Local archive to inspect.
+        url : str, optional
+            Where the page loads the archive from; defaults to ``path``.
+        kwargs : Any
+            Additional source options, overriding the archive's values.
+        """
+        with PMTilesReader(path) as reader:
+            if reader.tile_type not in (TILE_TYPE_MVT, TILE_TYPE_UNKNOWN):
+                raise ValueError(
+                    f"{path} is a raster archive; use PMTilesReader(path).source() instead"
+                )
+            return reader.source(url, **kwargs)
+
+
+# -- archive writing ---------------------------------------------------------
+
+TILE_TYPE_UNKNOWN = 0
+TILE_TYPE_MVT = 1
+TILE_TYPE_PNG = 2
+TILE_TYPE_JPEG = 3
+TILE_TYPE_WEBP = 4
+TILE_TYPE_AVIF = 5
+
+COMPRESSION_UNKNOWN = 0
+COMPRESSION_NONE = 1
+COMPRESSION_GZIP = 2
+COMPRESSION_BROTLI = 3
+COMPRESSION_ZSTD = 4
+
+#: Size in bytes of the fixed PMTiles v3 header.
+HEADER_SIZE = 127
+
+_HEADER = struct.Struct("<7sB11Q6B4iB2i")
+_MAGIC = b"PMTiles"
+# Header and root directory must fit in the first 16 KiB of the archive.
+_ROOT_LIMIT = 16384 - HEADER_SIZE
+_DIRECTORY_CHUNK = 1 << 16
+_MBTILES_FORMATS = {
+    "pbf": TILE_TYPE_MVT,
+    "mvt": TILE_TYPE_MVT,
+    "png": TILE_TYPE_PNG,
+    "jpg": TILE_TYPE_JPEG,
+    "jpeg": TILE_TYPE_JPEG,
+    "webp": TILE_TYPE_WEBP,
+    "avif": TILE_TYPE_AVIF,
+}
+
+
+def zxy_to_tileid(z: int, x: int, y: int) -> int:
+    """Return the PMTiles (Hilbert curve) tile ID of tile ``z/x/y``."""
+
+    if not 0 <= z <= 31:
+        raise ValueError("zoom must be between 0 and 31")
+    size = 1 << z
+    if not (0 <= x < size and 0 <= y < size):
+        raise ValueError(f"Tile {z}/{x}/{y} is outside zoom level {z}")
+    tile_id = ((1 << (2 * z)) - 1) // 3
+    s = size >> 1
+    while s:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        tile_id += s * s * ((3 * rx) ^ ry)
+        x &= s - 1
+        y &= s - 1
+        if not ry:
+            if rx:
+                x, y = s - 1 - x, s - 1 - y
+            x, y = y, x
+        s >>= 1
+    return tile_id
+
+
+def tileid_to_zxy(tile_id: int) -> Tuple[int, int, int]:
+    """Return ``(z, x, y)`` for a PMTiles tile ID."""
+
+    if tile_id < 0:
+        raise ValueError("tile ID must be non-negative")
+    z = first = 0
+    while tile_id >= first + (1 << (2 * z)):
+        first += 1 << (2 * z)
+        z += 1
+        if z > 31:
+            raise ValueError(f"Tile ID {tile_id} is beyond zoom level 31")
+    t = tile_id - first
+    x = y = 0
+    s = 1
+    while s < (1 << z):
+        rx = 1 & (t >> 1)
+        ry = 1 & (t ^ rx)
+        if not ry:
+            if rx:
+                x, y = s - 1 - x, s - 1 - y
+            x, y = y, x
+        x += s * rx
+        y += s * ry
+        t >>= 2
+        s <<= 1
+    return z, x, y
+
+
+def _detect_tile_type(data: bytes) -> int:
+    if data[:2] == b"\x1f\x8b":
+        return TILE_TYPE_MVT
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return TILE_TYPE_PNG
+    if data[:3] == b"\xff\xd8\xff":
+        return TILE_TYPE_JPEG
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return TILE_TYPE_WEBP
+    if data[4:12] == b"ftypavif":
+        return TILE_TYPE_AVIF
+    return TILE_TYPE_MVT
+
+
+def _serialize_directory(
+    tile_ids: np.ndarray,
+    run_lengths: np.ndarray,
+    lengths: np.ndarray,
+    offsets: np.ndarray,
+    limit: Optional[int] = None,
+) -> Optional[bytes]:
+    """Varint-encode and gzip one directory of entries sorted by tile ID.
+
+    Columns are encoded in chunks so temporary memory stays bounded. Returns
+    ``None`` as soon as the compressed size exceeds ``limit``.
+    """
+
+    encoded_offsets = offsets + np.uint64(1)
+    if len(offsets) > 1:
+        # Zero marks "directly after the previous entry".
+        contiguous = offsets[1:] == offsets[:-1] + lengths[:-1]
+        encoded_offsets[1:][contiguous] = 0
+    deltas = np.diff(tile_ids, prepend=np.uint64(0))
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    chunks = [compressor.compress(_varints(np.array([len(tile_ids)]))[0])]
+    size = len(chunks[0])
+    for column in (deltas, run_lengths, lengths, encoded_offsets):
+        for start in range(0, len(column), _DIRECTORY_CHUNK):
+            chunks.append(compressor.compress(_varints(column[start : start + _DIRECTORY_CHUNK])[0]))
+            size += len(chunks[-1])
+            if limit is not None and size > limit:
+                return None
+    chunks.append(compressor.flush())
+    data = b"".join(chunks)
+    return None if limit is not None and len(data) > limit else data
+
+
+def _deserialize_directory(data: bytes) -> Tuple[np.ndarray, ...]:
+    """Return ``(tile_ids, run_lengths, lengths, offsets)`` of a directory.
+
+    ``data`` is the uncompressed, varint-encoded directory.
+    """
+
+    raw = np.frombuffer(data, dtype=np.uint8)
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    values = np.zeros(len(ends), dtype=np.uint64)
+    group = np.repeat(np.arange(len(ends)), ends - starts + 1)
+    shifts = (np.arange(len(group)) - starts[group]).astype(np.uint64) * np.uint64(7)
+    np.bitwise_or.at(values, group, (raw[: len(group)] & 0x7F).astype(np.uint64) << shifts)
+    count = int(values[0]) if len(values) else 0
+    columns = values[1 : 1 + 4 * count].reshape(4, count)
+    tile_ids = np.cumsum(columns[0], dtype=np.uint64)
+    run_lengths, lengths, encoded = columns[1], columns[2], columns[3]
+    # A zero offset continues directly after the previous entry; resolve
+    # each run of zeros from the last explicit offset.
+    explicit = encoded != 0
+    segment = np.cumsum(explicit) - 1
+    first = np.flatnonzero(explicit)
+    preceding = np.concatenate(([0], np.cumsum(lengths, dtype=np.uint64)[:-1])).astype(np.uint64)
+    offsets = (encoded[first] - np.uint64(1))[segment] + preceding - preceding[first][segment]
+    return tile_ids, run_lengths, lengths, offsets
+
+
+def _build_directories(
+    tile_ids: np.ndarray, run_lengths: np.ndarray, lengths: np.ndarray, offsets: np.ndarray
+) -> Tuple[bytes, bytes]:
+    """Return ``(root, leaves)``, splitting entries into leaf directories
+    when a single root directory would not fit in the first 16 KiB."""
+
+    root = _serialize_directory(tile_ids, run_lengths, lengths, offsets, limit=_ROOT_LIMIT)
+    if root is not None:
+        return root, b""
+    leaf_size = 4096
+    while True:
+        leaves = bytearray()
+        root_ids, root_offsets, root_lengths = [], [], []
+        for start in range(0, len(tile_ids), leaf_size):
+            stop = start + leaf_size
+            leaf = _serialize_directory(
+                tile_ids[start:stop],
+                run_lengths[start:stop],
+                lengths[start:stop],
+                offsets[start:stop],
+            )
+            root_ids.append(int(tile_ids[start]))
+            root_offsets.append(len(leaves))
+            root_lengths.append(len(leaf))
+            leaves += leaf
+        # Run length 0 marks an entry pointing at a leaf directory.
+        root = _serialize_directory(
+            np.array(root_ids, dtype=np.uint64),
+            np.zeros(len(root_ids), dtype=np.uint64),
+            np.array(root_lengths, dtype=np.uint64),
+            np.array(root_offsets, dtype=np.uint64),
+            limit=_ROOT_LIMIT,
+        )
+        if root is not None:
+            return root, bytes(leaves)
+        leaf_size = int(leaf_size * 1.2)
+
+
+def _pack_header(header: Dict[str, Any]) -> bytes:
+    def e7(value: float) -> int:
+        return int(round(value * 10_000_000))
+
+    west, south, east, north = header["bounds"]
+    center_lng, center_lat = header["center"]
+    return _HEADER.pack(
+        _MAGIC,
+        3,
+        header["root_offset"],
+        header["root_length"],
+        header["metadata_offset"],
+        header["metadata_length"],
+        header["leaf_offset"],
+        header["leaf_length"],
+        header["tile_data_offset"],
+        header["tile_data_length"],
+        header["addressed_tiles"],
+        header["tile_entries"],
+        header["tile_contents"],
+        int(header["clustered"]),
+        header["internal_compression"],
+        header["tile_compression"],
+        header["tile_type"],
+        header["min_zoom"],
+        header["max_zoom"],
+        e7(west),
+        e7(south),
+        e7(east),
+        e7(north),
+        header["center_zoom"],
+        e7(center_lng),
+        e7(center_lat),
+    )
+
+
+def _unpack_header(data: bytes) -> Dict[str, Any]:
+    if len(data) < HEADER_SIZE or data[:7] != _MAGIC:
+        raise ValueError("Not a PMTiles archive")
+    fields = _HEADER.unpack(data[:HEADER_SIZE])
+    if fields[1] != 3:
+        raise ValueError(f"Unsupported PMTiles version {fields[1]}; only v3 is supported")
+    names = (
+        "root_offset",
+        "root_length",
+        "metadata_offset",
+        "metadata_length",
+        "leaf_offset",
+        "leaf_length",
+        "tile_data_offset",
+        "tile_data_length",
+        "addressed_tiles",
+        "tile_entries",
+        "tile_contents",
+        "clustered",
+        "internal_compression",
+        "tile_compression",
+        "tile_type",
+        "min_zoom",
+        "max_zoom",
+    )
+    header: Dict[str, Any] = dict(zip(names, fields[2:19]))
+    header["clustered"] = bool(header["clustered"])
+    header["bounds"] = [value / 10_000_000 for value in fields[19:23]]
+    header["center_zoom"] = fields[23]
+    header["center"] = [value / 10_000_000 for value in fields[24:26]]
+    return header
+
+
+def _tile_lng(x: int, z: int) -> float:
+    return x / (1 << z) * 360.0 - 180.0
+
+
+def _tile_lat(y: int, z: int) -> float:
+    return float(np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * y / (1 << z))))))
+
+
+class PMTilesWriter:
+    """Stream tiles into a PMTiles v3 archive.
+
+    Tiles may be written in any order. Their contents go to a scratch file
+    (identical contents are stored once); :meth:`finalize` then writes the
+    archive with the tile data sorted by tile ID, run-length encoded
+    directories and, for large pyramids, leaf directories. Memory use is a
+    few dozen bytes per tile regardless of tile size.
+
+    Parameters
+    ----------
+    path : str or path-like
+        Archive to create.
+    tile_type : int, optional
+        One of the ``TILE_TYPE_*`` constants. Detected from the first tile
+        when omitted.
+    tile_compression : int, optional
+        One of the ``COMPRESSION_*`` constants describing how the tile
+        bytes are compressed. Detected from the first tile (gzip or none)
+        when omitted.
+    metadata : dict, optional
+        JSON metadata (``name``, ``attribution``, ``vector_layers``, ...).
+    deduplicate : bool, optional
+        Store identical tile contents once.
+    temp_dir : str or path-like, optional
+        Directory for the scratch file.
+
+    Typical use::
+
+        with PMTilesWriter("roads.pmtiles", metadata={"name": "roads"}) as writer:
+            for z, x, y, tile in iter_tile_pyramid(roads, 0, 14, compress=True):
+                writer.write_tile(z, x, y, tile)
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        *,
+        tile_type: Optional[int] = None,
+        tile_compression: Optional[int] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        deduplicate: bool = True,
+        temp_dir: Optional[Union[str, os.PathLike]] = None,
+    ):
+        self.path = Path(path)
+        self.tile_type = tile_type
+        self.tile_compression = tile_compression
+        self.metadata = dict(metadata or {})
+        self.deduplicate = deduplicate
+        self._scratch = tempfile.TemporaryFile(dir=temp_dir)
+        self._scratch_size = 0
+        # Per tile: Hilbert ID and content index; per content: scratch
+        # offset and length.
+        self._tile_ids = array("Q")
+        self._contents = array("Q")
+        self._offsets = array("Q")
+        self._lengths = array("Q")
+        self._hashes: Dict[bytes, int] = {}
+        self._extents: Dict[int, List[int]] = {}
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._tile_ids)
+
+    def write_tile(self, z: int, x: int, y: int, data: bytes) -> None:
+        """Add tile ``z/x/y``; empty tiles are skipped."""
+
+        if self._closed:
+            raise RuntimeError("PMTilesWriter is closed")
+        if not data:
+            return
+        tile_id = zxy_to_tileid(z, x, y)
+        if self.tile_type is None:
+            self.tile_type = _detect_tile_type(data)
+        if self.tile_compression is None:
+            gzipped = data[:2] == b"\x1f\x8b"
+            self.tile_compression = COMPRESSION_GZIP if gzipped else COMPRESSION_NONE
+        content = None
+        if self.deduplicate:
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+            content = self._hashes.get(digest)
+        if content is None:
+            content = len(self._lengths)
+            self._offsets.append(self._scratch_size)
+            self._lengths.append(len(data))
+            self._scratch.write(data)
+            self._scratch_size += len(data)
+            if self.deduplicate:
+                self._hashes[digest] = content
+        self._tile_ids.append(tile_id)
+        self._contents.append(content)
+        extent = self._extents.get(z)
+        if extent is None:
+            self._extents[z] = [x, y, x, y]
+        else:
+            extent[0], extent[1] = min(extent[0], x), min(extent[1], y)
+            extent[2], extent[3] = max(extent[2], x), max(extent[3], y)
+
+    def _bounds(self) -> List[float]:
+        if not self._extents:
+            return [-180.0, -85.0511287, 180.0, 85.0511287]
+        z = max(self._extents)
+        min_x, min_y, max_x, max_y = self._extents[z]
+        return [_tile_lng(min_x, z), _tile_lat(max_y + 1, z), _tile_lng(max_x + 1, z), _tile_lat(min_y, z)]
+
+    def finalize(
+        self,
+        metadata: Optional[Dict[str, Any]] = None,
+        *,
+        bounds: Optional[Sequence[float]] = None,
+        center: Optional[Sequence[float]] = None,
+        min_zoom: Optional[int] = None,
+        max_zoom: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Write the archive and return its header as a dictionary.
+
+        Parameters
+        ----------
+        metadata : dict, optional
+            Replaces the metadata given to the constructor.
+        bounds : sequence of float, optional
+            ``[west, south, east, north]``; defaults to the extent of the
+            tiles at the deepest zoom.
+        center : sequence of float, optional
+            ``[lng, lat]`` or ``[lng, lat, zoom]``; defaults to the middle
+            of ``bounds`` at ``min_zoom``.
+        min_zoom, max_zoom : int, optional
+            Default to the zoom range of the written tiles.
+        """
+
+        if self._closed:
+            raise RuntimeError("PMTilesWriter is closed")
+        if metadata is not None:
+            self.metadata = dict(metadata)
+        try:
+            return self._write(bounds, center, min_zoom, max_zoom)
+        finally:
+            self.close()
+
+    def _write(self, bounds, center, min_zoom, max_zoom) -> Dict[str, Any]:
+        ids = np.frombuffer(self._tile_ids, dtype=np.uint64)
+        contents = np.frombuffer(self._contents, dtype=np.uint64).astype(np.intp)
+        order = np.argsort(ids, kind="stable")
+        ids, contents = ids[order], contents[order]
+        repeated = np.flatnonzero(ids[1:] == ids[:-1])
+        if len(repeated):
+            z, x, y = tileid_to_zxy(int(ids[repeated[0]]))
+            raise ValueError(f"Tile {z}/{x}/{y} was written more than once")
+
+        # Tile data is laid out in tile ID order (a "clustered" archive);
+        # each content is placed where it is first used.
+        content_lengths = np.frombuffer(self._lengths, dtype=np.uint64)
+        _, first_use = np.unique(contents, return_index=True)
+        placement = contents[np.sort(first_use)]
+        placed_lengths = content_lengths[placement]
+        new_offsets = np.empty(len(content_lengths), dtype=np.uint64)
+        new_offsets[placement] = np.cumsum(placed_lengths, dtype=np.uint64) - placed_lengths
+
+        # Consecutive tile IDs sharing a content collapse into one entry.
+        runs = np.ones(len(ids), dtype=bool)
+        runs[1:] = (ids[1:] != ids[:-1] + np.uint64(1)) | (contents[1:] != contents[:-1])
+        starts = np.flatnonzero(runs)
+        run_lengths = np.diff(np.append(starts, len(ids))).astype(np.uint64)
+        entry_contents = contents[starts]
+        root, leaves = _build_directories(
+            ids[starts], run_lengths, content_lengths[entry_contents], new_offsets[entry_contents]
+        )
+        metadata = gzip.compress(
+            json.dumps(self.metadata, separators=(",", ":")).encode("utf-8"), mtime=0
+        )
+
+        zooms = sorted(self._extents) or [0]
+        min_zoom = zooms[0] if min_zoom is None else min_zoom
+        max_zoom = zooms[-1] if max_zoom is None else max_zoom
+        bounds = list(bounds) if bounds is not None else self._bounds()
+        if center is None:
+            center = [(bounds[0] + bounds[2]) / 2, (bounds[1] + bounds[3]) / 2, min_zoom]
+        center_zoom = int(center[2]) if len(center) > 2 else min_zoom
+        header: Dict[str, Any] = {
+            "root_offset": HEADER_SIZE,
+            "root_length": len(root),
+            "metadata_offset": HEADER_SIZE + len(root),
+            "metadata_length": len(metadata),
+            "leaf_offset": HEADER_SIZE + len(root) + len(metadata),
+            "leaf_length": len(leaves),
+            "tile_data_offset": HEADER_SIZE + len(root) + len(metadata) + len(leaves),
+            "tile_data_length": int(placed_lengths.sum()),
+            "addressed_tiles": len(ids),
+            "tile_entries": len(starts),
+            "tile_contents": len(placement),
+            "clustered": True,
+            "internal_compression": COMPRESSION_GZIP,
+            "tile_compression": (
+                COMPRESSION_UNKNOWN if self.tile_compression is None else self.tile_compression
+            ),
+            "tile_type": TILE_TYPE_UNKNOWN if self.tile_type is None else self.tile_type,
+            "min_zoom": min_zoom,
+            "max_zoom": max_zoom,
+            "bounds": bounds,
+            "center_zoom": center_zoom,
+            "center": [float(center[0]), float(center[1])],
+        }
+
+        with open(self.path, "wb") as out:
+            out.write(_pack_header(header))
+            out.write(root)
+            out.write(metadata)
+            out.write(leaves)
+            self._copy_contents(out, placement)
+        return header
+
+    def _copy_contents(self, out, placement: np.ndarray) -> None:
+        # Contents are read back in runs that are contiguous in the scratch
+        # file, which is the whole file when tiles arrived in ID order.
+        scratch = self._scratch
+        offsets = self._offsets
+        lengths = self._lengths
+        breaks = np.flatnonzero(np.diff(placement) != 1) + 1
+        for run in np.split(placement, breaks):
+            if not len(run):
+                continue
+            first, last = int(run[0]), int(run[-1])
+            remaining = offsets[last] + lengths[last] - offsets[first]
+            scratch.seek(offsets[first])
+            while remaining:
+                chunk = scratch.read(min(remaining, 1 << 20))
+                out.write(chunk)
+                remaining -= len(chunk)
+
+    def close(self) -> None:
+        """Discard the scratch file without writing an archive."""
+
+        if not self._closed:
+            self._closed = True
+            self._scratch.close()
+            self._hashes.clear()
+
+    def __enter__(self) -> "PMTilesWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc_info: Any) -> None:
+        if exc_type is None and not self._closed:
+            self.finalize()
+        else:
+            self.close()
+
+
+def write_pmtiles(
+    path: Union[str, os.PathLike],
+    tiles: Iterable[Tuple[int, int, int, bytes]],
+    metadata: Optional[Dict[str, Any]] = None,
+    **options: Any,
+) -> Dict[str, Any]:
+    """Write ``(z, x, y, bytes)`` tiles to a PMTiles archive.
+
+    Parameters
+    ----------
+    path : str or path-like
+        Archive to create.
+    tiles : iterable
+        Tiles in any order, e.g. from
+        :func:`maplibreum.tiling.iter_tile_pyramid`.
+    metadata : dict, optional
+        JSON metadata of the archive.
+    **options
+        ``tile_type``, ``tile_compression``, ``deduplicate`` and
+        ``temp_dir`` for :class:`PMTilesWriter`; ``bounds``, ``center``,
+        ``min_zoom`` and ``max_zoom`` for :meth:`PMTilesWriter.finalize`.
+
+    Returns
+    -------
+    dict
+        The archive header.
+    """
+
+    finalize_options = {
+        key: options.pop(key) for key in ("bounds", "center", "min_zoom", "max_zoom") if key in options
+    }
+    writer = PMTilesWriter(path, metadata=metadata, **options)
+    try:
+        for z, x, y, data in tiles:
+            writer.write_tile(z, x, y, data)
+    except BaseException:
+        writer.close()
+        raise
+    return writer.finalize(**finalize_options)
+
+
+def _mbtiles_metadata(rows: Iterable[Tuple[str, str]]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Split MBTiles metadata rows into PMTiles metadata and header options."""
+
+    metadata: Dict[str, Any] = {}
+    options: Dict[str, Any] = {}
+    for name, value in rows:
+        if name == "json":
+            metadata.update(json.loads(value))
+        elif name == "bounds":
+            options["bounds"] = [float(part) for part in value.split(",")]
+        elif name == "center":
+            options["center"] = [float(part) for part in value.split(",")]
+        elif name in ("minzoom", "maxzoom"):
+            options["min_zoom" if name == "minzoom" else "max_zoom"] = int(value)
+        elif name == "format":
+            options["tile_type"] = _MBTILES_FORMATS.get(value.lower(), TILE_TYPE_UNKNOWN)
+        else:
+            metadata[name] = value
+    return metadata, options
+
+
+def mbtiles_to_pmtiles(
+    mbtiles_path: Union[str, os.PathLike],
+    pmtiles_path: Union[str, os.PathLike],
+    *,
+    temp_dir: Optional[Union[str, os.PathLike]] = None,
+) -> Dict[str, Any]:
+    """Convert an MBTiles database into a PMTiles archive.
+
+    Tiles are streamed from SQLite, so the database is never loaded into
+    memory. MBTiles metadata (including the ``json`` entry holding
+    ``vector_layers``) becomes the archive metadata; ``bounds``,
+    ``center``, ``minzoom``, ``maxzoom`` and ``format`` fill the header.
+
+    Returns
+    -------
+    dict
+        The archive header.
+    """
+
+    if not Path(mbtiles_path).is_file():
+        raise FileNotFoundError(f"MBTiles file not found: {mbtiles_path}")
+    connection = sqlite3.connect(os.fspath(mbtiles_path))
+    try:
+        metadata, options = _mbtiles_metadata(
+            connection.execute("SELECT name, value FROM metadata")
+        )
+        tiles = (
+            # MBTiles rows count from the south (TMS); PMTiles from the north.
+            (z, x, (1 << z) - 1 - row, bytes(data))
+            for z, x, row, data in connection.execute(
+                "SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles"
+            )
+        )
+        return write_pmtiles(pmtiles_path, tiles, metadata, temp_dir=temp_dir, **options)
+    finally:
+        connection.close()
+
+
+# -- archive reading ---------------------------------------------------------
+
+_LAYER_TYPES = {"Point": "circle", "LineString": "line", "Polygon": "fill"}
+_LAYER_PAINT = {
+    "circle": {"circle-radius": 3, "circle-color": "{color}"},
+    "line": {"line-width": 1, "line-color": "{color}"},
+    "fill": {"fill-opacity": 0.4, "fill-color": "{color}"},
+}
+_PALETTE = ("#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b")
+
+
+class PMTilesReader:
+    """Read a local PMTiles v3 archive through a memory map.
+
+    Only the header is parsed on open; the JSON metadata is decoded on
+    first access and directories as tiles are looked up (a small
+    least-recently-used cache keeps recent ones), so inspecting a
+    multi-gigabyte archive touches a few pages of it.
+
+    Parameters
+    ----------
+    path : str or path-like
+        Archive to read.
+    directory_cache_size : int, optional
+        Number of decoded directories kept in memory.
+
+    Typical use::
+
+        with PMTilesReader("roads.pmtiles") as archive:
+            m.add_source("roads", archive.source())
+            m.add_layers(archive.suggested_layers("roads"))
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], *, directory_cache_size: int = 64):
+        self.path = path
+        self.directory_cache_size = directory_cache_size
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise ValueError(f"Not a PMTiles archive: {path}") from None
+        try:
+            #: The parsed archive header.
+            self.header: Dict[str, Any] = _unpack_header(self._mmap[:HEADER_SIZE])
+        except ValueError:
+            self.close()
+            raise
+        self._metadata: Optional[Dict[str, Any]] = None
+        self._directories: "OrderedDict[Tuple[int, int], Tuple[np.ndarray, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # -- lifecycle -----------------------------------------------------
+    def close(self) -> None:
+        """Release the memory map and the file."""
+
+        if getattr(self, "_mmap", None) is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self) -> "PMTilesReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.header["addressed_tiles"]
+
+    # -- header and metadata ---------------------------------------------
+    @property
+    def min_zoom(self) -> int:
+        return self.header["min_zoom"]
+
+    @property
+    def max_zoom(self) -> int:
+        return self.header["max_zoom"]
+
+    @property
+    def bounds(self) -> List[float]:
+        """``[west, south, east, north]`` of the archive."""
+
+        return list(self.header["bounds"])
+
+    @property
+    def center(self) -> List[float]:
+        """``[lng, lat, zoom]`` suggested for viewing the archive."""
+
+        return [*self.header["center"], self.header["center_zoom"]]
+
+    @property
+    def tile_type(self) -> int:
+        return self.header["tile_type"]
+
+    @property
+    def tile_compression(self) -> int:
+        return self.header["tile_compression"]
+
+    def _decompress(self, data: bytes, compression: int) -> bytes:
+        if compression in (COMPRESSION_NONE, COMPRESSION_UNKNOWN):
+            return bytes(data)
+        if compression == COMPRESSION_GZIP:
+            return gzip.decompress(data)
+        raise ValueError(
+            f"Unsupported PMTiles compression {compression}; only gzip is supported"
+        )
+
+    def _slice(self, offset: int, length: int) -> bytes:
+        if self._mmap is None:
+            raise ValueError("PMTilesReader is closed")
+        return self._mmap[offset : offset + length]
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """The archive's JSON metadata, decoded on first access."""
+
+        if self._metadata is None:
+            header = self.header
+            raw = self._slice(header["metadata_offset"], header["metadata_length"])
+            text = self._decompress(raw, header["internal_compression"])
+            self._metadata = json.loads(text) if text else {}
+        return self._metadata
+
+    @property
+    def vector_layers(self) -> List[Dict[str, Any]]:
+        """The ``vector_layers`` entries (``id``, ``fields``, ...) of the metadata."""
+
+        return list(self.metadata.get("vector_layers") or [])
+
+    # -- tiles -----------------------------------------------------------
+    def _directory(self, offset: int, length: int) -> Tuple[np.ndarray, ...]:
+        key = (offset, length)
+        with self._lock:
+            directory = self._directories.get(key)
+            if directory is not None:
+                self._directories.move_to_end(key)
+                return directory
+        raw = self._decompress(self._slice(offset, length), self.header["internal_compression"])
+        directory = _deserialize_directory(raw)
+        with self._lock:
+            self._directories[key] = directory
+            while len(self._directories) > max(1, self.directory_cache_size):
+                self._directories.popitem(last=False)
+        return directory
+
+    def get_tile(self, z: int, x: int, y: int, *, decompress: bool = False) -> Optional[bytes]:
+        """Return the bytes of tile ``z/x/y``, or ``None`` if it is absent.
+
+        Parameters
+        ----------
+        decompress : bool, optional
+            Undo the archive's tile compression (e.g. to pass a vector
+            tile to :func:`maplibreum.mvt.decode_tile`).
+        """
+
+        tile_id = zxy_to_tileid(z, x, y)
+        header = self.header
+        offset, length = header["root_offset"], header["root_length"]
+        for _ in range(4):  # the specification allows three leaf levels
+            tile_ids, run_lengths, lengths, offsets = self._directory(offset, length)
+            index = int(np.searchsorted(tile_ids, tile_id, side="right")) - 1
+            if index < 0:
+                return None
+            run_length = int(run_lengths[index])
+            if run_length == 0:
+                offset = header["leaf_offset"] + int(offsets[index])
+                length = int(lengths[index])
+                continue
+            if tile_id - int(tile_ids[index]) >= run_length:
+                return None
+            data = self._slice(header["tile_data_offset"] + int(offsets[index]), int(lengths[index]))
+            return self._decompress(data, header["tile_compression"]) if decompress else data
+        return None
+
+    def iter_tiles(self) -> Iterator[Tuple[int, int, int, bytes]]:
+        """Yield ``(z, x, y, bytes)`` for every tile in tile ID order."""
+
+        header = self.header
+        stack = [(header["root_offset"], header["root_length"])]
+        while stack:
+            offset, length = stack.pop()
+            tile_ids, run_lengths, lengths, offsets = self._directory(offset, length)
+            leaves = []
+            for tile_id, run_length, size, start in zip(
+                tile_ids.tolist(), run_lengths.tolist(), lengths.tolist(), offsets.tolist()
+            ):
+                if run_length == 0:
+                    leaves.append((header["leaf_offset"] + start, size))
+                    continue
+                data = self._slice(header["tile_data_offset"] + start, size)
+                for step in range(run_length):
+                    yield (*tileid_to_zxy(tile_id + step), data)
+            stack += reversed(leaves)
+
+    # -- map configuration -------------------------------------------------
+    def source(self, url: Optional[str] = None, **kwargs: Any) -> Source:
+        """Return a source for this archive with its zoom range and bounds.
+
+        Vector archives give a :class:`PMTilesSource`, raster archives a
+        :class:`~maplibreum.sources.RasterSource`.
+
+        Parameters
+        ----------
+        url : str, optional
+            Where the page loads the archive from; defaults to the path the
+            reader was opened with.
+        **kwargs
+            Extra source options, overriding the values read from the archive.
+        """
+
+        url = os.fspath(self.path) if url is None else url
+        if not url.startswith("pmtiles://"):
+            url = "pmtiles://" + url
+        options: Dict[str, Any] = {
+            "min_zoom": self.min_zoom,
+            "max_zoom": self.max_zoom,
+            "bounds": self.bounds,
+        }
+        attribution = self.metadata.get("attribution")
+        if attribution:
+            options["attribution"] = attribution
+        options.update(kwargs)
+        if self.tile_type in (TILE_TYPE_MVT, TILE_TYPE_UNKNOWN):
+            return PMTilesSource(url, **options)
+        return RasterSource(url=url, **options)
+
+    def suggested_layers(self, source_id: str) -> List[Dict[str, Any]]:
+        """Return style layers that draw every layer of the archive.
+
+        Vector layers whose geometry type is recorded in the metadata
+        (tippecanoe's ``tilestats``) get one layer of the matching type;
+        others get a fill, line and circle layer filtered by geometry type.
+        Raster archives get a single ``raster`` layer.
+        """
+
+        if self.tile_type not in (TILE_TYPE_MVT, TILE_TYPE_UNKNOWN):
+            return [{"id": source_id, "type": "raster", "source": source_id}]
+        stats = self.metadata.get("tilestats") or {}
+        geometries = {
+            entry.get("layer"): entry.get("geometry") for entry in stats.get("layers") or []
+        }
+        layers: List[Dict[str, Any]] = []
+        for position, vector_layer in enumerate(self.vector_layers):
+            layer_name = vector_layer["id"]
+            color = _PALETTE[position % len(_PALETTE)]
+            geometry = geometries.get(layer_name)
+            if geometry in _LAYER_TYPES:
+                kinds = [(_LAYER_TYPES[geometry], None)]
+            else:
+                kinds = [
+                    (kind, ["==", "$type", name]) for name, kind in reversed(_LAYER_TYPES.items())
+                ]
+            for kind, layer_filter in kinds:
+                layer: Dict[str, Any] = {
+                    "id": f"{source_id}-{layer_name}-{kind}",
+                    "type": kind,
+                    "source": source_id,
+                    "source-layer": layer_name,
+                    "paint": {
+                        key: (color if value == "{color}" else value)
+                        for key, value in _LAYER_PAINT[kind].items()
+                    },
+                }
+                if layer_filter is not None:
+                    layer["filter"] = layer_filter
+                for key in ("minzoom", "maxzoom"):
+                    if key in vector_layer:
+                        layer[key] = vector_layer[key]
+                layers.append(layer)
+        return layers
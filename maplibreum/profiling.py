@@ -0,0 +1,314 @@
+"""Per-section timing and size breakdown of a rendered map.
+
+The map template calls ``profile_mark(kind, name)`` at the start of each
+section (sources, layers, markers, ...) and of each source and layer. Outside
+of :meth:`maplibreum.core.Map.render_profile` the call renders nothing; while
+profiling it emits a token that :class:`RenderProfiler` uses to attribute the
+time and bytes produced until the next mark.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_MARK_PREFIX = "\x00maplibreum-mark-"
+
+#: Item marks and the section their totals are added to.
+ITEM_SECTIONS = {"source": "sources", "layer": "layers", "image": "images"}
+
+
+def profile_mark(kind: str, name: Optional[str] = None) -> str:
+    """Template hook that renders nothing when no profiler is active."""
+
+    return ""
+
+
+def _new_stats() -> Dict[str, float]:
+    return {"seconds": 0.0, "bytes": 0}
+
+
+class RenderProfile:
+    """Time and UTF-8 size of each part of a rendered document.
+
+    Attributes
+    ----------
+    sections : dict
+        ``{section: {"seconds": float, "bytes": int}}`` in document order.
+        Sections include the sources and layers they contain.
+    sources, layers, images : dict
+        The same figures for every source name, layer id and image id.
+    seconds, bytes : float, int
+        Totals for the whole document.
+    html : str
+        The rendered document.
+    """
+
+    def __init__(
+        self,
+        sections: Dict[str, Dict[str, float]],
+        items: Dict[str, Dict[str, Dict[str, float]]],
+        html: str,
+    ) -> None:
+        self.sections = sections
+        self.sources = items.get("source", {})
+        self.layers = items.get("layer", {})
+        self.images = items.get("image", {})
+        self.seconds = sum(stats["seconds"] for stats in sections.values())
+        self.bytes = sum(stats["bytes"] for stats in sections.values())
+        self.html = html
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the profile as JSON-compatible data (without the HTML)."""
+
+        return {
+            "total": {"seconds": self.seconds, "bytes": self.bytes},
+            "sections": self.sections,
+            "sources": self.sources,
+            "layers": self.layers,
+            "images": self.images,
+        }
+
+    def to_json(self, path: Optional[str] = None, indent: Optional[int] = 2) -> str:
+        """Serialize :meth:`to_dict` to JSON, optionally writing it to ``path``."""
+
+        text = json.dumps(self.to_dict(), indent=indent)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(text)
+        return text
+
+    def summary(self, limit: int = 10) -> str:
+        """Return a plain-text table of sections and the largest items."""
+
+        lines = [f"{'section':<24} {'ms':>10} {'bytes':>12}"]
+        for name, stats in self.sections.items():
+            lines.append(f"{name:<24} {stats['seconds'] * 1e3:>10.2f} {stats['bytes']:>12,}")
+        items = [
+            (f"{kind} {name}", stats)
+            for kind, group in (
+                ("source", self.sources),
+                ("layer", self.layers),
+                ("image", self.images),
+            )
+            for name, stats in group.items()
+        ]
+        items.sort(key=lambda item: item[1]["bytes"], reverse=True)
+        if items:
+            lines.append("")
+            for name, stats in items[:limit]:
+                lines.append(
+                    f"{name:<24} {stats['seconds'] * 1e3:>10.2f} {stats['bytes']:>12,}"
+                )
+        lines.append(f"{'total':<24} {self.seconds * 1e3:>10.2f} {self.bytes:>12,}")
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return f"<RenderProfile {self.bytes:,} bytes in {self.seconds * 1e3:.1f} ms>"
+
+
+class RenderProfiler:
+    """Collect the marks emitted by the template and attribute output to them."""
+
+    def __init__(self) -> None:
+        self._marks: List[Tuple[str, Optional[str]]] = []
+        self._sections: Dict[str, Dict[str, float]] = {"document": _new_stats()}
+        self._items: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._current: Tuple[str, Optional[str]] = ("document", None)
+        self._started: Optional[float] = None
+
+    def mark(self, kind: str, name: Optional[str] = None) -> str:
+        """Template hook: return a token for the section starting here."""
+
+        self._marks.append((kind, None if name is None else str(name)))
+        return f"{_MARK_PREFIX}{len(self._marks) - 1}\x00"
+
+    @staticmethod
+    def is_mark(piece: str) -> bool:
+        return piece.startswith(_MARK_PREFIX)
+
+    def _stats(self, kind: str, name: Optional[str]):
+        if name is not None and kind in ITEM_SECTIONS:
+            group = self._items.setdefault(kind, {})
+            return [
+                group.setdefault(name, _new_stats()),
+                self._sections.setdefault(ITEM_SECTIONS[kind], _new_stats()),
+            ]
+        return [self._sections.setdefault(kind, _new_stats())]
+
+    def _close(self, now: float) -> None:
+        if self._started is not None:
+            for stats in self._stats(*self._current):
+                stats["seconds"] += now - self._started
+        self._started = now
+
+    def start(self) -> None:
+        """Start timing the first region."""
+
+        self._started = time.perf_counter()
+
+    def enter(self, piece: str) -> None:
+        """Switch the current region to the mark encoded in ``piece``."""
+
+        self._close(time.perf_counter())
+        self._current = self._marks[int(piece[len(_MARK_PREFIX) : -1])]
+
+    def record(self, piece: str) -> None:
+        """Attribute the bytes of an output ``piece`` to the current region."""
+
+        size = len(piece.encode("utf-8"))
+        for stats in self._stats(*self._current):
+            stats["bytes"] += size
+
+    def finish(self, html: str) -> RenderProfile:
+        """Close the last region and return the collected profile."""
+
+        self._close(time.perf_counter())
+        return RenderProfile(self._sections, self._items, html)
+
+
+class PayloadBudgetExceeded(ValueError):
+    """Raised when a rendered map is larger than ``Map.max_payload_bytes``."""
+
+
+class PayloadBudgetWarning(UserWarning):
+    """Warning emitted instead of :class:`PayloadBudgetExceeded` on request."""
+
+
+def _count_positions(coordinates: Any) -> int:
+    """Return the number of positions in a GeoJSON ``coordinates`` value."""
+
+    shape = getattr(coordinates, "shape", None)
+    if shape is not None:
+        if len(shape) == 0:
+            return 0
+        return int(coordinates.size // shape[-1]) if shape[-1] else 0
+    if not isinstance(coordinates, (list, tuple)) or not coordinates:
+        return 0
+    if not isinstance(coordinates[0], (list, tuple)) and getattr(coordinates[0], "shape", ()) == ():
+        return 1
+    return sum(_count_positions(part) for part in coordinates)
+
+
+def _count_geometry(geometry: Any) -> int:
+    if not isinstance(geometry, dict):
+        return 0
+    if geometry.get("type") == "GeometryCollection":
+        return sum(_count_geometry(part) for part in geometry.get("geometries") or [])
+    return _count_positions(geometry.get("coordinates"))
+
+
+def geojson_counts(data: Any) -> Tuple[int, int]:
+    """Return ``(features, vertices)`` for inline GeoJSON ``data``."""
+
+    if not isinstance(data, dict):
+        return 0, 0
+    kind = data.get("type")
+    if kind == "FeatureCollection":
+        features = data.get("features") or []
+        return len(features), sum(
+            _count_geometry(feature.get("geometry")) for feature in features
+        )
+    if kind == "Feature":
+        return 1, _count_geometry(data.get("geometry"))
+    return 0, _count_geometry(data)
+
+
+class PayloadReport:
+    """Serialized size of every contributor to a rendered map.
+
+    Built from a :class:`RenderProfile`, so every byte count is measured on
+    the exact text produced by ``Map.render()``.
+
+    Attributes
+    ----------
+    bytes : int
+        Size of the whole document in UTF-8 bytes.
+    sections : dict
+        ``{section: bytes}``, including ``markers`` and the inline script
+        sections (``on_load_js``, ``animations``, ``events``, ``extra_js``).
+    sources : dict
+        ``{name: {"bytes": int, "features": int, "vertices": int}}``.
+    layers, images : dict
+        ``{id: bytes}``.
+    """
+
+    def __init__(self, profile: RenderProfile, counts: Dict[str, Tuple[int, int]]) -> None:
+        self.bytes = profile.bytes
+        self.sections = {name: stats["bytes"] for name, stats in profile.sections.items()}
+        self.sources = {
+            name: {
+                "bytes": stats["bytes"],
+                "features": counts.get(name, (0, 0))[0],
+                "vertices": counts.get(name, (0, 0))[1],
+            }
+            for name, stats in profile.sources.items()
+        }
+        self.layers = {name: stats["bytes"] for name, stats in profile.layers.items()}
+        self.images = {name: stats["bytes"] for name, stats in profile.images.items()}
+
+    def contributors(self) -> List[Tuple[str, int]]:
+        """Return ``(label, bytes)`` pairs sorted from largest to smallest.
+
+        Sources, layers and images are listed individually; the remaining
+        sections are listed as a whole.
+        """
+
+        entries: List[Tuple[str, int]] = []
+        entries.extend((f"source '{name}'", stats["bytes"]) for name, stats in self.sources.items())
+        entries.extend((f"layer '{name}'", size) for name, size in self.layers.items())
+        entries.extend((f"image '{name}'", size) for name, size in self.images.items())
+        itemised = set(ITEM_SECTIONS.values())
+        entries.extend(
+            (name, size) for name, size in self.sections.items() if name not in itemised
+        )
+        entries.sort(key=lambda entry: entry[1], reverse=True)
+        return entries
+
+    def largest(self, count: int = 5) -> List[Tuple[str, int]]:
+        """Return the ``count`` largest contributors."""
+
+        return self.contributors()[:count]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the report as JSON-compatible data."""
+
+        return {
+            "bytes": self.bytes,
+            "sections": self.sections,
+            "sources": self.sources,
+            "layers": self.layers,
+            "images": self.images,
+        }
+
+    def to_json(self, path: Optional[str] = None, indent: Optional[int] = 2) -> str:
+        """Serialize :meth:`to_dict` to JSON, optionally writing it to ``path``."""
+
+        text = json.dumps(self.to_dict(), indent=indent)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(text)
+        return text
+
+    def __repr__(self) -> str:
+        return f"<PayloadReport {self.bytes:,} bytes>"
+
+
+def describe_contributors(entries: Iterable[Tuple[str, int]]) -> str:
+    """Format ``(label, bytes)`` pairs for an error message."""
+
+    return ", ".join(f"{label} ({size:,} bytes)" for label, size in entries)
+
+
+__all__ = [
+    "ITEM_SECTIONS",
+    "PayloadBudgetExceeded",
+    "PayloadBudgetWarning",
+    "PayloadReport",
+    "RenderProfile",
+    "RenderProfiler",
+    "describe_contributors",
+    "geojson_counts",
+    "profile_mark",
+]
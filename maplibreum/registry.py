@@ -0,0 +1,274 @@
+"""Ordered, key-indexed storage for map sources and layers.
+
+:class:`OrderedRegistry` behaves like the lists of entry dictionaries that
+``Map.sources`` and ``Map.layers`` used to be (the templates iterate over it
+and tests index it), while a doubly linked list plus a key index give O(1)
+lookup, replacement, removal and insertion before a given entry.
+"""
+
+from __future__ import annotations
+
+import warnings
+from collections.abc import MutableSequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .utils import external_stacklevel
+
+
+class _Node:
+    __slots__ = ("prev", "next", "key", "entry", "position")
+
+    def __init__(self, key=None, entry=None):
+        self.prev = self
+        self.next = self
+        self.key = key
+        self.entry = entry
+        self.position = -1
+
+
+class OrderedRegistry(MutableSequence):
+    """Insertion-ordered sequence of entries indexed by a key field.
+
+    Parameters
+    ----------
+    key : str
+        Name of the entry field used as the key (``"name"`` for sources,
+        ``"id"`` for layers).
+    entries : iterable of dict, optional
+        Initial entries.
+
+    Notes
+    -----
+    Keys are unique, as MapLibre rejects duplicate source names and layer
+    ids. Adding an entry whose key is already registered replaces the
+    existing entry in place (:meth:`insert_before` moves it) and emits a
+    :class:`FutureWarning`, since this will raise :class:`ValueError` in a
+    future release; use :meth:`replace` to swap an entry. Positional access
+    materialises an index of the entries in order; changes only drop the
+    part of it from the changed position on, so appends and edits near the
+    end keep it cheap.
+    """
+
+    def __init__(self, key: str, entries: Optional[Iterable[Dict[str, Any]]] = None):
+        self._key_field = key
+        self._root = _Node()
+        self._nodes: Dict[Any, _Node] = {}
+        self._order: List[_Node] = []
+        if entries is not None:
+            for entry in entries:
+                self.append(entry)
+
+    # -- keyed access -------------------------------------------------
+    def _key(self, entry: Dict[str, Any]) -> Any:
+        try:
+            return entry[self._key_field]
+        except (KeyError, TypeError):
+            raise ValueError(
+                f"Registry entries must be dictionaries with a '{self._key_field}' key"
+            ) from None
+
+    def _warn_duplicate(self, key: Any) -> None:
+        warnings.warn(
+            f"An entry with {self._key_field} '{key}' already exists and is replaced; "
+            "adding a duplicate will raise ValueError in a future release. Use "
+            "replace() (Map.replace_source()) to change an entry.",
+            FutureWarning,
+            stacklevel=external_stacklevel(),
+        )
+
+    def _truncate(self, node: _Node) -> None:
+        """Drop the cached index from ``node``'s position on."""
+
+        order = self._order
+        position = node.position
+        if 0 <= position < len(order) and order[position] is node:
+            del order[position:]
+
+    def _link(self, node: _Node, successor: _Node) -> None:
+        self._truncate(successor)
+        node.next = successor
+        node.prev = successor.prev
+        successor.prev.next = node
+        successor.prev = node
+        self._nodes[node.key] = node
+
+    def _unlink(self, node: _Node) -> None:
+        self._truncate(node)
+        node.prev.next = node.next
+        node.next.prev = node.prev
+        del self._nodes[node.key]
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return the entry registered under ``key``, or ``default``."""
+
+        node = self._nodes.get(key)
+        return default if node is None else node.entry
+
+    def has(self, key: Any) -> bool:
+        """Return whether an entry is registered under ``key``."""
+
+        return key in self._nodes
+
+    def keys(self) -> List[Any]:
+        """Return the keys in order."""
+
+        return [node.key for node in self._iter_nodes()]
+
+    def replace(self, key: Any, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace the entry registered under ``key`` and return the old one.
+
+        The new entry keeps the position of the old one; its own key may
+        differ from ``key``.
+        """
+
+        node = self._nodes.get(key)
+        if node is None:
+            raise KeyError(key)
+        new_key = self._key(entry)
+        if new_key != key and new_key in self._nodes:
+            raise ValueError(f"An entry with {self._key_field} '{new_key}' already exists")
+        previous = node.entry
+        if new_key != key:
+            del self._nodes[key]
+            node.key = new_key
+            self._nodes[new_key] = node
+        node.entry = entry
+        return previous
+
+    def discard(self, key: Any) -> Optional[Dict[str, Any]]:
+        """Remove and return the entry registered under ``key``, if any."""
+
+        node = self._nodes.get(key)
+        if node is None:
+            return None
+        self._unlink(node)
+        return node.entry
+
+    def insert_before(self, before: Optional[Any], entry: Dict[str, Any]) -> None:
+        """Insert ``entry`` before the entry registered under ``before``.
+
+        ``before=None`` appends. An existing entry with the same key is
+        moved to the new position (with a :class:`FutureWarning`).
+        """
+
+        if before is not None and before not in self._nodes:
+            raise KeyError(before)
+        key = self._key(entry)
+        if key in self._nodes:
+            self._warn_duplicate(key)
+            if key == before:
+                self._nodes[key].entry = entry
+                return
+            self._unlink(self._nodes[key])
+        successor = self._root if before is None else self._nodes[before]
+        self._link(_Node(key, entry), successor)
+
+    # -- sequence protocol --------------------------------------------
+    def _iter_nodes(self) -> Iterator[_Node]:
+        node = self._root.next
+        while node is not self._root:
+            yield node
+            node = node.next
+
+    def _index(self) -> List[_Node]:
+        order = self._order
+        if len(order) < len(self._nodes):
+            # Extend the valid prefix from its last node to the end.
+            node = order[-1].next if order else self._root.next
+            position = len(order)
+            while node is not self._root:
+                node.position = position
+                order.append(node)
+                position += 1
+                node = node.next
+        return order
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for node in self._iter_nodes():
+            yield node.entry
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [node.entry for node in self._index()[index]]
+        return self._index()[index].entry
+
+    def __setitem__(self, index, entry) -> None:
+        if isinstance(index, slice):
+            entries = list(self)
+            entries[index] = entry
+            self.clear()
+            self.extend(entries)
+            return
+        node = self._index()[index]
+        self.replace(node.key, entry)
+
+    def __delitem__(self, index) -> None:
+        if isinstance(index, slice):
+            for node in self._index()[index]:
+                self._unlink(node)
+            return
+        self._unlink(self._index()[index])
+
+    def insert(self, index: int, entry: Dict[str, Any]) -> None:
+        order = self._index()
+        if index < 0:
+            index = max(len(order) + index, 0)
+        before = order[index].key if index < len(order) else None
+        self.insert_before(before, entry)
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        key = self._key(entry)
+        node = self._nodes.get(key)
+        if node is not None:
+            self._warn_duplicate(key)
+            node.entry = entry
+            return
+        self._link(_Node(key, entry), self._root)
+
+    def extend(self, entries: Iterable[Dict[str, Any]]) -> None:
+        nodes, root = self._nodes, self._root
+        for entry in entries:
+            key = self._key(entry)
+            node = nodes.get(key)
+            if node is not None:
+                self._warn_duplicate(key)
+                node.entry = entry
+                continue
+            # Appending leaves the cached index valid.
+            node = _Node(key, entry)
+            node.prev, node.next = root.prev, root
+            root.prev.next = node
+            root.prev = node
+            nodes[key] = node
+
+    def pop(self, index: int = -1) -> Dict[str, Any]:
+        if not self._nodes:
+            raise IndexError("pop from empty registry")
+        node = self._root.prev if index == -1 else self._index()[index]
+        self._unlink(node)
+        return node.entry
+
+    def clear(self) -> None:
+        self._root = _Node()
+        self._nodes = {}
+        self._order = []
+
+    def __contains__(self, entry: Any) -> bool:
+        if isinstance(entry, dict):
+            node = self._nodes.get(entry.get(self._key_field))
+            return node is not None and node.entry == entry
+        return False
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (OrderedRegistry, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+__all__ = ["OrderedRegistry"]
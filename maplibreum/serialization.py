@@ -0,0 +1,354 @@
+"""JSON serialization helpers shared by the HTML renderer.
+
+Every value written by the template ``tojson`` filter goes through a
+:class:`JSONBackend`. Three backends are bundled:
+
+``"stdlib"``
+    :mod:`json` with its default separators. This is the default and keeps
+    the rendered output byte-for-byte compatible with earlier releases.
+``"compact"``
+    :mod:`json` with compact separators, no ASCII escaping and no circular
+    reference checks.
+``"orjson"``
+    `orjson <https://github.com/ijl/orjson>`_ when it is installed, with
+    native NumPy serialization.
+
+All backends accept NumPy arrays and scalars, pandas timestamps and objects
+implementing ``__geo_interface__``. Pick a backend per map with
+``Map(json_backend=...)`` or globally with :func:`set_default_json_backend`;
+``"auto"`` resolves to orjson when available and to ``"compact"`` otherwise.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Sequence
+from typing import Any, Callable, Dict, Iterator, List, Union
+
+from jinja2 import pass_context
+
+#: Lists longer than this are encoded in batches of this many items.
+STREAM_BATCH_SIZE = 256
+
+
+class DeferredJSON:
+    """Placeholder for a payload that is encoded after template rendering.
+
+    The template ``tojson`` filter emits :attr:`token` for these objects and
+    :meth:`maplibreum.core.Map.render_iter` swaps the token for the chunks
+    produced by :func:`iter_json`, so the full payload never exists as a
+    single string.
+    """
+
+    __slots__ = ("value", "token")
+
+    def __init__(self, value: Any, token: str) -> None:
+        self.value = value
+        self.token = token
+
+
+def _default(value: Any) -> Any:
+    """Convert values the encoders do not support natively."""
+
+    tolist = getattr(value, "tolist", None)
+    if callable(tolist):
+        # NumPy arrays and scalars (and pandas extension arrays).
+        return tolist()
+    if type(value).__name__ in ("NAType", "NaTType"):
+        return None
+    isoformat = getattr(value, "isoformat", None)
+    if callable(isoformat):
+        return isoformat()
+    if hasattr(value, "__geo_interface__"):
+        return value.__geo_interface__
+    if isinstance(value, Sequence) and not isinstance(value, (str, bytes)):
+        # Lazily built feature lists such as ``maplibreum.cluster.PointFeatures``.
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class JSONBackend:
+    """Base class for the encoders used when rendering maps."""
+
+    name = "base"
+    item_separator = ", "
+    key_separator = ": "
+
+    def dumps(self, value: Any) -> str:
+        """Return the JSON text for ``value``."""
+
+        raise NotImplementedError
+
+    def iterencode(self, value: Any) -> Iterator[str]:
+        """Yield the JSON text for ``value`` in bounded pieces."""
+
+        return iter_json(
+            value,
+            self.dumps,
+            item_separator=self.item_separator,
+            key_separator=self.key_separator,
+        )
+
+    def __repr__(self) -> str:  # pragma: no cover - debugging helper
+        return f"{self.__class__.__name__}()"
+
+
+class StdlibJSONBackend(JSONBackend):
+    """:mod:`json` with its default separators."""
+
+    name = "stdlib"
+
+    def __init__(self) -> None:
+        self._encode = json.JSONEncoder(default=_default).encode
+
+    def dumps(self, value: Any) -> str:
+        return self._encode(value)
+
+
+class CompactJSONBackend(JSONBackend):
+    """:mod:`json` tuned for size and speed."""
+
+    name = "compact"
+    item_separator = ","
+    key_separator = ":"
+
+    def __init__(self) -> None:
+        self._encode = json.JSONEncoder(
+            separators=(",", ":"),
+            ensure_ascii=False,
+            check_circular=False,
+            default=_default,
+        ).encode
+
+    def dumps(self, value: Any) -> str:
+        return self._encode(value)
+
+
+class OrjsonJSONBackend(JSONBackend):
+    """Encoder backed by the optional ``orjson`` package."""
+
+    name = "orjson"
+    item_separator = ","
+    key_separator = ":"
+
+    def __init__(self) -> None:
+        try:
+            import orjson
+        except ImportError as exc:  # pragma: no cover - depends on environment
+            raise ImportError(
+                "The 'orjson' JSON backend requires the orjson package"
+            ) from exc
+        self._dumps = orjson.dumps
+        self._option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, value: Any) -> str:
+        return self._dumps(value, default=_default, option=self._option).decode("utf-8")
+
+
+JSON_BACKENDS: Dict[str, Callable[[], JSONBackend]] = {
+    "stdlib": StdlibJSONBackend,
+    "compact": CompactJSONBackend,
+    "orjson": OrjsonJSONBackend,
+}
+
+_backend_lock = threading.Lock()
+_backend_instances: Dict[str, JSONBackend] = {}
+_default_backend: Union[str, JSONBackend] = "stdlib"
+
+BackendSpec = Union[str, JSONBackend, None]
+
+
+def register_json_backend(name: str, factory: Callable[[], JSONBackend]) -> None:
+    """Make a custom backend available under ``name``."""
+
+    with _backend_lock:
+        JSON_BACKENDS[name] = factory
+        _backend_instances.pop(name, None)
+
+
+def available_json_backends() -> List[str]:
+    """Return the names of the backends that can be used in this process."""
+
+    names = []
+    for name in JSON_BACKENDS:
+        try:
+            get_json_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_json_backend(backend: BackendSpec = None) -> JSONBackend:
+    """Resolve ``backend`` to a :class:`JSONBackend` instance.
+
+    Parameters
+    ----------
+    backend : str, JSONBackend or None
+        A registered backend name, ``"auto"``, an instance, or ``None`` for
+        the process-wide default.
+    """
+
+    if backend is None:
+        backend = _default_backend
+    if isinstance(backend, JSONBackend):
+        return backend
+    instance = _backend_instances.get(backend)
+    if instance is not None:
+        return instance
+    if backend == "auto":
+        try:
+            instance = get_json_backend("orjson")
+        except ImportError:
+            instance = get_json_backend("compact")
+    else:
+        factory = JSON_BACKENDS.get(backend)
+        if factory is None:
+            raise ValueError(
+                f"Unknown JSON backend '{backend}'. "
+                f"Available backends: {', '.join(JSON_BACKENDS)}, auto"
+            )
+        instance = factory()
+    with _backend_lock:
+        return _backend_instances.setdefault(backend, instance)
+
+
+def set_default_json_backend(backend: Union[str, JSONBackend]) -> None:
+    """Select the backend used by maps that do not choose one themselves."""
+
+    global _default_backend
+    get_json_backend(backend)
+    _default_backend = backend
+
+
+def get_default_json_backend() -> JSONBackend:
+    """Return the backend currently used by default."""
+
+    return get_json_backend(None)
+
+
+@pass_context
+def tojson(context: Any, value: Any) -> str:
+    """Implementation of the template ``tojson`` filter.
+
+    The backend is taken from the ``json_backend`` template variable and
+    falls back to the process-wide default.
+    """
+
+    if isinstance(value, DeferredJSON):
+        return value.token
+    return get_json_backend(context.get("json_backend")).dumps(value)
+
+
+def dumps(value: Any, backend: BackendSpec = None) -> str:
+    """Serialize ``value`` with the selected (or default) backend."""
+
+    return get_json_backend(backend).dumps(value)
+
+
+def _encode_key(key: Any, dumps: Callable[[Any], str]) -> str:
+    """Encode a mapping key the way :func:`json.dumps` coerces it.
+
+    The coerced string is quoted by ``dumps`` so keys are escaped with the
+    same settings (e.g. ``ensure_ascii``) as the values.
+    """
+
+    if isinstance(key, str):
+        return dumps(key)
+    if key is True:
+        return '"true"'
+    if key is False:
+        return '"false"'
+    if key is None:
+        return '"null"'
+    return dumps(json.dumps(key))
+
+
+def iter_json(
+    value: Any,
+    dumps: Callable[[Any], str] = json.dumps,
+    *,
+    item_separator: str = ", ",
+    key_separator: str = ": ",
+    batch_size: int = STREAM_BATCH_SIZE,
+) -> Iterator[str]:
+    """Yield the JSON encoding of ``value`` in bounded pieces.
+
+    Dictionaries are walked key by key, and lists longer than ``batch_size``
+    and other sequences (such as lazily built feature lists) are encoded
+    ``batch_size`` items at a time, so the largest intermediate
+    string is roughly one batch of features. Everything else is handed to
+    ``dumps``. Joining the output gives the same text as
+    ``dumps(value)`` when the separators match those used by ``dumps``.
+    """
+
+    if isinstance(value, dict):
+        if not value:
+            yield "{}"
+            return
+        yield "{"
+        first = True
+        for key, item in value.items():
+            prefix = "" if first else item_separator
+            first = False
+            yield prefix + _encode_key(key, dumps) + key_separator
+            yield from iter_json(
+                item,
+                dumps,
+                item_separator=item_separator,
+                key_separator=key_separator,
+                batch_size=batch_size,
+            )
+        yield "}"
+    elif (
+        isinstance(value, (list, tuple))
+        and len(value) > batch_size
+        or isinstance(value, Sequence)
+        and not isinstance(value, (str, bytes, list, tuple))
+    ):
+        yield "["
+        prefix = ""
+        for start in range(0, len(value), batch_size):
+            # One call per batch; the brackets of the batch list are dropped.
+            yield prefix + dumps(list(value[start : start + batch_size]))[1:-1]
+            prefix = item_separator
+        yield "]"
+    else:
+        yield dumps(value)
+
+
+def buffered(chunks: Iterator[str], size: int = 1 << 16) -> Iterator[str]:
+    """Coalesce small string ``chunks`` into pieces of roughly ``size`` chars."""
+
+    pending = []
+    pending_size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size >= size:
+            yield "".join(pending)
+            pending = []
+            pending_size = 0
+    if pending:
+        yield "".join(pending)
+
+
+__all__ = [
+    "CompactJSONBackend",
+    "DeferredJSON",
+    "JSONBackend",
+    "JSON_BACKENDS",
+    "OrjsonJSONBackend",
+    "STREAM_BATCH_SIZE",
+    "StdlibJSONBackend",
+    "available_json_backends",
+    "buffered",
+    "dumps",
+    "get_default_json_backend",
+    "get_json_backend",
+    "iter_json",
+    "register_json_backend",
+    "set_default_json_backend",
+    "tojson",
+]
@@ -0,0 +1,241 @@
+"""Serve vector tiles of large GeoJSON from a local HTTP server.
+
+Inline GeoJSON has to be shipped to and parsed by the browser in one piece,
+which stops scaling at a few hundred thousand features. :class:`TileServer`
+slices the data with :class:`~maplibreum.tiling.TileIndex` instead and
+serves ``/{z}/{x}/{y}.pbf`` vector tiles from a threaded HTTP server bound
+to localhost, so the browser only fetches what is on screen. Encoded tiles
+are kept in a least-recently-used cache and sent gzip-compressed.
+
+Typical use::
+
+    server = TileServer(big_geojson, layer_name="sidewalks").start()
+    m.add_source("sidewalks", server.source())
+    m.add_layer({"id": "sidewalks", "type": "line", "source": "sidewalks",
+                 "source-layer": "sidewalks"})
+
+Everything runs on the local machine; the page must be viewed while the
+Python process is alive.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import re
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from .mvt import encode_tile
+from .sources import VectorSource
+from .tiling import TileIndex
+
+_TILE_PATH = re.compile(r"^/(\d+)/(\d+)/(\d+)\.pbf$")
+
+#: Media type MapLibre expects for vector tiles.
+TILE_CONTENT_TYPE = "application/vnd.mapbox-vector-tile"
+
+
+class TileServer:
+    """Local vector tile server for GeoJSON data.
+
+    Parameters
+    ----------
+    data : dict, GeoJSONSource, GeoDataFrame or TileIndex
+        Features to serve, or a prepared :class:`~maplibreum.tiling.TileIndex`.
+    layer_name : str, optional
+        Name of the vector layer inside each tile (the ``source-layer`` of
+        map layers).
+    host : str, optional
+        Interface to bind. Defaults to localhost only.
+    port : int, optional
+        Port to bind; ``0`` picks a free port.
+    cache_size : int, optional
+        Number of encoded tiles kept in memory.
+    compress : bool, optional
+        Send tiles gzip-compressed to clients that accept it.
+    **index_options
+        Passed to :class:`~maplibreum.tiling.TileIndex` (``max_zoom``,
+        ``tolerance``, ``buffer``, ...).
+    """
+
+    def __init__(
+        self,
+        data: Any,
+        *,
+        layer_name: str = "features",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        cache_size: int = 1024,
+        compress: bool = True,
+        **index_options: Any,
+    ):
+        self.index = data if isinstance(data, TileIndex) else TileIndex(data, **index_options)
+        self.layer_name = layer_name
+        self.host = host
+        self.port = port
+        self.cache_size = cache_size
+        self.compress = compress
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # -- tiles ---------------------------------------------------------
+    def tile(self, z: int, x: int, y: int) -> bytes:
+        """Return tile ``z/x/y`` as served (gzip-compressed when enabled).
+
+        Empty tiles are returned as ``b""``.
+        """
+
+        key = (z, x, y)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        features = self.index.get_tile(z, x, y)
+        body = b""
+        if features:
+            body = encode_tile({self.layer_name: features}, extent=self.index.extent)
+            if self.compress and body:
+                body = gzip.compress(body, compresslevel=6, mtime=0)
+        with self._lock:
+            self._cache[key] = body
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return body
+
+    # -- lifecycle -----------------------------------------------------
+    def start(self) -> "TileServer":
+        """Start serving in a daemon thread and return ``self``."""
+
+        if self._httpd is not None:
+            return self
+        server = self
+
+        class Handler(_TileRequestHandler):
+            tile_server = server
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="maplibreum-tiles", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server and release its port."""
+
+        if self._httpd is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+        self._httpd = self._thread = None
+
+    def __enter__(self) -> "TileServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    # -- configuration -------------------------------------------------
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+
+        if self._httpd is None:
+            raise RuntimeError("TileServer is not running; call start() first")
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def tile_url(self) -> str:
+        """Tile URL template for MapLibre's ``tiles`` option."""
+
+        return f"{self.url}/{{z}}/{{x}}/{{y}}.pbf"
+
+    def tilejson(self) -> Dict[str, Any]:
+        """Return the TileJSON document served at ``/tiles.json``."""
+
+        document: Dict[str, Any] = {
+            "tilejson": "3.0.0",
+            "tiles": [self.tile_url],
+            "minzoom": 0,
+            "maxzoom": self.index.max_zoom,
+            "vector_layers": [{"id": self.layer_name, "fields": dict(self.index.fields)}],
+        }
+        if self.index.bounds is not None:
+            document["bounds"] = self.index.bounds
+        return document
+
+    def source(self, **kwargs: Any) -> VectorSource:
+        """Return a :class:`~maplibreum.sources.VectorSource` for this server.
+
+        Keyword arguments are passed to ``VectorSource``.
+        """
+
+        options: Dict[str, Any] = {"min_zoom": 0, "max_zoom": self.index.max_zoom}
+        if self.index.bounds is not None:
+            options["bounds"] = self.index.bounds
+        options.update(kwargs)
+        return VectorSource(tiles=[self.tile_url], **options)
+
+
+class _TileRequestHandler(BaseHTTPRequestHandler):
+    tile_server: TileServer
+
+    def _send(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802 - BaseHTTPRequestHandler API
+        path = self.path.split("?", 1)[0]
+        server = self.tile_server
+        if path in ("/tiles.json", "/tilejson.json"):
+            body = json.dumps(server.tilejson()).encode("utf-8")
+            self._send(200, body, {"Content-Type": "application/json"})
+            return
+        match = _TILE_PATH.match(path)
+        if match is None:
+            self._send(404)
+            return
+        body = server.tile(*(int(value) for value in match.groups()))
+        if not body:
+            self._send(204)
+            return
+        headers = {"Content-Type": TILE_CONTENT_TYPE, "Cache-Control": "max-age=3600"}
+        if server.compress:
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                headers["Content-Encoding"] = "gzip"
+            else:
+                body = gzip.decompress(body)
+        self._send(200, body, headers)
+
+    do_HEAD = do_GET
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def serve_geojson(data: Any, **kwargs: Any) -> TileServer:
+    """Start a :class:`TileServer` for ``data`` and return it."""
+
+    return TileServer(data, **kwargs).start()
+
+
+__all__ = ["TILE_CONTENT_TYPE", "TileServer", "serve_geojson"]
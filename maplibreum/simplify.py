@@ -0,0 +1,383 @@
+"""Zoom-banded geometry simplification for GeoJSON sources.
+
+MapLibre simplifies GeoJSON again for every tile it cuts, but the full
+resolution geometry is still shipped to (and parsed by) the browser.
+:class:`SimplifiedGeoJson` builds a small level-of-detail pyramid in Python
+instead: one pre-simplified copy of the data per zoom band, each wired to
+its own copy of the layers with matching ``minzoom``/``maxzoom``.
+
+Distances are measured in Web Mercator pixels, so a tolerance of ``1`` keeps
+every vertex that would move by more than one screen pixel at the upper
+zoom of a band.
+"""
+
+from __future__ import annotations
+
+import copy
+import heapq
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .utils import get_geojson_dict, get_id
+
+#: Default zoom bands as ``(minzoom, maxzoom)``; ``None`` means unbounded.
+DEFAULT_BANDS: Tuple[Tuple[int, Optional[int]], ...] = (
+    (0, 6),
+    (6, 10),
+    (10, 14),
+    (14, None),
+)
+
+# MapLibre renders 512 px tiles, so the world is 512 * 2**z pixels wide.
+_TILE_SIZE = 512
+_METHODS = ("douglas-peucker", "visvalingam")
+
+
+def _project(coords: np.ndarray) -> np.ndarray:
+    """Project ``[lng, lat]`` pairs to Web Mercator units in ``[0, 1]``."""
+
+    lng = coords[:, 0]
+    lat = np.clip(coords[:, 1], -85.0511287798, 85.0511287798)
+    x = lng / 360.0 + 0.5
+    sin = np.sin(np.radians(lat))
+    y = 0.5 - 0.25 * np.log((1 + sin) / (1 - sin)) / math.pi
+    return np.column_stack((x, y))
+
+
+def _sq_segment_distances(points: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Squared distances from ``points`` to the segment ``a``-``b``."""
+
+    ab = b - a
+    length = float(ab @ ab)
+    if length == 0.0:
+        delta = points - a
+    else:
+        t = np.clip((points - a) @ ab / length, 0.0, 1.0)
+        delta = points - (a + t[:, None] * ab)
+    return np.einsum("ij,ij->i", delta, delta)
+
+
+def _douglas_peucker(xy: np.ndarray, tolerance: float) -> np.ndarray:
+    """Return a boolean mask of the vertices kept by Douglas-Peucker."""
+
+    n = len(xy)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    sq_tolerance = tolerance * tolerance
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        distances = _sq_segment_distances(xy[start + 1 : end], xy[start], xy[end])
+        index = int(np.argmax(distances))
+        if distances[index] > sq_tolerance:
+            split = start + 1 + index
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return keep
+
+
+def _triangle_areas(xy: np.ndarray, prev: np.ndarray, nxt: np.ndarray) -> np.ndarray:
+    a, b, c = xy[prev], xy, xy[nxt]
+    return 0.5 * np.abs(
+        (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1])
+        - (c[:, 0] - a[:, 0]) * (b[:, 1] - a[:, 1])
+    )
+
+
+def _visvalingam(xy: np.ndarray, tolerance: float) -> np.ndarray:
+    """Return a boolean mask of the vertices kept by Visvalingam-Whyatt.
+
+    Vertices whose effective triangle area is below ``tolerance**2`` are
+    removed smallest first. The initial areas are computed in one vectorized
+    pass; only the neighbours of removed vertices are recomputed.
+    """
+
+    n = len(xy)
+    keep = np.ones(n, dtype=bool)
+    if n < 3:
+        return keep
+    prev = np.arange(-1, n - 1)
+    nxt = np.arange(1, n + 1)
+    prev[0] = 0
+    nxt[-1] = n - 1
+    areas = _triangle_areas(xy, prev, nxt)
+    min_area = tolerance * tolerance
+    heap = [(areas[i], i) for i in range(1, n - 1) if areas[i] < min_area]
+    heapq.heapify(heap)
+    while heap:
+        area, index = heapq.heappop(heap)
+        if not keep[index] or area != areas[index]:
+            continue
+        keep[index] = False
+        before, after = prev[index], nxt[index]
+        nxt[before] = after
+        prev[after] = before
+        for neighbour in (before, after):
+            if neighbour in (0, n - 1):
+                continue
+            p, q = prev[neighbour], nxt[neighbour]
+            a, b, c = xy[p], xy[neighbour], xy[q]
+            updated = 0.5 * abs(
+                (b[0] - a[0]) * (c[1] - a[1]) - (c[0] - a[0]) * (b[1] - a[1])
+            )
+            # Never let a neighbour's area drop below the one just removed.
+            updated = max(updated, area)
+            areas[neighbour] = updated
+            if updated < min_area:
+                heapq.heappush(heap, (updated, neighbour))
+    return keep
+
+
+def simplify_coords(
+    coords: Any, tolerance: float, method: str = "douglas-peucker"
+) -> np.ndarray:
+    """Simplify a single line or ring.
+
+    Parameters
+    ----------
+    coords : array-like
+        Sequence of ``[lng, lat]`` (optionally ``[lng, lat, z]``) positions.
+    tolerance : float
+        Tolerance in Web Mercator units (the world spans ``[0, 1]``).
+    method : str, optional
+        ``"douglas-peucker"`` (default) or ``"visvalingam"``.
+
+    Returns
+    -------
+    numpy.ndarray
+        The kept positions, in input order. The first and last positions are
+        always preserved.
+    """
+
+    if method not in _METHODS:
+        raise ValueError(f"method must be one of {', '.join(_METHODS)}")
+    array = np.asarray(coords, dtype=float)
+    if len(array) < 3:
+        return array
+    xy = _project(array)
+    if method == "visvalingam":
+        mask = _visvalingam(xy, tolerance)
+    else:
+        mask = _douglas_peucker(xy, tolerance)
+    return array[mask]
+
+
+def _ring_area(ring: np.ndarray) -> float:
+    xy = _project(ring)
+    x, y = xy[:, 0], xy[:, 1]
+    return 0.5 * abs(float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))))
+
+
+def _simplify_polygon(rings, tolerance, method):
+    simplified = []
+    for index, ring in enumerate(rings):
+        array = np.asarray(ring, dtype=float)
+        # Rings smaller than a pixel vanish; dropping the outer ring drops
+        # the polygon together with its holes.
+        if len(array) < 4 or _ring_area(array) < tolerance * tolerance:
+            if index == 0:
+                return None
+            continue
+        reduced = simplify_coords(array, tolerance, method)
+        if len(reduced) < 4:
+            if index == 0:
+                return None
+            continue
+        simplified.append(reduced.tolist())
+    return simplified
+
+
+def simplify_geometry(
+    geometry: Optional[Dict[str, Any]], tolerance: float, method: str = "douglas-peucker"
+) -> Optional[Dict[str, Any]]:
+    """Return a simplified copy of a GeoJSON geometry.
+
+    Points are returned unchanged. Polygons (or polygon parts) whose area is
+    below one squared ``tolerance`` are removed; ``None`` is returned when
+    nothing is left.
+    """
+
+    if not geometry:
+        return geometry
+    kind = geometry.get("type")
+    coords = geometry.get("coordinates")
+    if kind in ("Point", "MultiPoint"):
+        return geometry
+    if kind == "LineString":
+        return {**geometry, "coordinates": simplify_coords(coords, tolerance, method).tolist()}
+    if kind == "MultiLineString":
+        return {
+            **geometry,
+            "coordinates": [
+                simplify_coords(line, tolerance, method).tolist() for line in coords
+            ],
+        }
+    if kind == "Polygon":
+        rings = _simplify_polygon(coords, tolerance, method)
+        return None if rings is None else {**geometry, "coordinates": rings}
+    if kind == "MultiPolygon":
+        polygons = [_simplify_polygon(polygon, tolerance, method) for polygon in coords]
+        polygons = [polygon for polygon in polygons if polygon is not None]
+        return {**geometry, "coordinates": polygons} if polygons else None
+    if kind == "GeometryCollection":
+        parts = [
+            simplify_geometry(part, tolerance, method)
+            for part in geometry.get("geometries") or []
+        ]
+        parts = [part for part in parts if part is not None]
+        return {**geometry, "geometries": parts} if parts else None
+    return geometry
+
+
+def simplify_geojson(
+    data: Any, tolerance: float, method: str = "douglas-peucker"
+) -> Dict[str, Any]:
+    """Return a simplified copy of a FeatureCollection.
+
+    Features whose geometry disappears entirely are dropped; properties are
+    shared with the input, which is not modified.
+    """
+
+    data = get_geojson_dict(data)
+    if data.get("type") != "FeatureCollection":
+        raise ValueError("simplify_geojson expects a FeatureCollection")
+    features = []
+    for feature in data.get("features") or []:
+        geometry = simplify_geometry(feature.get("geometry"), tolerance, method)
+        if geometry is None and feature.get("geometry") is not None:
+            continue
+        features.append({**feature, "geometry": geometry})
+    return {**data, "features": features}
+
+
+def pixel_tolerance(pixels: float, zoom: float) -> float:
+    """Convert a tolerance in screen pixels at ``zoom`` to Mercator units."""
+
+    return pixels / (_TILE_SIZE * 2.0 ** zoom)
+
+
+def build_lod_pyramid(
+    data: Any,
+    bands: Iterable[Tuple[int, Optional[int]]] = DEFAULT_BANDS,
+    tolerance: float = 1.0,
+    method: str = "douglas-peucker",
+) -> List[Tuple[int, Optional[int], Dict[str, Any]]]:
+    """Build one simplified copy of ``data`` per zoom band.
+
+    Each band is simplified for its upper zoom, the most detailed zoom at
+    which it is displayed. The band without an upper bound keeps the
+    original geometry.
+
+    Returns
+    -------
+    list of tuple
+        ``(minzoom, maxzoom, FeatureCollection)`` for every band.
+    """
+
+    data = get_geojson_dict(data)
+    pyramid = []
+    for minzoom, maxzoom in bands:
+        if maxzoom is None:
+            pyramid.append((minzoom, maxzoom, data))
+        else:
+            band_data = simplify_geojson(data, pixel_tolerance(tolerance, maxzoom), method)
+            pyramid.append((minzoom, maxzoom, band_data))
+    return pyramid
+
+
+class SimplifiedGeoJson:
+    """GeoJSON overlay backed by a zoom-banded simplification pyramid.
+
+    Parameters
+    ----------
+    data : dict or object with ``__geo_interface__``
+        FeatureCollection to display.
+    layers : list of dict
+        MapLibre layer definitions without ``source``. Each layer is added
+        once per band with ``minzoom``/``maxzoom`` set to the band limits.
+    name : str, optional
+        Base name for the generated sources and layers.
+    bands : sequence of tuple, optional
+        ``(minzoom, maxzoom)`` pairs; ``maxzoom=None`` marks the
+        full-resolution band. Defaults to :data:`DEFAULT_BANDS`.
+    tolerance : float, optional
+        Simplification tolerance in screen pixels. Defaults to ``1``.
+    method : str, optional
+        ``"douglas-peucker"`` (default) or ``"visvalingam"``.
+    source_options : dict, optional
+        Extra options copied into every generated GeoJSON source.
+
+    Notes
+    -----
+    Combined with ``Map.save(..., data_dir=...)`` every band is written to
+    its own sidecar file.
+    """
+
+    def __init__(
+        self,
+        data,
+        layers: Sequence[Dict[str, Any]],
+        name: Optional[str] = None,
+        bands: Optional[Sequence[Tuple[int, Optional[int]]]] = None,
+        tolerance: float = 1.0,
+        method: str = "douglas-peucker",
+        source_options: Optional[Dict[str, Any]] = None,
+    ):
+        if method not in _METHODS:
+            raise ValueError(f"method must be one of {', '.join(_METHODS)}")
+        if not layers:
+            raise ValueError("SimplifiedGeoJson requires at least one layer")
+        self.data = get_geojson_dict(data)
+        self.layers = list(layers)
+        self.name = name or get_id("simplified_geojson_")
+        self.bands = list(bands) if bands is not None else list(DEFAULT_BANDS)
+        self.tolerance = tolerance
+        self.method = method
+        self.source_options = dict(source_options or {})
+        self.source_names: List[str] = []
+        self.layer_ids: List[str] = []
+
+    def add_to(self, map_instance, before=None):
+        """Add the band sources and layers to a map instance.
+
+        Returns
+        -------
+        self
+        """
+        pyramid = build_lod_pyramid(self.data, self.bands, self.tolerance, self.method)
+        for minzoom, maxzoom, band_data in pyramid:
+            source_name = f"{self.name}_z{minzoom}"
+            map_instance.add_source(
+                source_name,
+                {"type": "geojson", "data": band_data, **self.source_options},
+            )
+            self.source_names.append(source_name)
+            for layer in self.layers:
+                definition = copy.deepcopy(layer)
+                base_id = definition.get("id") or get_id(f"{self.name}_layer_")
+                definition["id"] = f"{base_id}_z{minzoom}"
+                definition["minzoom"] = minzoom
+                if maxzoom is not None:
+                    definition["maxzoom"] = maxzoom
+                else:
+                    definition.pop("maxzoom", None)
+                self.layer_ids.append(
+                    map_instance.add_layer(definition, source=source_name, before=before)
+                )
+        return self
+
+
+__all__ = [
+    "DEFAULT_BANDS",
+    "SimplifiedGeoJson",
+    "build_lod_pyramid",
+    "pixel_tolerance",
+    "simplify_coords",
+    "simplify_geojson",
+    "simplify_geometry",
+]
@@ -6,7 +6,7 @@ import json
 from pathlib import Path
 from typing import Any, Dict, Mapping, Optional, Sequence, Union
 
-from .utils import get_geojson_dict
+from .utils import get_geojson_dict, round_geojson
 
 def _normalise_options(
     options: Mapping[str, Any], key_map: Mapping[str, str] | None = None
@@ -255,12 +255,15 @@ class GeoJSONSource(Source):
         filter: Optional[Any] = None,
         pre_fetch_zoom_delta: Optional[int] = None,
         file_path: Optional[Union[str, Path]] = None,
+        coordinate_precision: Optional[int] = None,
         **kwargs: Any,
     ) -> None:
         resolved: Dict[str, Any] = {}
         if data is not None:
             resolved["data"] = get_geojson_dict(data)
         self._file_path = file_path
+        # Applied in ``to_dict``; not a MapLibre source option.
+        self.coordinate_precision = coordinate_precision
 
         resolved.update(
             _normalise_options(
@@ -288,11 +291,19 @@ class GeoJSONSource(Source):
         super().__init__("geojson", **resolved)
 
     def to_dict(self) -> Dict[str, Any]:
-        """Return a serialisable representation of the source."""
+        """Return a serialisable representation of the source.
+
+        When ``coordinate_precision`` is set, the returned ``data`` is a
+        rounded copy; the data held by the source is left untouched.
+        """
         # Ensure lazy data is populated before serialization
         if "data" not in self.options and self._file_path:
             _ = self.data
-        return super().to_dict()
+        payload = super().to_dict()
+        data = payload.get("data")
+        if self.coordinate_precision is not None and isinstance(data, dict):
+            payload["data"] = round_geojson(data, self.coordinate_precision)
+        return payload
 
     @property
     def data(self) -> Any:
@@ -0,0 +1,91 @@
+"""Process-wide registry for the bundled Jinja2 templates.
+
+Compiling ``map_template.html`` is one of the most expensive steps of building
+a :class:`~maplibreum.core.Map`. The registry below creates a single
+:class:`jinja2.Environment` per process, compiles each template on first use
+and hands the same :class:`jinja2.Template` object to every caller. Code
+that needs to change filters or globals takes a private environment from
+:func:`create_environment` instead of editing the shared one.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Dict, Optional
+
+from jinja2 import Environment, FileSystemLoader, Template
+
+from .profiling import profile_mark
+from .serialization import tojson
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+_lock = threading.RLock()
+_environment: Optional[Environment] = None
+_templates: Dict[str, Template] = {}
+
+
+def create_environment() -> Environment:
+    """Create an environment configured like the shared one.
+
+    Templates loaded from it are compiled again, and changes to its
+    filters or globals do not affect other environments.
+    """
+
+    env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), auto_reload=False)
+    env.filters["tojson"] = tojson
+    env.globals["profile_mark"] = profile_mark
+    return env
+
+
+def get_environment() -> Environment:
+    """Return the shared Jinja2 environment, creating it on first use."""
+
+    global _environment
+    env = _environment
+    if env is None:
+        with _lock:
+            if _environment is None:
+                _environment = create_environment()
+            env = _environment
+    return env
+
+
+def get_template(name: str) -> Template:
+    """Return the compiled bundled template called ``name``.
+
+    Templates are compiled at most once per process (or once per
+    :func:`reload_templates` call) and shared between all callers.
+    """
+
+    template = _templates.get(name)
+    if template is None:
+        with _lock:
+            template = _templates.get(name)
+            if template is None:
+                template = get_environment().get_template(name)
+                _templates[name] = template
+    return template
+
+
+def reload_templates() -> None:
+    """Discard every compiled template so the next lookup re-reads the files.
+
+    Useful while editing the bundled templates in a long-running session.
+    Maps created earlier keep the template object they were built with.
+    """
+
+    global _environment
+    with _lock:
+        _templates.clear()
+        _environment = None
+
+
+__all__ = [
+    "TEMPLATE_DIR",
+    "create_environment",
+    "get_environment",
+    "get_template",
+    "reload_templates",
+]
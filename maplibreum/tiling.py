@@ -0,0 +1,833 @@
+"""On-demand vector tile slicing of GeoJSON, after geojson-vt.
+
+:class:`TileIndex` projects the input once, computes a Douglas-Peucker
+importance for every vertex, and cuts the data into tiles the way
+`geojson-vt <https://github.com/mapbox/geojson-vt>`_ does: tiles down to
+``index_max_zoom`` are sliced up front, deeper tiles are sliced on request
+from the nearest ancestor that still holds its source features. A requested
+tile keeps only the vertices that matter at its zoom and is quantized to the
+tile ``extent``, ready for :func:`maplibreum.mvt.encode_tile`.
+
+Single-point features are stored column-wise, so slicing point data is a
+vectorized mask rather than a loop over features. Features are not wrapped
+across the antimeridian.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from .mvt import DEFAULT_EXTENT, LINESTRING, POINT, POLYGON, encode_tile
+from .simplify import _project, _sq_segment_distances
+from .sources import GeoJSONSource
+from .utils import get_geojson_dict
+
+
+class _Feature:
+    __slots__ = ("type", "geometry", "properties", "id", "bbox")
+
+    def __init__(self, geom_type, geometry, properties, feature_id):
+        self.type = geom_type
+        self.geometry = geometry
+        self.properties = properties
+        self.id = feature_id
+        self.bbox = _bbox(geom_type, geometry)
+
+
+class _Points:
+    """Single-point features stored column-wise.
+
+    ``rows`` index the properties and IDs held by the :class:`TileIndex`.
+    """
+
+    __slots__ = ("type", "geometry", "rows", "bbox")
+
+    def __init__(self, geometry: np.ndarray, rows: np.ndarray):
+        self.type = POINT
+        self.geometry = geometry
+        self.rows = rows
+        self.bbox = _bbox(POINT, geometry)
+
+
+def _arrays(geom_type: int, geometry: Any) -> Iterable[np.ndarray]:
+    if geom_type == POLYGON:
+        for polygon in geometry:
+            yield from polygon
+    elif geom_type == LINESTRING:
+        yield from geometry
+    else:
+        yield geometry
+
+
+def _bbox(geom_type: int, geometry: Any) -> Tuple[float, float, float, float]:
+    arrays = [array for array in _arrays(geom_type, geometry) if len(array)]
+    if not arrays:
+        return (np.inf, np.inf, -np.inf, -np.inf)
+    stacked = arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+    mins, maxs = stacked[:, :2].min(axis=0), stacked[:, :2].max(axis=0)
+    return (float(mins[0]), float(mins[1]), float(maxs[0]), float(maxs[1]))
+
+
+# Below this many vertices a scalar loop beats NumPy's per-call overhead.
+_SCALAR_SPAN = 64
+
+
+def _sq_segment_distance(px, py, ax, ay, bx, by) -> float:
+    dx, dy = bx - ax, by - ay
+    if dx or dy:
+        t = ((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy)
+        if t > 1:
+            ax, ay = bx, by
+        elif t > 0:
+            ax += dx * t
+            ay += dy * t
+    dx, dy = px - ax, py - ay
+    return dx * dx + dy * dy
+
+
+def _importance(xy: np.ndarray, sq_tolerance: float) -> np.ndarray:
+    """Return per-vertex Douglas-Peucker importance (squared distances).
+
+    End points get ``1`` so they are always kept; vertices below
+    ``sq_tolerance`` at the deepest zoom get ``0``.
+    """
+
+    n = len(xy)
+    importance = np.zeros(n)
+    importance[0] = importance[-1] = 1.0
+    xs = ys = None
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        if end - start < _SCALAR_SPAN:
+            if xs is None:
+                xs, ys = xy[:, 0].tolist(), xy[:, 1].tolist()
+            ax, ay, bx, by = xs[start], ys[start], xs[end], ys[end]
+            best, split = -1.0, start
+            for i in range(start + 1, end):
+                distance = _sq_segment_distance(xs[i], ys[i], ax, ay, bx, by)
+                if distance > best:
+                    best, split = distance, i
+        else:
+            distances = _sq_segment_distances(xy[start + 1 : end], xy[start], xy[end])
+            index = int(np.argmax(distances))
+            best, split = float(distances[index]), start + 1 + index
+        if best > sq_tolerance:
+            importance[split] = best
+            stack.append((start, split))
+            stack.append((split, end))
+    return importance
+
+
+class _Converter:
+    """Collect GeoJSON geometries and project all their vertices at once."""
+
+    def __init__(self, sq_tolerance: float):
+        self.sq_tolerance = sq_tolerance
+        self.parts: List[np.ndarray] = []
+        self.pending: List[Tuple[int, Any, Any, Any]] = []
+
+    def _part(self, coords: Any) -> int:
+        array = np.asarray(coords, dtype=float)
+        self.parts.append(array.reshape(-1, array.shape[-1])[:, :2])
+        return len(self.parts) - 1
+
+    def add(self, geometry: Mapping, properties: Any, feature_id: Any) -> None:
+        geom_type = geometry.get("type")
+        coords = geometry.get("coordinates")
+        if geom_type == "GeometryCollection":
+            for child in geometry.get("geometries", []):
+                self.add(child, properties, feature_id)
+            return
+        if coords is None or len(coords) == 0:
+            return
+        if geom_type in ("Point", "MultiPoint"):
+            self.pending.append((POINT, self._part(coords), properties, feature_id))
+        elif geom_type in ("LineString", "MultiLineString"):
+            lines = [coords] if geom_type == "LineString" else coords
+            parts = [self._part(line) for line in lines if len(line) > 1]
+            if parts:
+                self.pending.append((LINESTRING, parts, properties, feature_id))
+        elif geom_type in ("Polygon", "MultiPolygon"):
+            polygons = [coords] if geom_type == "Polygon" else coords
+            parts = [
+                [self._part(ring) for ring in polygon if len(ring) > 3]
+                for polygon in polygons
+                if len(polygon) and len(polygon[0]) > 3
+            ]
+            if parts:
+                self.pending.append((POLYGON, parts, properties, feature_id))
+
+    def features(self) -> List[_Feature]:
+        if not self.parts:
+            return []
+        sizes = [len(part) for part in self.parts]
+        projected = np.split(_project(np.concatenate(self.parts)), np.cumsum(sizes)[:-1])
+        sq_tolerance = self.sq_tolerance
+
+        def prepared(index: int, simplify: bool = True) -> np.ndarray:
+            xy = projected[index]
+            z = _importance(xy, sq_tolerance) if simplify else np.zeros(len(xy))
+            return np.column_stack((xy, z))
+
+        features = []
+        for geom_type, parts, properties, feature_id in self.pending:
+            if geom_type == POINT:
+                geometry = prepared(parts, simplify=False)
+            elif geom_type == LINESTRING:
+                geometry = [prepared(index) for index in parts]
+            else:
+                geometry = [[prepared(index) for index in polygon] for polygon in parts]
+            features.append(_Feature(geom_type, geometry, properties, feature_id))
+        return features
+
+
+def _clip_part(
+    part: np.ndarray, k1: float, k2: float, axis: int, polygon: bool
+) -> List[np.ndarray]:
+    """Clip one line or ring to ``k1 <= coordinate <= k2`` along ``axis``."""
+
+    values = part[:, axis]
+    low, high = values.min(), values.max()
+    if low >= k1 and high <= k2:
+        return [part]
+    if high < k1 or low > k2:
+        return []
+
+    pieces: List[List[Any]] = []
+    current: List[Any] = []
+    other = 1 - axis
+
+    def intersect(a, b, k):
+        t = (k - a[axis]) / (b[axis] - a[axis])
+        point = [0.0, 0.0, 1.0]
+        point[axis] = k
+        point[other] = a[other] + (b[other] - a[other]) * t
+        current.append(point)
+
+    rows = part.tolist()
+    for index in range(len(rows) - 1):
+        a, b = rows[index], rows[index + 1]
+        av, bv = a[axis], b[axis]
+        exited = False
+        if av < k1:
+            if bv > k1:
+                intersect(a, b, k1)
+        elif av > k2:
+            if bv < k2:
+                intersect(a, b, k2)
+        else:
+            current.append(a)
+        if bv < k1 and av >= k1:
+            intersect(a, b, k1)
+            exited = True
+        if bv > k2 and av <= k2:
+            intersect(a, b, k2)
+            exited = True
+        if not polygon and exited:
+            pieces.append(current)
+            current = []
+    last = rows[-1]
+    if k1 <= last[axis] <= k2:
+        current.append(last)
+    if polygon and len(current) >= 3 and current[0][:2] != current[-1][:2]:
+        current.append(list(current[0]))
+    if current:
+        pieces.append(current)
+    minimum = 4 if polygon else 2
+    return [np.asarray(piece) for piece in pieces if len(piece) >= minimum]
+
+
+def _clip(features: List[Any], scale: float, k1: float, k2: float, axis: int) -> List[Any]:
+    """Clip features to the band ``[k1, k2] / scale`` along ``axis``."""
+
+    k1 /= scale
+    k2 /= scale
+    clipped: List[Any] = []
+    for feature in features:
+        low, high = feature.bbox[axis], feature.bbox[axis + 2]
+        if low >= k1 and high <= k2:
+            clipped.append(feature)
+            continue
+        if high < k1 or low > k2:
+            continue
+        if feature.type == POINT:
+            points = feature.geometry
+            values = points[:, axis]
+            mask = (values >= k1) & (values <= k2)
+            if not mask.any():
+                continue
+            if isinstance(feature, _Points):
+                clipped.append(_Points(points[mask], feature.rows[mask]))
+            else:
+                clipped.append(_Feature(POINT, points[mask], feature.properties, feature.id))
+        elif feature.type == LINESTRING:
+            lines = [
+                piece
+                for line in feature.geometry
+                for piece in _clip_part(line, k1, k2, axis, polygon=False)
+            ]
+            if lines:
+                clipped.append(_Feature(LINESTRING, lines, feature.properties, feature.id))
+        else:
+            polygons = []
+            for polygon in feature.geometry:
+                # A polygon whose exterior ring vanished has no interior left.
+                rings = _clip_part(polygon[0], k1, k2, axis, polygon=True)
+                if rings:
+                    for ring in polygon[1:]:
+                        rings += _clip_part(ring, k1, k2, axis, polygon=True)
+                    polygons.append(rings)
+            if polygons:
+                clipped.append(_Feature(POLYGON, polygons, feature.properties, feature.id))
+    return clipped
+
+
+def _count_points(features: List[Any]) -> int:
+    return sum(
+        len(array) for feature in features for array in _arrays(feature.type, feature.geometry)
+    )
+
+
+class _Tile:
+    __slots__ = ("features", "source", "num_points")
+
+    def __init__(self, features, num_points):
+        # Projected, clipped features; quantized when the tile is requested.
+        self.features = features
+        self.source = features
+        self.num_points = num_points
+
+
+class TileIndex:
+    """Vector tile index over GeoJSON data.
+
+    Parameters
+    ----------
+    data : dict, GeoJSONSource, GeoDataFrame or ``__geo_interface__`` object
+        The features to tile.
+    max_zoom : int, optional
+        Deepest zoom for which tiles are produced; MapLibre overzooms beyond
+        it.
+    index_max_zoom : int, optional
+        Tiles are sliced eagerly down to this zoom.
+    index_max_points : int, optional
+        Eager slicing stops early for tiles with fewer vertices.
+    tolerance : float, optional
+        Simplification tolerance in ``extent`` units; vertices closer than
+        this to the simplified line are dropped below ``max_zoom``.
+    extent : int, optional
+        Integer units per tile side.
+    buffer : int, optional
+        Extra ``extent`` units kept around each tile so lines and polygons
+        join without seams.
+    """
+
+    def __init__(
+        self,
+        data: Any,
+        *,
+        max_zoom: int = 14,
+        index_max_zoom: int = 5,
+        index_max_points: int = 100_000,
+        tolerance: float = 3,
+        extent: int = DEFAULT_EXTENT,
+        buffer: int = 64,
+    ):
+        if not 0 <= max_zoom <= 24:
+            raise ValueError("max_zoom must be between 0 and 24")
+        self.max_zoom = max_zoom
+        self.index_max_zoom = min(index_max_zoom, max_zoom)
+        self.index_max_points = index_max_points
+        self.tolerance = tolerance
+        self.extent = extent
+        self.buffer = buffer
+        self._tiles: Dict[Tuple[int, int, int], _Tile] = {}
+        self._lock = threading.Lock()
+        self._point_properties: List[Mapping[str, Any]] = []
+        self._point_ids: List[Any] = []
+        #: Property names mapped to ``"Number"``, ``"String"`` or ``"Boolean"``.
+        self.fields: Dict[str, str] = {}
+
+        converter = _Converter((tolerance / ((1 << max_zoom) * extent)) ** 2)
+        points: List[Any] = []
+        for feature in _iter_features(data):
+            geometry = feature.get("geometry")
+            if not geometry:
+                continue
+            properties = feature.get("properties") or {}
+            for key, value in properties.items():
+                if key not in self.fields and value is not None:
+                    self.fields[key] = _field_type(value)
+            if geometry.get("type") == "Point" and geometry.get("coordinates") is not None:
+                points.append(geometry["coordinates"][:2])
+                self._point_properties.append(properties)
+                self._point_ids.append(feature.get("id"))
+                continue
+            converter.add(geometry, properties, feature.get("id"))
+        features: List[Any] = converter.features()
+        if points:
+            projected = _project(np.asarray(points, dtype=float).reshape(-1, 2))
+            features.append(
+                _Points(
+                    np.column_stack((projected, np.zeros(len(projected)))),
+                    np.arange(len(projected)),
+                )
+            )
+        self.bounds = _lnglat_bounds(features)
+        self._split(features, 0, 0, 0)
+
+    # -- slicing -------------------------------------------------------
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _children(self, features, z: int, x: int, y: int) -> List[Tuple[Any, int, int, int]]:
+        """Clip ``features`` of tile ``z/x/y`` into its non-empty children."""
+
+        k1 = 0.5 * self.buffer / self.extent
+        k2, k3, k4 = 0.5 - k1, 0.5 + k1, 1 + k1
+        z2 = 1 << z
+        children = []
+        left = _clip(features, z2, x - k1, x + k3, 0)
+        right = _clip(features, z2, x + k2, x + k4, 0)
+        for child_x, half in ((2 * x, left), (2 * x + 1, right)):
+            if not half:
+                continue
+            for child_y, (low, high) in ((2 * y, (y - k1, y + k3)), (2 * y + 1, (y + k2, y + k4))):
+                clipped = _clip(half, z2, low, high, 1)
+                if clipped:
+                    children.append((clipped, z + 1, child_x, child_y))
+        return children
+
+    def _split(self, features, z, x, y, cz=None, cx=None, cy=None) -> None:
+        stack = [(features, z, x, y)]
+        while stack:
+            features, z, x, y = stack.pop()
+            if not features:
+                continue
+            key = (z, x, y)
+            tile = self._tiles.get(key)
+            if tile is None:
+                tile = self._tiles[key] = _Tile(features, _count_points(features))
+            tile.source = features
+
+            if cz is None:
+                if z == self.index_max_zoom or tile.num_points <= self.index_max_points:
+                    continue
+            else:
+                if z == self.max_zoom or z == cz:
+                    continue
+                m = 1 << (cz - z)
+                if x != cx // m or y != cy // m:
+                    continue
+
+            tile.source = None
+            if z < self.max_zoom:
+                stack += self._children(features, z, x, y)
+
+    def _drill_down(self, z: int, x: int, y: int) -> Optional[_Tile]:
+        parent = None
+        z0, x0, y0 = z, x, y
+        while parent is None and z0 > 0:
+            z0 -= 1
+            x0 >>= 1
+            y0 >>= 1
+            parent = self._tiles.get((z0, x0, y0))
+        if parent is None or parent.source is None:
+            return None
+        self._split(parent.source, z0, x0, y0, z, x, y)
+        return self._tiles.get((z, x, y))
+
+    def get_tile(self, z: int, x: int, y: int) -> Optional[List[Dict[str, Any]]]:
+        """Return the features of tile ``z/x/y``, or ``None`` if it is empty.
+
+        Features are dictionaries in tile coordinates as accepted by
+        :func:`maplibreum.mvt.encode_tile`.
+        """
+
+        if z < 0 or z > self.max_zoom or not (0 <= x < (1 << z) and 0 <= y < (1 << z)):
+            return None
+        with self._lock:
+            tile = self._tiles.get((z, x, y))
+            if tile is None:
+                tile = self._drill_down(z, x, y)
+        if tile is None:
+            return None
+        return self._transform(tile.features, z, x, y) or None
+
+    def _transform(self, features, z: int, x: int, y: int) -> List[Dict[str, Any]]:
+        """Simplify and quantize ``features`` into MVT-ready dictionaries."""
+
+        z2 = 1 << z
+        extent = self.extent
+        tolerance = self.tolerance / (z2 * extent) if z < self.max_zoom else 0.0
+        sq_tolerance = tolerance * tolerance
+        origin = np.array([x, y], dtype=float)
+        output: List[Dict[str, Any]] = []
+        # Lines, rings and point groups of all features are processed in one
+        # batch; ``slots`` records where each part goes in the output.
+        arrays: List[np.ndarray] = []
+        kinds: List[int] = []
+        slots: List[Tuple[List[Any], int]] = []
+        for feature in features:
+            if isinstance(feature, _Points):
+                ints = np.rint((feature.geometry[:, :2] * z2 - origin) * extent).astype(
+                    np.int64
+                ).reshape(-1, 1, 2)
+                properties, ids = self._point_properties, self._point_ids
+                output += [
+                    {
+                        "type": POINT,
+                        "geometry": [point],
+                        "properties": properties[row],
+                        "id": ids[row],
+                    }
+                    for point, row in zip(ints, feature.rows.tolist())
+                ]
+                continue
+            geometry: List[Any] = []
+            output.append(
+                {
+                    "type": feature.type,
+                    "geometry": geometry,
+                    "properties": feature.properties,
+                    "id": feature.id,
+                }
+            )
+            if feature.type == POLYGON:
+                for polygon in feature.geometry:
+                    for index, ring in enumerate(polygon):
+                        arrays.append(ring)
+                        kinds.append(POLYGON)
+                        slots.append((geometry, index))
+            elif feature.type == POINT:
+                arrays.append(feature.geometry)
+                kinds.append(POINT)
+                slots.append((geometry, 0))
+            else:
+                for part in feature.geometry:
+                    arrays.append(part)
+                    kinds.append(feature.type)
+                    slots.append((geometry, 0))
+        if not arrays:
+            return output
+
+        count = len(arrays)
+        sizes = np.fromiter(map(len, arrays), dtype=np.intp, count=count)
+        coords = np.concatenate(arrays)
+        part = np.repeat(np.arange(count), sizes)
+        kind = np.asarray(kinds)
+        keep = (coords[:, 2] > sq_tolerance) | (kind == POINT)[part]
+        if tolerance:
+            # Lines shorter than the tolerance and rings smaller than its
+            # square vanish at this zoom.
+            same = part[1:] == part[:-1]
+            owner = part[1:][same]
+            x0, y0 = coords[:-1, 0][same], coords[:-1, 1][same]
+            x1, y1 = coords[1:, 0][same], coords[1:, 1][same]
+            length = np.bincount(owner, np.hypot(x1 - x0, y1 - y0), minlength=count)
+            area = np.abs(np.bincount(owner, x0 * y1 - x1 * y0, minlength=count)) / 2
+            dropped = ((kind == LINESTRING) & (length < tolerance)) | (
+                (kind == POLYGON) & (area < sq_tolerance)
+            )
+            keep &= ~dropped[part]
+        selected = np.flatnonzero(keep)
+        ints = np.rint((coords[selected, :2] * z2 - origin) * extent).astype(np.int64)
+        part = part[selected]
+        if len(ints) > 1:
+            moved = np.any(ints[1:] != ints[:-1], axis=1) | (part[1:] != part[:-1])
+            moved = np.concatenate(([True], moved))
+            ints, part = ints[moved], part[moved]
+        counts = np.bincount(part, minlength=count).tolist()
+        bounds = np.cumsum([0] + counts).tolist()
+        pieces = [ints[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+        minimum = {POINT: 1, LINESTRING: 2, POLYGON: 4}
+        rings: Optional[List[np.ndarray]] = None
+        for (geometry, index), part_kind, size, piece in zip(
+            slots, kinds, counts, pieces
+        ):
+            valid = size >= minimum[part_kind]
+            if part_kind != POLYGON:
+                if valid:
+                    geometry.append(piece)
+            elif index == 0:
+                # A polygon whose exterior ring vanished is dropped whole.
+                rings = [piece] if valid else None
+                if rings is not None:
+                    geometry.append(rings)
+            elif valid and rings is not None:
+                rings.append(piece)
+        return [feature for feature in output if feature["geometry"]]
+
+    def iter_tiles(
+        self, min_zoom: int = 0, max_zoom: Optional[int] = None
+    ) -> Iterator[Tuple[int, int, int, List[Dict[str, Any]]]]:
+        """Yield ``(z, x, y, features)`` for every non-empty tile.
+
+        Tiles are produced depth-first from the root without being stored
+        in the index, so memory stays proportional to the depth of the
+        pyramid rather than its size.
+        """
+
+        root = self._tiles.get((0, 0, 0))
+        if root is None:
+            return
+        yield from self._walk(root.features, 0, 0, 0, min_zoom, max_zoom)
+
+    def _walk(self, features, z, x, y, min_zoom, max_zoom=None):
+        max_zoom = self.max_zoom if max_zoom is None else min(max_zoom, self.max_zoom)
+        stack = [(features, z, x, y)]
+        while stack:
+            features, z, x, y = stack.pop()
+            if z >= min_zoom:
+                tile = self._transform(features, z, x, y)
+                if tile:
+                    yield z, x, y, tile
+            if z < max_zoom:
+                stack += reversed(self._children(features, z, x, y))
+
+    def _subtree(self, features) -> Tuple["TileIndex", List[Any]]:
+        """Return a detached copy of the index for one tile's ``features``.
+
+        Point properties are narrowed to the rows ``features`` reference so
+        the copy is cheap to send to a worker process.
+        """
+
+        batches = [feature.rows for feature in features if isinstance(feature, _Points)]
+        rows = np.unique(np.concatenate(batches)) if batches else np.empty(0, dtype=np.int64)
+        shell = object.__new__(TileIndex)
+        shell.__dict__.update(self.__dict__)
+        shell._tiles = {}
+        shell._lock = threading.Lock()
+        shell._point_properties = [self._point_properties[row] for row in rows.tolist()]
+        shell._point_ids = [self._point_ids[row] for row in rows.tolist()]
+        remapped = [
+            _Points(feature.geometry, np.searchsorted(rows, feature.rows))
+            if isinstance(feature, _Points)
+            else feature
+            for feature in features
+        ]
+        return shell, remapped
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+
+def _field_type(value: Any) -> str:
+    if isinstance(value, (bool, np.bool_)):
+        return "Boolean"
+    if isinstance(value, (int, float, np.number)):
+        return "Number"
+    return "String"
+
+
+def _iter_features(data: Any) -> Iterable[Dict[str, Any]]:
+    if isinstance(data, GeoJSONSource):
+        data = data.data
+    data = get_geojson_dict(data)
+    kind = data.get("type")
+    if kind == "FeatureCollection":
+        return data.get("features", [])
+    if kind == "Feature":
+        return [data]
+    return [{"type": "Feature", "geometry": data, "properties": {}}]
+
+
+def _lnglat_bounds(features: List[Any]) -> Optional[List[float]]:
+    boxes = np.array([feature.bbox for feature in features if np.isfinite(feature.bbox[0])])
+    if not len(boxes):
+        return None
+    min_x, min_y = boxes[:, 0].min(), boxes[:, 1].min()
+    max_x, max_y = boxes[:, 2].max(), boxes[:, 3].max()
+
+    def lng(x):
+        return float((x - 0.5) * 360.0)
+
+    def lat(y):
+        return float(np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * y)))))
+
+    return [lng(min_x), lat(max_y), lng(max_x), lat(min_y)]
+
+
+def _encode(features, layer_name: str, extent: int, compress: bool) -> bytes:
+    body = encode_tile({layer_name: features}, extent=extent)
+    return gzip.compress(body, compresslevel=6, mtime=0) if compress else body
+
+
+def iter_tile_pyramid(
+    data: Any,
+    min_zoom: int = 0,
+    max_zoom: int = 14,
+    *,
+    layer_name: str = "features",
+    compress: bool = False,
+    **index_options: Any,
+) -> Iterator[Tuple[int, int, int, bytes]]:
+    """Yield ``(z, x, y, tile_bytes)`` for every non-empty tile of ``data``.
+
+    Parameters
+    ----------
+    data : dict, GeoJSONSource, GeoDataFrame or TileIndex
+        Features to tile.
+    min_zoom, max_zoom : int, optional
+        Zoom range of the pyramid.
+    layer_name : str, optional
+        Name of the vector layer inside each tile.
+    compress : bool, optional
+        Gzip each tile.
+    **index_options
+        Passed to :class:`TileIndex` (``tolerance``, ``buffer``, ...).
+    """
+
+    index = data if isinstance(data, TileIndex) else _pyramid_index(data, max_zoom, index_options)
+    for z, x, y, features in index.iter_tiles(min_zoom, max_zoom):
+        yield z, x, y, _encode(features, layer_name, index.extent, compress)
+
+
+def _pyramid_index(data: Any, max_zoom: int, index_options: Dict[str, Any]) -> TileIndex:
+    # Only the root is kept; the pyramid is walked without storing tiles.
+    return TileIndex(data, max_zoom=max_zoom, index_max_zoom=0, **index_options)
+
+
+def _write_subtree(
+    index, features, z, x, y, min_zoom, max_zoom, out_dir, layer_name, compress, extension
+):
+    count = size = 0
+    for tz, tx, ty, tile in index._walk(features, z, x, y, min_zoom, max_zoom):
+        body = _encode(tile, layer_name, index.extent, compress)
+        count += 1
+        size += _write_tile(out_dir, tz, tx, ty, body, extension)
+    return count, size
+
+
+def _write_tile(out_dir: Path, z: int, x: int, y: int, body: bytes, extension: str) -> int:
+    directory = out_dir / str(z) / str(x)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{y}.{extension}").write_bytes(body)
+    return len(body)
+
+
+def write_tile_pyramid(
+    data: Any,
+    out_dir: Union[str, os.PathLike],
+    min_zoom: int = 0,
+    max_zoom: int = 14,
+    *,
+    layer_name: str = "features",
+    workers: Optional[int] = None,
+    compress: bool = False,
+    extension: str = "pbf",
+    **index_options: Any,
+) -> Dict[str, Any]:
+    """Write every non-empty tile of ``data`` to ``out_dir/{z}/{x}/{y}.pbf``.
+
+    The top of the pyramid is sliced in this process until there are
+    enough tiles to keep ``workers`` busy; the subtrees below them are then
+    sliced, encoded and written by a process pool.
+
+    Parameters
+    ----------
+    data : dict, GeoJSONSource, GeoDataFrame or ``__geo_interface__`` object
+        Features to tile.
+    out_dir : str or path-like
+        Output directory; a TileJSON ``metadata.json`` is written next to
+        the tiles.
+    min_zoom, max_zoom : int, optional
+        Zoom range of the pyramid.
+    layer_name : str, optional
+        Name of the vector layer inside each tile (the ``source-layer``).
+    workers : int, optional
+        Worker processes; defaults to the CPU count. ``1`` runs in-process.
+    compress : bool, optional
+        Gzip each tile. The web server must then send
+        ``Content-Encoding: gzip``.
+    extension : str, optional
+        File extension of the tiles.
+    **index_options
+        Passed to :class:`TileIndex` (``tolerance``, ``buffer``, ...).
+
+    Returns
+    -------
+    dict
+        The TileJSON metadata (without ``tiles`` URLs) plus
+        ``tile_count`` and ``total_bytes``. Use it with
+        ``VectorSource(tiles=[base_url + "/{z}/{x}/{y}.pbf"], ...)``.
+    """
+
+    if not 0 <= min_zoom <= max_zoom:
+        raise ValueError("min_zoom must be between 0 and max_zoom")
+    index = _pyramid_index(data, max_zoom, index_options)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    workers = (os.cpu_count() or 1) if workers is None else max(1, workers)
+    options = (min_zoom, max_zoom, out_dir, layer_name, compress, extension)
+
+    count = size = 0
+    root = index._tiles.get((0, 0, 0))
+    frontier = [(root.features, 0, 0, 0)] if root is not None else []
+    while workers > 1 and 0 < len(frontier) < 4 * workers and frontier[0][1] < max_zoom:
+        deeper = []
+        for features, z, x, y in frontier:
+            if z >= min_zoom:
+                tile = index._transform(features, z, x, y)
+                if tile:
+                    count += 1
+                    body = _encode(tile, layer_name, index.extent, compress)
+                    size += _write_tile(out_dir, z, x, y, body, extension)
+            deeper += index._children(features, z, x, y)
+        frontier = deeper
+
+    if workers > 1 and len(frontier) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_write_subtree, *index._subtree(features), z, x, y, *options)
+                for features, z, x, y in frontier
+            ]
+            results = [future.result() for future in futures]
+    else:
+        results = [
+            _write_subtree(index, features, z, x, y, *options) for features, z, x, y in frontier
+        ]
+    for tiles, nbytes in results:
+        count += tiles
+        size += nbytes
+
+    metadata: Dict[str, Any] = {
+        "tilejson": "3.0.0",
+        "minzoom": min_zoom,
+        "maxzoom": max_zoom,
+        "vector_layers": [
+            {
+                "id": layer_name,
+                "fields": dict(index.fields),
+                "minzoom": min_zoom,
+                "maxzoom": max_zoom,
+            }
+        ],
+        "tile_count": count,
+        "total_bytes": size,
+    }
+    if index.bounds is not None:
+        metadata["bounds"] = index.bounds
+    (out_dir / "metadata.json").write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    return metadata
+
+
+__all__ = ["TileIndex", "iter_tile_pyramid", "write_tile_pyramid"]
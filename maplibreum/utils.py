@@ -1,3 +1,8 @@
+import os
+import sys
+
+import numpy as np
+
 class IDGenerator:
     _counters = {}
 
@@ -16,6 +21,24 @@ class IDGenerator:
 def get_id(prefix=""):
     return IDGenerator.get_id(prefix)
 
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def external_stacklevel():
+    """Return the warning stacklevel of the first frame outside maplibreum.
+
+    Warnings raised while a render generator is consumed, or deep inside
+    the package, would otherwise point at whichever package frame happens
+    to call :func:`warnings.warn`.
+    """
+
+    frame = sys._getframe(1)
+    level = 1
+    while frame is not None and frame.f_code.co_filename.startswith(_PACKAGE_DIR):
+        frame = frame.f_back
+        level += 1
+    return level
+
 def get_geojson_dict(data):
     """
     Normalizes a variety of data types into a GeoJSON dictionary.
@@ -62,3 +85,75 @@ def get_geojson_dict(data):
         f"Cannot convert object of type {type(data)} to a GeoJSON dictionary. "
         "Expected a dictionary, a valid JSON string, a URL/path, or an object implementing __geo_interface__."
     )
+
+
+def _round_coordinates(coordinates, precision):
+    """Round a (possibly nested) coordinate array without mutating it."""
+
+    if isinstance(coordinates, np.ndarray):
+        if np.issubdtype(coordinates.dtype, np.floating):
+            return np.round(coordinates, precision)
+        return coordinates
+    if isinstance(coordinates, (list, tuple)):
+        if coordinates and isinstance(coordinates[0], float):
+            return [round(value, precision) for value in coordinates]
+        return [_round_coordinates(item, precision) for item in coordinates]
+    if isinstance(coordinates, float):
+        return round(coordinates, precision)
+    return coordinates
+
+
+def _round_geometry(geometry, precision):
+    if not isinstance(geometry, dict):
+        return geometry
+    if geometry.get("type") == "GeometryCollection":
+        return {
+            **geometry,
+            "geometries": [
+                _round_geometry(item, precision)
+                for item in geometry.get("geometries") or []
+            ],
+        }
+    if "coordinates" not in geometry:
+        return geometry
+    return {
+        **geometry,
+        "coordinates": _round_coordinates(geometry["coordinates"], precision),
+    }
+
+
+def round_geojson(data, precision):
+    """Return a copy of ``data`` with coordinates rounded to ``precision``.
+
+    Only the containers on the path to the coordinates are copied; feature
+    properties are shared with the input, which is never modified. NumPy
+    coordinate arrays are rounded with a single vectorized call.
+
+    Parameters
+    ----------
+    data : dict
+        A GeoJSON FeatureCollection, Feature or geometry.
+    precision : int
+        Number of decimal places to keep. Six decimals is roughly 10 cm at
+        the equator, which is finer than any web-map zoom level can show.
+
+    Returns
+    -------
+    dict
+        The rounded GeoJSON object.
+    """
+    if not isinstance(data, dict):
+        return data
+    kind = data.get("type")
+    if kind == "FeatureCollection":
+        features = data.get("features") or []
+        if callable(getattr(features, "round", None)):
+            # Columnar feature sequences round their coordinate arrays.
+            return {**data, "features": features.round(precision)}
+        return {
+            **data,
+            "features": [round_geojson(feature, precision) for feature in features],
+        }
+    if kind == "Feature":
+        return {**data, "geometry": _round_geometry(data.get("geometry"), precision)}
+    return _round_geometry(data, precision)
@@ -0,0 +1,124 @@
+"""Tests for adding sources and layers in bulk."""
+
+import json
+
+import pytest
+
+from maplibreum.babylon import BabylonLayer
+from maplibreum.core import Map
+from maplibreum.layers import Layer
+
+
+STYLE = {
+    "version": 8,
+    "sources": {
+        "tiles": {"type": "vector", "url": "https://example.com/tiles.json"},
+        "points": {"type": "geojson", "data": {"type": "FeatureCollection", "features": []}},
+    },
+    "layers": [
+        {"id": "roads", "type": "line", "source": "tiles", "source-layer": "roads"},
+        {"id": "dots", "type": "circle", "source": "points"},
+    ],
+}
+
+
+def test_style_fragment_adds_sources_then_layers():
+    m = Map()
+
+    assert m.add_layers(json.dumps(STYLE)) == ["roads", "dots"]
+
+    assert [source["name"] for source in m.sources] == ["tiles", "points"]
+    assert m.get_layer("dots")["source"] == "points"
+    html = m.render()
+    assert html.index('map.addSource("tiles"') < html.index('"id": "roads"')
+
+
+def test_bulk_matches_per_call_output():
+    layers = [
+        {"id": f"layer_{i}", "type": "line", "source": "tiles", "paint": {"line-width": i}}
+        for i in range(20)
+    ]
+    single = Map()
+    single.add_source("tiles", STYLE["sources"]["tiles"])
+    for layer in layers:
+        single.add_layer(dict(layer))
+
+    bulk = Map()
+    assert bulk.add_sources({"tiles": STYLE["sources"]["tiles"]}) == ["tiles"]
+    bulk.add_layers(dict(layer) for layer in layers)
+
+    assert bulk.sources == single.sources
+    assert bulk.layers == single.layers
+
+
+def test_mixed_wrappers_keep_their_order():
+    m = Map()
+    ids = m.add_layers(
+        [
+            {"id": "first", "type": "fill", "source": "s"},
+            Layer("second", "line", "s"),
+            {"type": "symbol", "source": "s"},
+        ],
+        before="water",
+    )
+
+    assert ids[:2] == ["first", "second"]
+    assert m.layers.keys() == ids
+    assert all(entry["before"] == "water" for entry in m.layers)
+
+
+def test_invalid_entries_leave_the_map_unchanged():
+    m = Map()
+    with pytest.raises(ValueError, match="position 1"):
+        m.add_layers([{"id": "ok", "type": "line"}, {"id": "broken"}])
+    with pytest.raises(ValueError, match="'b'"):
+        m.add_sources({"a": {"type": "vector"}, "b": {"url": "missing type"}})
+
+    assert len(m.layers) == 0
+    assert len(m.sources) == 0
+
+
+def test_invalid_style_fragment_adds_no_sources():
+    m = Map()
+    m.add_layer({"id": "dots", "type": "circle", "source": "points"})
+    broken = dict(STYLE, layers=[{"id": "roads", "type": "line"}, {"id": "no-type"}])
+    taken = dict(STYLE, layers=[{"id": "dots", "type": "circle"}])
+    repeated = dict(STYLE, layers=[{"id": "x", "type": "line"}, {"id": "x", "type": "fill"}])
+
+    for fragment in (broken, taken, repeated):
+        with pytest.raises(ValueError):
+            m.add_layers(fragment)
+
+    assert len(m.sources) == 0
+    assert m.layers.keys() == ["dots"]
+
+
+def test_failing_wrapper_rolls_back_the_whole_call():
+    m = Map()
+    m.add_layer({"id": "base", "type": "background"})
+    scripts = list(m.external_scripts)
+    fragment = dict(
+        STYLE,
+        layers=STYLE["layers"]
+        + [Layer("outline", "line", "points"), BabylonLayer("model", "model.glb", [1.0])],
+    )
+
+    with pytest.raises(IndexError):
+        m.add_layers(fragment)
+
+    assert len(m.sources) == 0 and m._source_revisions == {}
+    assert m.layers.keys() == ["base"]
+    assert m.external_scripts == scripts
+    assert m.add_layers(STYLE) == ["roads", "dots"]
+
+
+def test_add_sources_accepts_pairs_and_precision():
+    data = {
+        "type": "FeatureCollection",
+        "features": [{"type": "Feature", "geometry": {"type": "Point", "coordinates": [1.23456, 2.34567]}, "properties": {}}],
+    }
+    m = Map()
+    m.add_sources([("points", {"type": "geojson", "data": data})], coordinate_precision=2)
+
+    assert m.sources[0]["coordinate_precision"] == 2
+    assert '"coordinates": [1.23, 2.35]' in m.render()
@@ -1,7 +1,15 @@
+import numpy as np
 import pytest
 
 from maplibreum.core import Map, Marker
-from maplibreum.cluster import MarkerCluster
+from maplibreum.cluster import (
+    MarkerCluster,
+    Supercluster,
+    _abbreviate,
+    _greedy_seeds,
+    _sequential_seeds,
+    cluster_features,
+)
 
 
 def test_marker_cluster_source_and_layers():
@@ -40,6 +48,63 @@ def test_marker_cluster_source_and_layers():
     ]
 
 
+def test_marker_cluster_add_points_matches_markers():
+    lons, lats = np.array([0.5, 1.5, 2.5]), np.array([10.0, 11.0, 12.0])
+    by_marker, by_points = Map(), Map()
+    markers = MarkerCluster(name="c").add_to(by_marker)
+    for lon, lat, color in zip(lons.tolist(), lats.tolist(), ["red", "green", "blue"]):
+        by_marker.add_marker(coordinates=[lon, lat], color=color, cluster=markers)
+    points = MarkerCluster(name="c").add_to(by_points)
+    points.add_points(lons, lats, colors=np.array(["red", "green", "blue"]))
+
+    features = by_points.sources.get(points.source_name)["definition"]["data"]["features"]
+    assert len(features) == 3 and points.features == []
+    assert features == markers.features
+    assert features[-1] == markers.features[-1] and features[1:] == markers.features[1:]
+    assert by_points.render().replace(by_points.map_id, "") == by_marker.render().replace(
+        by_marker.map_id, ""
+    )
+
+
+def test_marker_cluster_add_points_columns_and_rendering():
+    from maplibreum.serialization import get_json_backend
+
+    m = Map(coordinate_precision=2)
+    cluster = MarkerCluster().add_to(m)
+    m.add_marker(coordinates=[0, 0], cluster=cluster)
+    count = 1000
+    cluster.add_points(
+        np.linspace(-10, 10, count),
+        np.linspace(-5, 5, count),
+        colors="#ff0000",
+        properties={"rank": np.arange(count)},
+    )
+    cluster.add_points([1.23456], [2.34567], properties=[{"name": "extra"}])
+    m.add_marker(coordinates=[3, 3], color="#00ff00", cluster=cluster)
+
+    features = m.sources.get(cluster.source_name)["definition"]["data"]["features"]
+    assert len(features) == count + 3
+    # Markers come first, then the point batches in the order they were added.
+    assert [f["geometry"]["coordinates"] for f in features[:2]] == [[0, 0], [3, 3]]
+    assert features[2]["properties"] == {"color": "#ff0000", "rank": 0}
+    assert features[2]["geometry"]["coordinates"] == [-10.0, -5.0]
+    assert type(features[count]["properties"]["rank"]) is int
+    assert features[-1]["properties"] == {"name": "extra"}
+
+    for name in ("stdlib", "compact"):
+        backend = get_json_backend(name)
+        data = {"type": "FeatureCollection", "features": features}
+        assert "".join(backend.iterencode(data)) == backend.dumps(data)
+    html = m.render()
+    assert '"coordinates": [1.23, 2.35]' in html
+    assert html.count('"Feature"') == count + 3
+
+    with pytest.raises(ValueError):
+        cluster.add_points([1, 2], [3])
+    with pytest.raises(ValueError):
+        cluster.add_points([1, 2], [3, 4], colors=["red"])
+
+
 def test_add_clustered_geojson():
     m = Map()
     data = {
@@ -61,3 +126,397 @@ def test_add_clustered_geojson():
     assert source["definition"]["clusterMaxZoom"] == 12
     assert len(m.layers) == 3
 
+
+
+def _points(count, seed=0, spread=((-180, -85), (180, 85))):
+    rng = np.random.default_rng(seed)
+    coords = rng.uniform(spread[0], spread[1], size=(count, 2))
+    return [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": coords[i].tolist()},
+            "properties": {"i": i},
+        }
+        for i in range(count)
+    ]
+
+
+def _reference_seeds(x, y, radius):
+    seed = [-1] * len(x)
+    for i in range(len(x)):
+        if seed[i] >= 0:
+            continue
+        for j in range(i, len(x)):
+            if seed[j] < 0 and (x[i] - x[j]) ** 2 + (y[i] - y[j]) ** 2 <= radius**2:
+                seed[j] = i
+    return seed
+
+
+@pytest.mark.parametrize("radius", [1e-4, 0.01, 0.05])
+def test_greedy_grouping_matches_sequential_supercluster(radius):
+    rng = np.random.default_rng(3)
+    x, y = rng.uniform(0, 0.2, size=(2, 400))
+
+    expected = _reference_seeds(x, y, radius)
+    assert _greedy_seeds(x, y, radius).tolist() == expected
+    assert _greedy_seeds(x, y, radius, max_rounds=1).tolist() == expected
+    assert _sequential_seeds(x, y, radius, node_size=8).tolist() == expected
+
+
+def test_supercluster_conserves_points_at_every_zoom():
+    index = cluster_features(_points(3000), radius=40, max_zoom=10)
+
+    previous = 0
+    for zoom in range(12):
+        features = index.get_clusters([-180, -90, 180, 90], zoom)
+        assert sum(f["properties"].get("point_count", 1) for f in features) == 3000
+        assert len(features) >= previous
+        previous = len(features)
+    # Above max_zoom every point is returned as loaded.
+    unclustered = index.get_clusters([-180, -90, 180, 90], 11)
+    assert sorted(f["properties"]["i"] for f in unclustered) == list(range(3000))
+
+
+def test_supercluster_children_leaves_and_expansion_zoom():
+    points = _points(2000, spread=((-10, 40), (10, 55)))
+    index = Supercluster(radius=60, max_zoom=12).load(points)
+
+    clusters = [
+        f for f in index.get_clusters([-180, -90, 180, 90], 2) if "cluster" in f["properties"]
+    ]
+    assert clusters
+    for cluster in clusters:
+        cluster_id = cluster["properties"]["cluster_id"]
+        count = cluster["properties"]["point_count"]
+        children = index.get_children(cluster_id)
+        assert len(children) > 1
+        assert sum(c["properties"].get("point_count", 1) for c in children) == count
+
+        leaves = index.get_leaves(cluster_id, limit=None)
+        assert len(leaves) == count
+        from_children = []
+        for child in children:
+            if "cluster" in child["properties"]:
+                from_children += index.get_leaves(child["id"], limit=None)
+            else:
+                from_children.append(child)
+        assert sorted(f["properties"]["i"] for f in from_children) == sorted(
+            f["properties"]["i"] for f in leaves
+        )
+        assert index.get_leaves(cluster_id, limit=3, offset=1) == leaves[1:4]
+
+        zoom = index.get_cluster_expansion_zoom(cluster_id)
+        before = {f.get("id") for f in index.get_clusters([-180, -90, 180, 90], zoom - 1)}
+        after = {f.get("id") for f in index.get_clusters([-180, -90, 180, 90], zoom)}
+        assert cluster_id in before and cluster_id not in after
+
+    with pytest.raises(ValueError):
+        index.get_children(0)
+    with pytest.raises(ValueError):
+        index.get_leaves(10**9)
+
+
+def test_supercluster_viewport_queries():
+    points = _points(5000, seed=1)
+    index = Supercluster(radius=40, max_zoom=14).load(points)
+
+    inside = index.get_clusters([0, 0, 40, 40], 16)
+    assert inside and all(0 <= f["geometry"]["coordinates"][0] <= 40 for f in inside)
+    expected = sum(
+        1 for f in points if 0 <= f["geometry"]["coordinates"][0] <= 40
+        and 0 <= f["geometry"]["coordinates"][1] <= 40
+    )
+    assert len(inside) == expected
+
+    # Boxes crossing the antimeridian are split in two.
+    wrapped = index.get_clusters([170, -20, -170, 20], 16)
+    assert len(wrapped) == len(index.get_clusters([170, -20, 180, 20], 16)) + len(
+        index.get_clusters([-180, -20, -170, 20], 16)
+    )
+    assert index.to_geojson(0)["features"] == index.get_clusters([-180, -90, 180, 90], 0)
+
+
+def test_supercluster_min_points_and_empty_input():
+    points = _points(50, spread=((0, 0), (0.001, 0.001)))
+    assert len(Supercluster(min_points=51).load(points).get_clusters([-180, -90, 180, 90], 0)) == 50
+    (cluster,) = Supercluster(min_points=50).load(points).get_clusters([-180, -90, 180, 90], 0)
+    assert cluster["properties"]["point_count_abbreviated"] == 50
+
+    assert Supercluster().load([]).get_clusters([-180, -90, 180, 90], 3) == []
+
+
+def test_point_count_abbreviation_rounds_halves_up():
+    assert [_abbreviate(count) for count in (999, 1000, 1250, 1949, 12500, 13499)] == [
+        999,
+        "1k",
+        "1.3k",
+        "1.9k",
+        "13k",
+        "13k",
+    ]
+
+
+def test_supercluster_columnar_input_matches_geojson():
+    points = _points(3000, seed=4)
+    coords = np.array([f["geometry"]["coordinates"] for f in points])
+
+    from_features = Supercluster(max_zoom=8).load(points)
+    from_array = Supercluster(max_zoom=8).load(coords, properties={"i": np.arange(3000)})
+    from_columns = Supercluster(max_zoom=8).load_arrays(
+        coords[:, 0], coords[:, 1], [{"i": i} for i in range(3000)]
+    )
+    for zoom in (0, 4, 9):
+        expected = from_features.get_clusters([-180, -90, 180, 90], zoom)
+        assert from_array.get_clusters([-180, -90, 180, 90], zoom) == expected
+        assert from_columns.get_clusters([-180, -90, 180, 90], zoom) == expected
+
+    cluster = next(
+        f for f in from_array.get_clusters([-180, -90, 180, 90], 0) if "cluster" in f["properties"]
+    )
+    leaves = from_array.get_leaves(cluster["id"], limit=None)
+    assert leaves == from_features.get_leaves(cluster["id"], limit=None)
+    assert all(type(leaf["properties"]["i"]) is int for leaf in leaves)
+
+
+def test_supercluster_skips_missing_coordinates():
+    lng = np.array([10.0, np.nan, 10.0001, 50.0])
+    lat = np.array([10.0, 5.0, 10.0001, np.inf])
+    index = Supercluster().load_arrays(lng, lat, {"name": ["a", "b", "c", "d"]})
+
+    assert index.num_points == 2
+    (cluster,) = index.get_clusters([-180, -90, 180, 90], 0)
+    assert sorted(f["properties"]["name"] for f in index.get_leaves(cluster["id"])) == ["a", "c"]
+    features = _points(10) + [{"type": "Feature", "geometry": None}]
+    collection = {"type": "FeatureCollection", "features": features}
+    assert Supercluster().load(collection).num_points == 10
+
+
+def test_supercluster_workers_build_the_same_index(monkeypatch):
+    from maplibreum import cluster
+
+    monkeypatch.setattr(cluster._ClusterPool, "min_size", 256)
+    points = _points(3000, seed=8) + _points(2000, seed=9, spread=((10, 40), (12, 42)))
+    serial = Supercluster(max_zoom=9).load(points)
+    parallel = cluster_features(points, max_zoom=9, workers=2)
+
+    for name in ("_x", "_y", "_count", "_parent", "_zoom", "_children", "_leaf_order"):
+        assert np.array_equal(getattr(parallel, name), getattr(serial, name))
+    assert [tree.ids.tolist() for tree in parallel._trees] == [
+        tree.ids.tolist() for tree in serial._trees
+    ]
+    assert parallel.get_clusters([5, 35, 15, 45], 6) == serial.get_clusters([5, 35, 15, 45], 6)
+
+
+def _brute_aggregates(index, cluster_id, key):
+    leaves = index.get_leaves(cluster_id, limit=None)
+    mags = [leaf["properties"].get("mag", np.nan) for leaf in leaves]
+    kinds = [leaf["properties"]["kind"] for leaf in leaves]
+    return {
+        "total": pytest.approx(sum(mags), nan_ok=True),
+        "low": pytest.approx(min(mags), nan_ok=True),
+        "high": pytest.approx(max(mags), nan_ok=True),
+        "mean": pytest.approx(sum(mags) / len(mags), nan_ok=True),
+        "product": pytest.approx(float(np.prod([leaf["properties"][key] for leaf in leaves]))),
+        "quakes": kinds.count("quake"),
+        "other": sum(kind in ("blast", "slide") for kind in kinds),
+    }
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_supercluster_aggregates_match_leaves(columnar):
+    rng = np.random.default_rng(6)
+    coords = rng.uniform([-20, -20], [20, 20], size=(2000, 2))
+    mag = rng.uniform(1, 6, 2000).round(2)
+    kind = rng.choice(["quake", "blast", "slide"], 2000)
+    sign = rng.choice([1, -1], 2000)
+    aggregates = {
+        "total": ("sum", "mag"),
+        "low": ("min", "mag"),
+        "high": ("max", "mag"),
+        "mean": ("mean", "mag"),
+        "product": (np.multiply, "sign"),
+        "quakes": ("count", "kind", "quake"),
+        "other": ("count", "kind", ["blast", "slide"]),
+    }
+    index = Supercluster(max_zoom=6, aggregates=aggregates)
+    if columnar:
+        index.load(coords, properties={"mag": mag, "kind": kind, "sign": sign})
+    else:
+        index.load(
+            [
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": list(c)},
+                    "properties": {"mag": float(m), "kind": str(k), "sign": int(g)},
+                }
+                for c, m, k, g in zip(coords.tolist(), mag, kind, sign)
+            ]
+        )
+
+    clusters = [
+        feature
+        for zoom in (0, 3, 6)
+        for feature in index.get_clusters([-180, -90, 180, 90], zoom)
+        if "cluster" in feature["properties"]
+    ]
+    assert clusters
+    for cluster in clusters:
+        properties = cluster["properties"]
+        expected = _brute_aggregates(index, cluster["id"], "sign")
+        assert {name: properties[name] for name in expected} == expected
+        assert properties["quakes"] + properties["other"] == properties["point_count"]
+        assert type(properties["quakes"]) is int
+    point = next(
+        f for f in index.get_clusters([-180, -90, 180, 90], 7) if "cluster" not in f["properties"]
+    )
+    assert "total" not in point["properties"]
+
+
+def test_supercluster_aggregates_missing_values_and_validation():
+    features = _points(50, seed=7, spread=((0, 0), (0.01, 0.01)))
+    for i, feature in enumerate(features):
+        if i:
+            feature["properties"]["mag"] = i
+    (cluster,) = Supercluster(aggregates={"total": ("sum", "mag")}).load(features).get_clusters(
+        [-180, -90, 180, 90], 0
+    )
+    assert np.isnan(cluster["properties"]["total"])
+
+    index = cluster_features(features[1:], aggregates={"total": ("sum", "mag")})
+    (cluster,) = index.get_clusters([-180, -90, 180, 90], 0)
+    assert cluster["properties"]["total"] == sum(range(1, 50))
+
+    for spec in [("median", "mag"), ("sum",), (np.sqrt, "mag"), ("count", "mag")]:
+        with pytest.raises(ValueError):
+            Supercluster(aggregates={"bad": spec})
+
+
+def _assert_same_index(index, reopened):
+    bbox = [-180, -90, 180, 90]
+    for zoom in range(index.max_zoom + 2):
+        assert reopened.get_clusters(bbox, zoom) == index.get_clusters(bbox, zoom)
+    assert reopened.get_clusters([170, -40, -170, 40], 3) == index.get_clusters(
+        [170, -40, -170, 40], 3
+    )
+    for cluster in index.get_clusters(bbox, 2):
+        if "cluster" in cluster["properties"]:
+            cluster_id = cluster["id"]
+            assert reopened.get_children(cluster_id) == index.get_children(cluster_id)
+            assert reopened.get_leaves(cluster_id, limit=None) == index.get_leaves(
+                cluster_id, limit=None
+            )
+            assert reopened.get_cluster_expansion_zoom(
+                cluster_id
+            ) == index.get_cluster_expansion_zoom(cluster_id)
+
+
+def test_supercluster_save_and_open_round_trip(tmp_path):
+    points = _points(4000, seed=5)
+    coords = np.array([f["geometry"]["coordinates"] for f in points])
+    indexes = {
+        "geojson": Supercluster(
+            radius=60,
+            max_zoom=7,
+            node_size=16,
+            aggregates={"top": (np.maximum, "i"), "evens": ("count", "i", {4, 2, 0})},
+        ).load(points),
+        "columns": Supercluster(max_zoom=7, aggregates={"mean": ("mean", "weight")}).load(
+            coords,
+            properties={
+                "i": np.arange(4000),
+                "weight": np.linspace(0, 1, 4000),
+                "name": np.array([f"p{i % 9}" for i in range(4000)]),
+                "tags": np.array([[i % 3] for i in range(4000)] + [None], dtype=object)[:-1],
+            },
+        ),
+        "rows": Supercluster(max_zoom=7).load_arrays(
+            coords[:, 0], coords[:, 1], [{"i": i} for i in range(4000)]
+        ),
+        "bare": Supercluster(max_zoom=7).load(coords),
+    }
+    for name, index in indexes.items():
+        path = tmp_path / f"{name}.clusters"
+        index.save(path)
+        reopened = Supercluster.open(path)
+
+        assert reopened.num_points == index.num_points
+        assert (reopened.radius, reopened.max_zoom, reopened.node_size) == (
+            index.radius,
+            index.max_zoom,
+            index.node_size,
+        )
+        assert not reopened._x.flags.writeable and not reopened._x.flags.owndata
+        _assert_same_index(index, reopened)
+
+    leaf = Supercluster.open(tmp_path / "columns.clusters").get_leaves(
+        next(
+            f["id"]
+            for f in indexes["columns"].get_clusters([-180, -90, 180, 90], 0)
+            if "cluster" in f["properties"]
+        ),
+        limit=1,
+    )[0]
+    assert type(leaf["properties"]["i"]) is int and isinstance(leaf["properties"]["tags"], list)
+
+
+def test_supercluster_save_rejects_custom_ufuncs(tmp_path):
+    path = tmp_path / "custom.clusters"
+    index = Supercluster(
+        aggregates={"top": (np.frompyfunc(max, 2, 1), "i")}
+    ).load(_points(50, seed=2))
+
+    with pytest.raises(ValueError, match="top"):
+        index.save(path)
+    assert not path.exists()
+
+
+def test_supercluster_open_rejects_other_files(tmp_path):
+    empty = tmp_path / "empty.clusters"
+    Supercluster().load([]).save(empty)
+    assert Supercluster.open(empty).get_clusters([-180, -90, 180, 90], 0) == []
+
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"not a cluster index at all")
+    with pytest.raises(ValueError):
+        Supercluster.open(other)
+
+
+def test_supercluster_geodataframe_input():
+    geopandas = pytest.importorskip("geopandas")
+    shapely = pytest.importorskip("shapely.geometry")
+    frame = geopandas.GeoDataFrame(
+        {"name": ["a", "b", "c"]},
+        geometry=[
+            shapely.Point(0, 0),
+            shapely.Point(0.0001, 0),
+            shapely.LineString([(0, 0), (1, 1)]),
+        ],
+    )
+    index = Supercluster().load(frame)
+
+    assert index.num_points == 2
+    (cluster,) = index.get_clusters([-180, -90, 180, 90], 0)
+    assert sorted(f["properties"]["name"] for f in index.get_leaves(cluster["id"])) == ["a", "b"]
+
+
+def test_supercluster_arrow_input():
+    pa = pytest.importorskip("pyarrow")
+    coords = pa.array(
+        [[0.0, 0.0], [0.0001, 0.0], None, [40.0, 40.0]], type=pa.list_(pa.float64(), 2)
+    )
+    table = pa.table({"geometry": coords, "name": ["a", "b", "c", "d"]})
+    index = Supercluster().load(table)
+
+    assert index.num_points == 3
+    unclustered = index.get_clusters([-180, -90, 180, 90], 20)
+    assert sorted(f["properties"]["name"] for f in unclustered) == ["a", "b", "d"]
+
+    separated = pa.StructArray.from_arrays(
+        [pa.array([0.0, 0.0001]), pa.array([0.0, 0.0])], names=["x", "y"]
+    )
+    multipoints = pa.array(
+        [[{"x": 0.0, "y": 0.0}, {"x": 0.0001, "y": 0.0}]], type=pa.list_(separated.type)
+    )
+    assert Supercluster().load(separated).num_points == 2
+    (cluster,) = Supercluster().load(multipoints).get_clusters([-180, -90, 180, 90], 0)
+    assert cluster["properties"]["point_count"] == 2
@@ -0,0 +1,118 @@
+"""Tests for saving self-contained pages with compressed source payloads."""
+
+import base64
+import gzip
+import json
+import re
+import zlib
+
+import pytest
+
+from maplibreum import export
+from maplibreum.core import Map
+
+
+def _collection(count):
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [i * 0.01, i * 0.02]},
+                "properties": {"id": i, "category": "shop"},
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def _payload(html, name):
+    match = re.search(
+        r'maplibreumInflateSource\(\["' + name + r'"[^\]]*\], "([A-Za-z0-9+/=]+)", "(\w+)"\)',
+        html,
+    )
+    assert match, f"no compressed payload for {name}"
+    return base64.b64decode(match.group(1)), match.group(2)
+
+
+def test_gzip_save_embeds_compressed_payload(tmp_path):
+    m = Map()
+    big = _collection(5_000)
+    m.add_source("big", big)
+    m.add_source("small", _collection(2))
+    output = tmp_path / "map.html"
+
+    m.save(output, compress="gzip")
+
+    html = output.read_text(encoding="utf-8")
+    payload, method = _payload(html, "big")
+    assert method == "gzip"
+    assert json.loads(gzip.decompress(payload)) == big
+    assert "DecompressionStream" in html
+    assert 'maplibreumInflateSource(["small"]' not in html
+    assert '"coordinates": [0.01, 0.02]' in html
+    assert '"coordinates": [49.99, 99.98]' not in html
+
+    plain = tmp_path / "plain.html"
+    m.save(plain)
+    assert plain.stat().st_size > 5 * output.stat().st_size
+    assert "DecompressionStream" not in plain.read_text(encoding="utf-8")
+
+
+def test_deflate_respects_threshold_and_precision(tmp_path):
+    m = Map(coordinate_precision=1)
+    m.add_source("points", _collection(50))
+    output = tmp_path / "map.html"
+
+    m.save(output, compress="deflate", compress_threshold=100)
+
+    payload, method = _payload(output.read_text(encoding="utf-8"), "points")
+    assert method == "deflate"
+    data = json.loads(zlib.decompress(payload))
+    assert data["features"][-1]["geometry"]["coordinates"] == [0.5, 1.0]
+    assert m.sources[0]["definition"]["data"]["features"][-1]["geometry"][
+        "coordinates"
+    ] == [0.49, 0.98]
+
+
+def test_identical_compressed_payloads_are_embedded_once(tmp_path):
+    m = Map()
+    data = _collection(2_000)
+    m.add_source("a", data)
+    m.add_source("b", {"type": "geojson", "data": data, "cluster": True})
+    m.add_source("c", _collection(2_000))
+    output = tmp_path / "map.html"
+
+    m.save(output, compress="gzip")
+
+    html = output.read_text(encoding="utf-8")
+    assert html.count("maplibreumInflateSource([") == 1
+    assert 'maplibreumInflateSource(["a", "b", "c"], ' in html
+    payload, _ = _payload(html, "a")
+    assert json.loads(gzip.decompress(payload)) == data
+
+
+def test_sources_within_threshold_are_not_compressed(tmp_path, monkeypatch):
+    created = []
+    compressobj = export.zlib.compressobj
+    monkeypatch.setattr(
+        export.zlib, "compressobj", lambda *args: created.append(args) or compressobj(*args)
+    )
+    m = Map()
+    for index in range(20):
+        m.add_source(f"small_{index}", _collection(20))
+    m.add_source("big", _collection(2_000))
+
+    m.save(tmp_path / "map.html", compress="gzip")
+
+    assert len(created) == 1
+    chunks = ["[1, ", "2, ", "3]"]
+    assert export.compress_chunks(chunks, "gzip", threshold=9) == (None, 9)
+    payload, size = export.compress_chunks(chunks, "gzip", threshold=8)
+    assert size == 9 and gzip.decompress(payload) == b"[1, 2, 3]"
+
+
+@pytest.mark.parametrize("method", ["brotli", "zip"])
+def test_unsupported_compression_is_rejected(tmp_path, method):
+    with pytest.raises(ValueError):
+        Map().save(tmp_path / "map.html", compress=method)
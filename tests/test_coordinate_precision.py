@@ -0,0 +1,115 @@
+"""Tests for coordinate precision control at serialization time."""
+
+import copy
+
+import numpy as np
+
+from maplibreum.core import FeatureGroup, Map
+from maplibreum.sources import GeoJSONSource
+from maplibreum.utils import round_geojson
+
+
+def _collection():
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [-46.633308912345678, -23.5505199876543],
+                },
+                "properties": {"name": "São Paulo"},
+            },
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "GeometryCollection",
+                    "geometries": [
+                        {
+                            "type": "LineString",
+                            "coordinates": [[1.123456789, 2.987654321], [3, 4]],
+                        }
+                    ],
+                },
+                "properties": {},
+            },
+        ],
+    }
+
+
+def test_round_geojson_returns_rounded_copy_without_mutation():
+    data = _collection()
+    original = copy.deepcopy(data)
+
+    rounded = round_geojson(data, 4)
+
+    assert data == original
+    assert rounded["features"][0]["geometry"]["coordinates"] == [-46.6333, -23.5505]
+    line = rounded["features"][1]["geometry"]["geometries"][0]
+    assert line["coordinates"] == [[1.1235, 2.9877], [3, 4]]
+    assert rounded["features"][0]["properties"] is data["features"][0]["properties"]
+
+
+def test_round_geojson_vectorizes_numpy_coordinates():
+    coords = np.array([[1.123456789, 2.123456789], [3.987654321, 4.5]])
+    feature = {
+        "type": "Feature",
+        "geometry": {"type": "LineString", "coordinates": coords},
+        "properties": {},
+    }
+
+    rounded = round_geojson(feature, 3)
+
+    assert isinstance(rounded["geometry"]["coordinates"], np.ndarray)
+    np.testing.assert_array_equal(
+        rounded["geometry"]["coordinates"], [[1.123, 2.123], [3.988, 4.5]]
+    )
+    assert coords[0, 0] == 1.123456789
+
+
+def test_map_precision_applies_at_render_time():
+    data = _collection()
+    m = Map(coordinate_precision=5)
+    m.add_source("places", data)
+
+    html = m.render()
+
+    assert "[-46.63331, -23.55052]" in html
+    assert m.sources[0]["definition"]["data"]["features"] is data["features"]
+    assert data["features"][0]["geometry"]["coordinates"][0] == -46.633308912345678
+    assert "".join(m.render_iter()) == html
+
+
+def test_source_precision_overrides_map_precision():
+    m = Map(coordinate_precision=1)
+    m.add_source("wrapped", GeoJSONSource(_collection(), coordinate_precision=3))
+    m.add_source("explicit", _collection(), coordinate_precision=2)
+    m.add_source("inherited", _collection())
+
+    html = m.render()
+
+    assert "[-46.633, -23.551]" in html
+    assert "[-46.63, -23.55]" in html
+    assert "[-46.6, -23.6]" in html
+
+
+def test_geojson_source_to_dict_rounds_copy():
+    data = _collection()
+    source = GeoJSONSource(data, coordinate_precision=2, cluster=True)
+
+    payload = source.to_dict()
+
+    assert payload["data"]["features"][0]["geometry"]["coordinates"] == [-46.63, -23.55]
+    assert "coordinatePrecision" not in payload
+    assert "coordinate_precision" not in payload
+    assert source.data is data
+
+
+def test_feature_group_forwards_source_precision():
+    group = FeatureGroup()
+    group.add_source("places", _collection(), coordinate_precision=2)
+    m = Map()
+    group.add_to(m)
+
+    assert "[-46.63, -23.55]" in m.render()
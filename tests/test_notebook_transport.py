@@ -0,0 +1,160 @@
+"""Tests for notebook transports that keep payloads out of the cell output."""
+
+import html
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from maplibreum import core, notebook
+from maplibreum.core import Map
+from maplibreum.notebook import PayloadChannel, TempFileCache
+
+
+def _collection(count):
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [i * 0.01, i * 0.02]},
+                "properties": {"id": i},
+            }
+            for i in range(count)
+        ],
+    }
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = TempFileCache(tmp_path / "maps", max_entries=2)
+    notebook.set_temp_cache(cache)
+    yield cache
+    notebook.set_temp_cache(None)
+    cache.clear()
+
+
+class FakeComm:
+    def __init__(self):
+        self.sent = []
+        self.closed = False
+
+    def send(self, data):
+        self.sent.append(data)
+
+    def close(self):
+        self.closed = True
+
+
+def test_files_transport_keeps_payload_out_of_output(cache):
+    m = Map(notebook_transport="files")
+    m.add_source("big", _collection(5_000))
+
+    output = m._repr_html_()
+
+    assert len(output) < 500
+    assert 'src="maps/' in output
+    page = cache.paths()[0]
+    assert (page / "map.html").exists()
+    assert json.loads((page / "data" / "big.geojson").read_text()) == _collection(5_000)
+
+
+def test_temp_cache_is_bounded(cache, tmp_path):
+    m = Map(notebook_transport="files")
+    for _ in range(4):
+        m._repr_html_()
+
+    assert len(cache.paths()) == 2
+    assert len(list((tmp_path / "maps").iterdir())) == 2
+
+    small = TempFileCache(tmp_path / "small", max_bytes=10)
+    for _ in range(3):
+        small.add(lambda path: path.write_text("x" * 100))
+    assert len(small.paths()) == 1
+
+    cache.clear()
+    assert not (tmp_path / "maps").exists()
+
+
+def test_display_in_notebook_is_self_contained(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(notebook, "_temp_cache", None)
+    shown = []
+    monkeypatch.setattr(core, "HTML", str)
+    monkeypatch.setattr(core, "display", shown.append)
+    m = Map()
+    m.add_source("big", _collection(5_000))
+
+    m.display_in_notebook(width="300px")
+
+    assert list(tmp_path.iterdir()) == []
+    assert notebook._temp_cache is None
+    output = shown[0]
+    assert "srcdoc=" in output and "width: 300px" in output
+    assert html.unescape(output.split('srcdoc="')[1].split('"')[0]) == m.render()
+
+
+def test_caches_are_cleared_on_exit(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(notebook.atexit, "register", calls.append)
+    private = TempFileCache()
+    private.add(lambda path: path.write_text("x"))
+    TempFileCache(tmp_path / "other").add(lambda path: path.write_text("x"))
+
+    assert private.directory.parent == Path(tempfile.gettempdir())
+    assert calls == []
+    notebook._clear_open_caches()
+    assert not private.directory.exists()
+    assert not (tmp_path / "other").exists()
+
+
+def test_comm_transport_sends_page_in_chunks(monkeypatch):
+    monkeypatch.delenv("JPY_SESSION_NAME", raising=False)
+    channel = PayloadChannel(max_entries=2, chunk_size=4096)
+    monkeypatch.setattr(notebook, "_payload_channel", channel)
+    monkeypatch.setattr(channel, "register", lambda: True)
+    m = Map(notebook_transport="comm")
+    m.add_source("big", _collection(2_000))
+
+    output = m._repr_html_()
+
+    assert len(output) < 2_000
+    assert "maplibreum.page" in output
+    token = output.split('"token": "')[1].split('"')[0]
+    comm = FakeComm()
+    channel._on_open(comm, {"content": {"data": {"token": token}}})
+    assert comm.closed
+    assert len(comm.sent) > 1
+    assert all(message["count"] == len(comm.sent) for message in comm.sent)
+    assert "".join(message["chunk"] for message in comm.sent) == m.render()
+
+    for _ in range(2):
+        channel.publish(["<html></html>"])
+    comm = FakeComm()
+    channel._on_open(comm, {"content": {"data": {"token": token}}})
+    assert "error" in comm.sent[0]
+
+
+def test_comm_transport_falls_back_to_inline_without_kernel(monkeypatch):
+    monkeypatch.setattr(notebook, "_payload_channel", None)
+    monkeypatch.setattr(notebook, "_comm_manager", lambda: None)
+    m = Map(notebook_transport="comm")
+
+    assert "srcdoc=" in m._repr_html_()
+
+
+def test_comm_transport_renders_inline_in_jupyter_server_frontends(monkeypatch):
+    channel = PayloadChannel()
+    monkeypatch.setattr(notebook, "_payload_channel", channel)
+    monkeypatch.setattr(channel, "register", lambda: True)
+    monkeypatch.setenv("JPY_SESSION_NAME", "/work/maps.ipynb")
+    m = Map(notebook_transport="comm")
+
+    assert "srcdoc=" in m._repr_html_()
+    assert len(channel) == 0
+    monkeypatch.delenv("JPY_SESSION_NAME")
+    assert "maplibreum.page" in m._repr_html_()
+    with pytest.raises(ValueError):
+        Map(notebook_transport="blob")
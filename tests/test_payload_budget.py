@@ -0,0 +1,136 @@
+"""Tests for the payload size report and budget enforcement."""
+
+import numpy as np
+import pytest
+
+from maplibreum.core import Map
+from maplibreum.profiling import (
+    PayloadBudgetExceeded,
+    PayloadBudgetWarning,
+    geojson_counts,
+)
+
+
+def _lines(count, vertices):
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "LineString",
+                    "coordinates": [[i, j] for j in range(vertices)],
+                },
+                "properties": {"id": i},
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def _map(**kwargs):
+    m = Map(**kwargs)
+    m.add_source("roads", {"type": "geojson", "data": _lines(200, 10)})
+    m.add_source("tiles", {"type": "vector", "url": "https://example.com/tiles.json"})
+    m.add_layer({"id": "roads", "type": "line", "source": "roads"})
+    m.add_image("dot", data={"width": 1, "height": 1, "data": [255, 0, 0, 255]})
+    m.add_marker(coordinates=[0, 0], popup="hello")
+    m.add_on_load_js("console.log('ready');")
+    return m
+
+
+def test_geojson_counts_handles_lists_numpy_and_collections():
+    assert geojson_counts(_lines(3, 4)) == (3, 12)
+    polygon = {
+        "type": "Polygon",
+        "coordinates": np.zeros((2, 5, 2)),
+    }
+    assert geojson_counts(polygon) == (0, 10)
+    collection = {
+        "type": "Feature",
+        "geometry": {
+            "type": "GeometryCollection",
+            "geometries": [{"type": "Point", "coordinates": [1, 2]}, polygon],
+        },
+    }
+    assert geojson_counts(collection) == (1, 11)
+
+
+def test_payload_report_lists_contributors_with_exact_sizes():
+    m = _map()
+
+    report = m.payload_report()
+
+    assert report.bytes == len(m.render().encode("utf-8"))
+    assert report.sources["roads"]["features"] == 200
+    assert report.sources["roads"]["vertices"] == 2_000
+    assert report.sources["tiles"]["features"] == 0
+    assert report.layers["roads"] > 0
+    assert report.images["dot"] > 0
+    assert report.sections["markers"] > 0
+    assert report.sections["on_load_js"] > 0
+    assert report.largest(1)[0][0] == "source 'roads'"
+    assert report.to_dict()["sources"]["roads"]["bytes"] == report.sources["roads"]["bytes"]
+
+
+def test_budget_raises_with_largest_contributors():
+    m = _map(max_payload_bytes=10_000)
+
+    with pytest.raises(PayloadBudgetExceeded, match="source 'roads'"):
+        m.render()
+
+
+def test_over_budget_save_leaves_the_file_untouched(tmp_path):
+    output = tmp_path / "map.html"
+    output.write_text("previous", encoding="utf-8")
+    m = _map(max_payload_bytes=10_000)
+
+    with pytest.raises(PayloadBudgetExceeded):
+        m.save(output)
+
+    assert output.read_text(encoding="utf-8") == "previous"
+    assert [path.name for path in tmp_path.iterdir()] == ["map.html"]
+
+
+def test_over_budget_save_leaves_sidecars_untouched(tmp_path):
+    output = tmp_path / "map.html"
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "roads.geojson").write_text("previous", encoding="utf-8")
+    m = _map(max_payload_bytes=1_000)
+
+    with pytest.raises(PayloadBudgetExceeded):
+        m.save(output, data_dir="data", inline_threshold=100)
+
+    assert [path.name for path in tmp_path.iterdir()] == ["data"]
+    assert [path.name for path in data.iterdir()] == ["roads.geojson"]
+    assert (data / "roads.geojson").read_text(encoding="utf-8") == "previous"
+
+    m.max_payload_bytes = 100_000
+    m.save(output, data_dir="data", inline_threshold=100)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["data", "map.html"]
+    assert (data / "roads.geojson").read_text(encoding="utf-8").startswith('{"type"')
+    assert '"data": "data/roads.geojson"' in output.read_text(encoding="utf-8")
+
+
+def test_budget_can_warn_instead(tmp_path):
+    m = _map(max_payload_bytes=10_000, payload_budget_action="warn")
+
+    with pytest.warns(PayloadBudgetWarning, match="over the budget") as record:
+        m.save(tmp_path / "map.html")
+        m.render()
+        list(m.render_iter())
+
+    assert [warning.filename for warning in record] == [__file__] * 3
+
+    assert (tmp_path / "map.html").exists()
+
+
+def test_within_budget_renders_normally():
+    m = _map()
+    size = len(m.render().encode("utf-8"))
+    m.max_payload_bytes = size
+
+    assert m.render()
+    with pytest.raises(ValueError):
+        Map(payload_budget_action="ignore")
@@ -1,8 +1,28 @@
 """Tests for PMTiles integration."""
 
+import gzip
+import json
+import sqlite3
+
+import numpy as np
 import pytest
-from maplibreum.pmtiles import PMTilesSource, PMTilesProtocol
+from maplibreum.pmtiles import (
+    COMPRESSION_GZIP,
+    COMPRESSION_NONE,
+    TILE_TYPE_MVT,
+    TILE_TYPE_PNG,
+    PMTilesProtocol,
+    PMTilesReader,
+    PMTilesSource,
+    PMTilesWriter,
+    _unpack_header,
+    mbtiles_to_pmtiles,
+    tileid_to_zxy,
+    write_pmtiles,
+    zxy_to_tileid,
+)
 from maplibreum.core import Map
+from maplibreum.sources import RasterSource
 
 def test_pmtiles_source_init_basic():
     """Test basic initialization of PMTilesSource."""
@@ -150,3 +170,297 @@ def test_pmtiles_protocol_playwright(page):
 
     finally:
         os.unlink(temp_file)
+
+
+def _read_tile(path, z, x, y):
+    """Read one tile back through the archive's directories."""
+    with PMTilesReader(path) as reader:
+        return reader.get_tile(z, x, y)
+
+
+def test_hilbert_tile_ids():
+    """Tile IDs follow the PMTiles Hilbert ordering and round-trip."""
+    assert [zxy_to_tileid(1, x, y) for x, y in ((0, 0), (0, 1), (1, 1), (1, 0))] == [1, 2, 3, 4]
+    assert zxy_to_tileid(2, 0, 0) == 5
+    assert zxy_to_tileid(12, 3423, 1763) == 19078479
+    for z, x, y in ((0, 0, 0), (7, 100, 3), (20, 123456, 654321)):
+        assert tileid_to_zxy(zxy_to_tileid(z, x, y)) == (z, x, y)
+    with pytest.raises(ValueError):
+        zxy_to_tileid(2, 4, 0)
+
+
+def test_write_pmtiles_dedups_and_run_length_encodes(tmp_path):
+    """Repeated contents are stored once and consecutive repeats share an entry."""
+    tiles = {(0, 0, 0): b"root"}
+    tiles.update({(2, x, y): b"ocean" for x in range(4) for y in range(4)})
+    tiles[(2, 3, 3)] = b"island"
+    path = tmp_path / "world.pmtiles"
+    # Written deepest-first; the archive is still laid out in tile ID order.
+    header = write_pmtiles(
+        path, ((z, x, y, data) for (z, x, y), data in reversed(tiles.items())), {"name": "world"}
+    )
+
+    assert header["addressed_tiles"] == 17
+    assert header["tile_contents"] == 3
+    assert header["tile_entries"] < 17
+    assert header["clustered"] and header["leaf_length"] == 0
+    assert (header["min_zoom"], header["max_zoom"]) == (0, 2)
+    assert header["tile_compression"] == COMPRESSION_NONE
+    assert header["tile_data_length"] == len(b"root" + b"ocean" + b"island")
+    assert _unpack_header(path.read_bytes())["tile_entries"] == header["tile_entries"]
+    data = path.read_bytes()
+    metadata = data[header["metadata_offset"] : header["metadata_offset"] + header["metadata_length"]]
+    assert json.loads(gzip.decompress(metadata)) == {"name": "world"}
+    for (z, x, y), content in tiles.items():
+        assert _read_tile(path, z, x, y) == content
+    assert _read_tile(path, 1, 0, 0) is None
+
+
+def test_write_pmtiles_builds_leaf_directories(tmp_path):
+    """Directories too large for the first 16 KiB are split into leaves."""
+    rng = np.random.default_rng(0)
+    coords = {(int(x), int(y)) for x, y in rng.integers(0, 1 << 14, size=(20_000, 2))}
+    path = tmp_path / "leaves.pmtiles"
+    with PMTilesWriter(path) as writer:
+        for x, y in coords:
+            writer.write_tile(14, x, y, f"{x}/{y}".encode())
+    data = path.read_bytes()
+    header = _unpack_header(data)
+
+    assert header["leaf_length"] > 0
+    assert header["root_offset"] + header["root_length"] <= 16384
+    assert header["addressed_tiles"] == len(coords)
+    for x, y in list(coords)[:200]:
+        assert _read_tile(path, 14, x, y) == f"{x}/{y}".encode()
+
+
+def test_write_pmtiles_from_tile_pyramid(tmp_path):
+    """Gzipped MVT tiles from the pyramid iterator are detected as such."""
+    from maplibreum.tiling import iter_tile_pyramid
+
+    data = {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "LineString", "coordinates": [[0, 0], [20, 10]]},
+                "properties": {"name": "road"},
+            }
+        ],
+    }
+    path = tmp_path / "roads.pmtiles"
+    tiles = list(iter_tile_pyramid(data, 0, 4, layer_name="roads", compress=True))
+    header = write_pmtiles(path, tiles, {"vector_layers": [{"id": "roads", "fields": {}}]})
+
+    assert header["tile_type"] == TILE_TYPE_MVT
+    assert header["tile_compression"] == COMPRESSION_GZIP
+    assert header["addressed_tiles"] == len(tiles)
+    west, south, east, north = header["bounds"]
+    assert west <= 0 and east >= 20 and south <= 0 and north >= 10
+    z, x, y, body = tiles[-1]
+    assert _read_tile(path, z, x, y) == body
+
+
+def test_write_pmtiles_rejects_duplicate_tiles(tmp_path):
+    """Writing the same tile twice is an error."""
+    with pytest.raises(ValueError, match="3/1/2"):
+        write_pmtiles(tmp_path / "dup.pmtiles", [(3, 1, 2, b"a"), (3, 1, 2, b"b")])
+
+
+def test_mbtiles_to_pmtiles(tmp_path):
+    """MBTiles rows are flipped from TMS and metadata carried over."""
+    mbtiles = tmp_path / "tiles.mbtiles"
+    connection = sqlite3.connect(mbtiles)
+    connection.execute("CREATE TABLE metadata (name TEXT, value TEXT)")
+    connection.execute(
+        "CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, "
+        "tile_data BLOB)"
+    )
+    layers = {"vector_layers": [{"id": "water", "fields": {"kind": "String"}}]}
+    connection.executemany(
+        "INSERT INTO metadata VALUES (?, ?)",
+        [
+            ("name", "Water"),
+            ("format", "pbf"),
+            ("bounds", "-10,-5,10,5"),
+            ("center", "0,0,2"),
+            ("minzoom", "0"),
+            ("maxzoom", "3"),
+            ("json", json.dumps(layers)),
+        ],
+    )
+    connection.executemany(
+        "INSERT INTO tiles VALUES (?, ?, ?, ?)",
+        [(0, 0, 0, gzip.compress(b"z0")), (3, 2, 1, gzip.compress(b"z3"))],
+    )
+    connection.commit()
+    connection.close()
+
+    path = tmp_path / "tiles.pmtiles"
+    header = mbtiles_to_pmtiles(mbtiles, path)
+
+    assert header["tile_type"] == TILE_TYPE_MVT
+    assert header["tile_compression"] == COMPRESSION_GZIP
+    assert (header["min_zoom"], header["max_zoom"], header["center_zoom"]) == (0, 3, 2)
+    assert header["bounds"] == [-10, -5, 10, 5]
+    # TMS row 1 at zoom 3 is XYZ row 6.
+    assert gzip.decompress(_read_tile(path, 3, 2, 6)) == b"z3"
+    data = path.read_bytes()
+    metadata = data[header["metadata_offset"] : header["metadata_offset"] + header["metadata_length"]]
+    assert json.loads(gzip.decompress(metadata)) == {"name": "Water", **layers}
+
+
+def _vector_archive(path, tilestats=True):
+    metadata = {
+        "name": "Roads",
+        "attribution": "© Roads",
+        "vector_layers": [
+            {"id": "roads", "fields": {"kind": "String"}, "minzoom": 2},
+            {"id": "pois", "fields": {}},
+        ],
+    }
+    if tilestats:
+        metadata["tilestats"] = {"layers": [{"layer": "roads", "geometry": "LineString"}]}
+    tiles = [(0, 0, 0, gzip.compress(b"root"))]
+    tiles += [(4, x, y, gzip.compress(b"%d/%d" % (x, y))) for x in range(8, 12) for y in range(5, 8)]
+    write_pmtiles(path, tiles, metadata, center=[-20, 30, 3])
+    return tiles
+
+
+def test_reader_parses_header_and_metadata_lazily(tmp_path):
+    """Header values are available on open; metadata is decoded on demand."""
+    path = tmp_path / "roads.pmtiles"
+    _vector_archive(path)
+
+    with PMTilesReader(path) as reader:
+        assert reader._metadata is None
+        assert (reader.min_zoom, reader.max_zoom) == (0, 4)
+        assert reader.center == [-20, 30, 3]
+        assert reader.bounds == pytest.approx([0, 0, 90, 55.776573], abs=1e-4)
+        assert len(reader) == 13
+        assert reader.metadata["name"] == "Roads"
+        assert [layer["id"] for layer in reader.vector_layers] == ["roads", "pois"]
+
+
+def test_reader_random_tile_reads(tmp_path):
+    """Tiles are read through root and leaf directories without loading the file."""
+    rng = np.random.default_rng(1)
+    coords = {(int(x), int(y)) for x, y in rng.integers(0, 1 << 13, size=(15_000, 2))}
+    path = tmp_path / "many.pmtiles"
+    write_pmtiles(path, ((13, x, y, gzip.compress(b"%d,%d" % (x, y))) for x, y in coords))
+
+    with PMTilesReader(path, directory_cache_size=4) as reader:
+        assert reader.header["leaf_length"] > 0
+        for x, y in list(coords)[:300]:
+            assert reader.get_tile(13, x, y, decompress=True) == b"%d,%d" % (x, y)
+        assert len(reader._directories) <= 4
+        missing = next((x, y) for x in range(1 << 13) for y in range(4) if (x, y) not in coords)
+        assert reader.get_tile(13, *missing) is None
+        assert reader.get_tile(2, 0, 0) is None
+        listed = list(reader.iter_tiles())
+    assert {(x, y) for _, x, y, _ in listed} == coords
+    ids = [zxy_to_tileid(z, x, y) for z, x, y, _ in listed]
+    assert ids == sorted(ids)
+
+
+def test_reader_source_and_suggested_layers(tmp_path):
+    """Sources and layers are configured from the archive contents."""
+    path = tmp_path / "roads.pmtiles"
+    _vector_archive(path, tilestats=False)
+
+    with PMTilesReader(path) as reader:
+        source = reader.source("https://example.com/roads.pmtiles").to_dict()
+        layers = reader.suggested_layers("roads")
+    assert source["type"] == "vector"
+    assert source["url"] == "pmtiles://https://example.com/roads.pmtiles"
+    assert (source["minzoom"], source["maxzoom"]) == (0, 4)
+    assert source["attribution"] == "© Roads"
+    assert len(source["bounds"]) == 4
+    # Without tilestats every geometry type gets a filtered layer.
+    assert [(layer["source-layer"], layer["type"]) for layer in layers] == [
+        ("roads", "fill"),
+        ("roads", "line"),
+        ("roads", "circle"),
+        ("pois", "fill"),
+        ("pois", "line"),
+        ("pois", "circle"),
+    ]
+    assert layers[1]["filter"] == ["==", "$type", "LineString"]
+    assert layers[0]["minzoom"] == 2
+
+    _vector_archive(path)
+    with PMTilesReader(path) as reader:
+        layers = reader.suggested_layers("roads")
+    assert layers[0] == {
+        "id": "roads-roads-line",
+        "type": "line",
+        "source": "roads",
+        "source-layer": "roads",
+        "paint": {"line-width": 1, "line-color": "#1f77b4"},
+        "minzoom": 2,
+    }
+
+
+def test_reader_raster_archive(tmp_path):
+    """Raster archives give a raster source and layer."""
+    path = tmp_path / "imagery.pmtiles"
+    write_pmtiles(path, [(1, 0, 0, b"\x89PNG\r\n\x1a\nfake")])
+
+    with PMTilesReader(path) as reader:
+        assert reader.tile_type == TILE_TYPE_PNG
+        assert isinstance(reader.source(), RasterSource)
+        assert reader.suggested_layers("imagery") == [
+            {"id": "imagery", "type": "raster", "source": "imagery"}
+        ]
+    with pytest.raises(ValueError, match="raster"):
+        PMTilesSource.from_archive(path)
+
+
+def test_reader_rejects_other_files(tmp_path):
+    """Files that are not PMTiles v3 archives are refused."""
+    path = tmp_path / "empty.pmtiles"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        PMTilesReader(path)
+    path.write_bytes(b"not an archive" * 20)
+    with pytest.raises(ValueError):
+        PMTilesReader(path)
+
+
+def test_pmtiles_source_from_archive(tmp_path):
+    """PMTilesSource can be filled in from a local archive."""
+    path = tmp_path / "roads.pmtiles"
+    _vector_archive(path)
+
+    source = PMTilesSource.from_archive(path, max_zoom=3)
+    assert source.options["url"] == f"pmtiles://{path}"
+    assert source.options["minzoom"] == 0
+    assert source.options["maxzoom"] == 3
+
+
+def test_map_add_pmtiles_source_inspects_local_archive(tmp_path):
+    """Map.add_pmtiles_source adds a configured source and suggested layers."""
+    path = tmp_path / "roads.pmtiles"
+    _vector_archive(path)
+    m = Map()
+
+    m.add_pmtiles_source(archive_url=str(path), name="roads", add_layers=True)
+
+    source = m.sources.get("roads")["definition"]
+    assert source["url"] == f"pmtiles://{path}"
+    assert source["maxzoom"] == 4
+    assert [layer["id"] for layer in m.layers] == [
+        "roads-roads-line",
+        "roads-pois-fill",
+        "roads-pois-line",
+        "roads-pois-circle",
+    ]
+
+    remote = Map()
+    remote.add_pmtiles_source(archive_url="https://example.com/a.pmtiles", name="remote")
+    assert remote.sources.get("remote")["definition"] == {
+        "type": "vector",
+        "url": "pmtiles://https://example.com/a.pmtiles",
+    }
+    with pytest.raises(ValueError):
+        remote.add_pmtiles_source(archive_url="https://example.com/b.pmtiles", add_layers=True)
@@ -0,0 +1,172 @@
+"""Tests for the ordered, ID-indexed source and layer registry."""
+
+import time
+
+import pytest
+
+from maplibreum.cluster import MarkerCluster
+from maplibreum.core import Map, Marker
+from maplibreum.registry import OrderedRegistry
+
+
+def _layer(layer_id):
+    return {"id": layer_id, "definition": {"id": layer_id, "type": "line"}, "before": None}
+
+
+def test_registry_behaves_like_a_list():
+    registry = OrderedRegistry("id", [_layer("a"), _layer("b"), _layer("c")])
+
+    assert len(registry) == 3
+    assert [entry["id"] for entry in registry] == ["a", "b", "c"]
+    assert registry[0]["id"] == "a"
+    assert registry[-1]["id"] == "c"
+    assert [entry["id"] for entry in registry[1:]] == ["b", "c"]
+    assert registry == [_layer("a"), _layer("b"), _layer("c")]
+    assert _layer("b") in registry
+
+    registry.insert(1, _layer("x"))
+    del registry[0]
+    assert registry.pop()["id"] == "c"
+    assert registry.keys() == ["x", "b"]
+    registry.clear()
+    assert registry == []
+
+
+def test_registry_keyed_operations():
+    registry = OrderedRegistry("id", [_layer("a"), _layer("b")])
+
+    registry.insert_before("a", _layer("first"))
+    assert registry.keys() == ["first", "a", "b"]
+
+    old = registry.replace("a", _layer("renamed"))
+    assert old["id"] == "a"
+    assert registry.keys() == ["first", "renamed", "b"]
+    assert registry.get("a") is None
+    assert registry.discard("first")["id"] == "first"
+    assert registry.has("b")
+
+    replacement = dict(_layer("b"), before="x")
+    with pytest.warns(FutureWarning, match="'b' already exists"):
+        registry.append(replacement)  # duplicate keys replace in place
+    assert registry.keys() == ["renamed", "b"]
+    assert registry.get("b") is replacement
+    with pytest.warns(FutureWarning):
+        registry.insert_before("renamed", _layer("b"))  # moves an existing key
+    assert registry.keys() == ["b", "renamed"]
+    with pytest.warns(FutureWarning):
+        registry.extend([_layer("c"), _layer("renamed")])
+    assert registry.keys() == ["b", "renamed", "c"]
+    with pytest.raises(KeyError):
+        registry.insert_before("missing", _layer("c"))
+    with pytest.raises(ValueError):
+        registry.replace("renamed", _layer("b"))
+
+
+def test_map_source_and_layer_accessors():
+    m = Map()
+    m.add_source("roads", {"type": "geojson", "data": {"type": "FeatureCollection", "features": []}})
+    m.add_source("tiles", {"type": "vector", "url": "https://example.com/tiles.json"})
+    m.add_layer({"id": "roads", "type": "line", "source": "roads"})
+    m.add_layer({"id": "labels", "type": "symbol", "source": "tiles"})
+
+    assert m.get_source("tiles")["url"] == "https://example.com/tiles.json"
+    m.replace_source("roads", {"type": "geojson", "data": "https://example.com/roads.geojson"})
+    assert [source["name"] for source in m.sources] == ["roads", "tiles"]
+    assert "https://example.com/roads.geojson" in m.render()
+
+    assert m.get_layer("labels")["type"] == "symbol"
+    assert m.remove_layer("roads")["type"] == "line"
+    assert m.remove_source("roads")["data"] == "https://example.com/roads.geojson"
+    html = m.render()
+    assert 'map.addSource("roads"' not in html
+    assert '"id": "roads"' not in html
+    with pytest.raises(KeyError):
+        m.get_source("roads")
+    with pytest.raises(KeyError):
+        m.replace_source("roads", {"type": "vector"})
+    with pytest.raises(KeyError):
+        m.remove_source("roads")
+    with pytest.raises(KeyError):
+        m.remove_layer("roads")
+
+
+def test_duplicate_source_names_and_layer_ids_replace_with_a_warning():
+    m = Map()
+    m.add_source("roads", {"type": "vector", "url": "https://example.com/a.json"})
+    m.add_source("tiles", {"type": "vector"})
+    m.add_layer({"id": "roads", "type": "line", "source": "roads"})
+
+    with pytest.warns(FutureWarning) as caught:
+        m.add_source("roads", {"type": "vector", "url": "https://example.com/b.json"})
+        m.add_layer({"id": "roads", "type": "fill", "source": "roads"})
+    assert [warning.filename for warning in caught] == [__file__, __file__]
+    with pytest.raises(ValueError):
+        m.add_sources({"other": {"type": "vector"}, "roads": {"type": "vector"}})
+
+    assert m.sources.keys() == ["roads", "tiles"]
+    assert m.get_source("roads")["url"] == "https://example.com/b.json"
+    assert m.get_layer("roads")["type"] == "fill"
+    assert "https://example.com/b.json" in m.render()
+
+
+def test_positional_index_survives_changes_at_the_end():
+    registry = OrderedRegistry("id")
+    model = []
+    for index in range(200):
+        entry = _layer(f"l{index}")
+        registry.append(entry)
+        model.append(entry)
+        if index % 7 == 3:
+            registry.insert(index // 2, _layer(f"i{index}"))
+            model.insert(index // 2, _layer(f"i{index}"))
+        if index % 11 == 5:
+            model.remove(registry.discard(model[index // 3]["id"]))
+        assert registry[index // 2] == model[index // 2]
+        assert registry[-1] == model[-1]
+    assert registry == model
+
+    def build(count):
+        registry = OrderedRegistry("id")
+        start = time.perf_counter()
+        for index in range(count):
+            registry.append(_layer(f"l{index}"))
+            assert registry[index // 2]["id"] == f"l{index // 2}"
+        registry.pop()
+        return time.perf_counter() - start
+
+    small, large = build(2_000), build(20_000)
+    assert large < small * 30
+
+
+def test_assigned_lists_are_wrapped():
+    m = Map(layers=[_layer("a")])
+    m.sources = [{"name": "s", "definition": {"type": "vector"}}]
+
+    assert isinstance(m.layers, OrderedRegistry)
+    assert m.sources.get("s")["definition"]["type"] == "vector"
+
+
+def test_marker_cluster_looks_up_its_source_by_name():
+    m = Map()
+    for index in range(50):
+        m.add_source(f"other_{index}", {"type": "vector"})
+    cluster = MarkerCluster(name="shops").add_to(m)
+    cluster.add_marker(Marker(coordinates=[1, 2]))
+
+    assert m.get_source("shops_source")["data"]["features"][0]["geometry"]["coordinates"] == [1, 2]
+
+
+def test_building_many_layers_is_linear():
+    def build(count):
+        m = Map()
+        start = time.perf_counter()
+        for index in range(count):
+            m.add_layer({"id": f"layer_{index}", "type": "line", "source": "s"})
+            m.layers.insert_before(f"layer_{index}", _layer(f"under_{index}"))
+        for index in range(0, count, 2):
+            m.remove_layer(f"layer_{index}")
+        assert m.get_layer(f"layer_{count - 1}")["id"] == f"layer_{count - 1}"
+        return time.perf_counter() - start
+
+    small, large = build(2_000), build(20_000)
+    assert large < small * 30
@@ -0,0 +1,101 @@
+"""Tests for reusing encoded source fragments across renders."""
+
+from maplibreum.cluster import MarkerCluster
+from maplibreum.core import Map, Marker
+from maplibreum.serialization import StdlibJSONBackend
+
+
+class CountingBackend(StdlibJSONBackend):
+    """Stdlib backend that counts the characters it encodes."""
+
+    name = "counting"
+
+    def __init__(self):
+        super().__init__()
+        self.encoded = 0
+
+    def dumps(self, value):
+        text = super().dumps(value)
+        self.encoded += len(text)
+        return text
+
+
+def _collection(count):
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [i * 0.001, i * 0.002]},
+                "properties": {"id": i},
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def _encoded_during(backend, action):
+    before = backend.encoded
+    result = action()
+    return backend.encoded - before, result
+
+
+def test_second_render_only_encodes_changed_sections():
+    backend = CountingBackend()
+    m = Map(json_backend=backend)
+    m.add_source("points", _collection(20_000))
+    m.add_layer({"id": "dots", "type": "circle", "source": "points"})
+
+    first_cost, first = _encoded_during(backend, m.render)
+    m.add_layer({"id": "halo", "type": "circle", "source": "points", "paint": {"circle-radius": 8}})
+    second_cost, second = _encoded_during(backend, m.render)
+
+    payload = len(backend.dumps(m.sources[0]["definition"]))
+    assert first_cost > payload * 0.9
+    assert second_cost < payload / 100
+    assert '"id": "halo"' in second
+    assert second.count('"coordinates": [19.999, 39.998]') == 1
+    assert m._fragment_cache.hits >= 1
+
+
+def test_replacing_or_invalidating_data_re_encodes_source():
+    m = Map()
+    data = _collection(3)
+    m.add_source("points", data)
+    assert '"id": 2' in m.render()
+
+    data["features"][0]["properties"]["id"] = 99
+    m.invalidate("points")
+    assert '"id": 99' in m.render()
+
+    data["features"].append(_collection(1)["features"][0])
+    assert m.render().count('"id": 0}') == 1
+
+    m.sources[0]["definition"]["data"] = _collection(1)
+    assert '"id": 2' not in m.render()
+
+    m.replace_source("points", _collection(4))
+    assert '"id": 3' in m.render()
+
+
+def test_marker_cluster_updates_are_rendered():
+    m = Map()
+    cluster = MarkerCluster().add_to(m)
+    cluster.add_marker(Marker(coordinates=[1, 2]))
+    assert "[1, 2]" in m.render()
+
+    cluster.add_marker(Marker(coordinates=[3, 4]))
+
+    assert "[3, 4]" in m.render()
+
+
+def test_cached_render_matches_streamed_output_and_options():
+    m = Map(coordinate_precision=2)
+    m.add_source("points", _collection(50))
+
+    rendered = m.render()
+    assert rendered == m.render()
+    assert "".join(m.render_iter()) == rendered
+
+    m.coordinate_precision = 1
+    assert '"coordinates": [0.0, 0.1]' in m.render()
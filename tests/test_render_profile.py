@@ -0,0 +1,71 @@
+"""Tests for the per-section render profiler."""
+
+import json
+
+from maplibreum.core import Map
+
+
+def _map():
+    m = Map()
+    m.add_source(
+        "points",
+        {
+            "type": "geojson",
+            "data": {
+                "type": "FeatureCollection",
+                "features": [
+                    {
+                        "type": "Feature",
+                        "geometry": {"type": "Point", "coordinates": [i, i]},
+                        "properties": {"id": i},
+                    }
+                    for i in range(500)
+                ],
+            },
+        },
+    )
+    m.add_source("empty", {"type": "geojson", "data": {"type": "FeatureCollection", "features": []}})
+    m.add_layer({"id": "dots", "type": "circle", "source": "points"})
+    m.add_control("navigation")
+    m.add_marker(coordinates=[0, 0], popup="<b>hi</b>")
+    m.add_on_load_js("console.log('loaded');")
+    return m
+
+
+def test_profile_breaks_down_sections_and_items():
+    m = _map()
+
+    profile = m.render_profile()
+
+    assert profile.html == m.render()
+    assert profile.bytes == len(profile.html.encode("utf-8"))
+    for section in ("sources", "layers", "markers", "popups", "controls", "on_load_js"):
+        assert section in profile.sections
+    assert set(profile.sources) == {"points", "empty"}
+    assert set(profile.layers) == {"dots"}
+    assert profile.sources["points"]["bytes"] > 10 * profile.sources["empty"]["bytes"]
+    assert profile.sections["sources"]["bytes"] >= sum(
+        stats["bytes"] for stats in profile.sources.values()
+    )
+    assert max(profile.sections, key=lambda name: profile.sections[name]["bytes"]) == "sources"
+    assert profile.seconds >= profile.sections["sources"]["seconds"] > 0
+
+
+def test_profile_json_dump(tmp_path):
+    m = _map()
+    path = tmp_path / "profile.json"
+
+    profile = m.render_profile(path=path)
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data == json.loads(profile.to_json())
+    assert data["total"]["bytes"] == profile.bytes
+    assert data["layers"]["dots"]["bytes"] > 0
+    assert "total" in profile.summary()
+
+
+def test_plain_render_contains_no_profile_marks():
+    html = _map().render()
+
+    assert "\x00" not in html
+    assert "profile_mark" not in html
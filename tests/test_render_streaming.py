@@ -0,0 +1,62 @@
+"""Tests for the streaming render path."""
+
+from maplibreum.core import Map
+from maplibreum.serialization import iter_json
+
+
+def _point_collection(count):
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [i * 0.001, i * 0.002]},
+                "properties": {"id": i, "name": f"point {i}"},
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def test_render_iter_matches_render():
+    m = Map()
+    m.add_source("points", _point_collection(2_000))
+    m.add_layer({"id": "points", "type": "circle", "source": "points"})
+    m.add_marker(coordinates=[0, 0], popup="<b>hi</b>")
+
+    assert "".join(m.render_iter()) == m.render()
+
+
+def test_render_iter_encodes_large_sources_in_bounded_chunks():
+    m = Map()
+    m.add_source("points", _point_collection(20_000))
+
+    chunks = list(m.render_iter())
+    document = "".join(chunks)
+
+    assert len(chunks) > 10
+    assert max(len(chunk) for chunk in chunks) < len(document) // 4
+    assert "\x00" not in document
+
+
+def test_save_streams_same_document(tmp_path):
+    m = Map()
+    m.add_source("points", _point_collection(5_000))
+    output = tmp_path / "map.html"
+
+    m.save(output)
+
+    assert output.read_text(encoding="utf-8") == m.render()
+
+
+def test_iter_json_matches_json_dumps_for_mixed_keys():
+    import json
+
+    value = {
+        "data": _point_collection(600),
+        1: [],
+        None: {},
+        True: ["</script>", "é"],
+    }
+
+    assert "".join(iter_json(value)) == json.dumps(value)
@@ -0,0 +1,115 @@
+"""Tests for the pluggable JSON serialization backends."""
+
+import json
+
+import numpy as np
+import pytest
+
+from maplibreum import serialization
+from maplibreum.core import Map
+
+
+@pytest.fixture(autouse=True)
+def restore_default_backend():
+    previous = serialization._default_backend
+    yield
+    serialization.set_default_json_backend(previous)
+
+
+def _collection():
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [1.5, -2.25]},
+                "properties": {"name": "café", "rank": 3},
+            }
+        ],
+    }
+
+
+def test_default_backend_keeps_stdlib_output():
+    value = _collection()
+    assert serialization.dumps(value) == json.dumps(value)
+
+
+@pytest.mark.parametrize("name", serialization.available_json_backends())
+def test_backends_round_trip_and_handle_numpy(name):
+    backend = serialization.get_json_backend(name)
+    value = {
+        "coords": np.array([[1.0, 2.0], [3.5, 4.25]]),
+        "count": np.int64(7),
+        "ratio": np.float32(0.5),
+        "flag": np.bool_(True),
+        1: "integer key",
+        "année": 2024,
+    }
+
+    decoded = json.loads(backend.dumps(value))
+
+    assert decoded == {
+        "coords": [[1.0, 2.0], [3.5, 4.25]],
+        "count": 7,
+        "ratio": 0.5,
+        "flag": True,
+        "1": "integer key",
+        "année": 2024,
+    }
+    assert "".join(backend.iterencode(_collection())) == backend.dumps(_collection())
+    assert "".join(backend.iterencode(value)) == backend.dumps(value)
+
+
+def test_compact_backend_uses_compact_separators():
+    text = serialization.get_json_backend("compact").dumps(_collection())
+
+    assert ", " not in text
+    assert '":' in text and '": ' not in text
+    assert "café" in text
+
+
+def test_per_map_backend_changes_rendered_output():
+    m = Map(json_backend="compact")
+    m.add_source("points", _collection())
+
+    html = m.render()
+
+    assert '{"type":"geojson","data":{"type":"FeatureCollection"' in html
+    assert "".join(m.render_iter()) == html
+
+
+def test_global_default_backend_applies_to_maps_without_override():
+    serialization.set_default_json_backend("compact")
+    m = Map()
+    m.add_source("points", _collection())
+    stdlib_map = Map(json_backend="stdlib")
+    stdlib_map.add_source("points", _collection())
+
+    assert '"type":"geojson"' in m.render()
+    assert '"type": "geojson"' in stdlib_map.render()
+
+
+def test_auto_backend_resolves_to_available_encoder():
+    backend = serialization.get_json_backend("auto")
+
+    assert backend.name in ("orjson", "compact")
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown JSON backend"):
+        Map(json_backend="msgpack")
+
+
+def test_custom_backend_can_be_registered():
+    class UpperBackend(serialization.StdlibJSONBackend):
+        name = "upper"
+
+        def dumps(self, value):
+            return super().dumps(value).upper()
+
+    serialization.register_json_backend("upper", UpperBackend)
+    try:
+        assert serialization.dumps({"a": "b"}, backend="upper") == '{"A": "B"}'
+    finally:
+        serialization.JSON_BACKENDS.pop("upper")
+        serialization._backend_instances.pop("upper", None)
@@ -0,0 +1,75 @@
+"""Tests for writing large sources to sidecar files in Map.save()."""
+
+import json
+
+from maplibreum.core import Map
+from maplibreum.sources import GeoJSONSource
+
+
+def _collection(count):
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [i * 0.01, i * 0.02]},
+                "properties": {"id": i},
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def test_large_sources_are_written_next_to_html(tmp_path):
+    m = Map()
+    big = _collection(2_000)
+    small = _collection(2)
+    m.add_source("big points", GeoJSONSource(big, cluster=True))
+    m.add_source("small", small)
+
+    output = tmp_path / "map.html"
+    m.save(output, data_dir="data", inline_threshold=10_000)
+
+    sidecar = tmp_path / "data" / "big_points.geojson"
+    assert json.loads(sidecar.read_text(encoding="utf-8")) == big
+    assert not (tmp_path / "data" / "small.geojson").exists()
+
+    html = output.read_text(encoding="utf-8")
+    assert '"data": "data/big_points.geojson"' in html
+    assert '"cluster": true' in html
+    assert '"coordinates": [0.01, 0.02]' in html  # small source stays inline
+    assert '"coordinates": [19.99, 39.98]' not in html
+
+
+def test_sidecar_export_does_not_modify_map_sources(tmp_path):
+    m = Map()
+    m.add_source("points", _collection(500))
+
+    m.save(tmp_path / "map.html", data_dir="data", inline_threshold=0)
+
+    assert isinstance(m.sources[0]["definition"]["data"], dict)
+    assert '"data": {"type": "FeatureCollection"' in m.render()
+
+
+def test_absolute_data_dir_is_referenced_relative_to_html(tmp_path):
+    m = Map()
+    m.add_source("points", _collection(100))
+    html_dir = tmp_path / "site"
+    html_dir.mkdir()
+
+    m.save(html_dir / "map.html", data_dir=tmp_path / "assets", inline_threshold=0)
+
+    assert (tmp_path / "assets" / "points.geojson").exists()
+    html = (html_dir / "map.html").read_text(encoding="utf-8")
+    assert '"data": "../assets/points.geojson"' in html
+
+
+def test_save_without_data_dir_keeps_sources_inline(tmp_path):
+    m = Map()
+    m.add_source("points", _collection(500))
+    output = tmp_path / "map.html"
+
+    m.save(output, inline_threshold=0)
+
+    assert not (tmp_path / "data").exists()
+    assert output.read_text(encoding="utf-8") == m.render()
@@ -0,0 +1,126 @@
+"""Tests for zoom-banded geometry simplification."""
+
+import copy
+import math
+
+import numpy as np
+import pytest
+
+from maplibreum.core import Map
+from maplibreum.simplify import (
+    SimplifiedGeoJson,
+    build_lod_pyramid,
+    pixel_tolerance,
+    simplify_coords,
+    simplify_geojson,
+)
+
+
+def _wiggly_line(count=2_000):
+    return [[i * 0.001, math.sin(i * 0.05) * 0.5 + (i % 2) * 1e-7] for i in range(count)]
+
+
+def _circle(lon, lat, radius, vertices=256):
+    ring = [
+        [
+            lon + math.cos(2 * math.pi * k / vertices) * radius,
+            lat + math.sin(2 * math.pi * k / vertices) * radius,
+        ]
+        for k in range(vertices)
+    ]
+    ring.append(ring[0])
+    return ring
+
+
+def _collection():
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "LineString", "coordinates": _wiggly_line()},
+                "properties": {"kind": "line"},
+            },
+            {
+                "type": "Feature",
+                "geometry": {"type": "Polygon", "coordinates": [_circle(10, 10, 1.0)]},
+                "properties": {"kind": "big"},
+            },
+            {
+                "type": "Feature",
+                "geometry": {"type": "Polygon", "coordinates": [_circle(20, 20, 1e-4)]},
+                "properties": {"kind": "tiny"},
+            },
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [1, 2]},
+                "properties": {"kind": "point"},
+            },
+        ],
+    }
+
+
+@pytest.mark.parametrize("method", ["douglas-peucker", "visvalingam"])
+def test_simplify_coords_keeps_endpoints_and_drops_vertices(method):
+    line = _wiggly_line()
+
+    simplified = simplify_coords(line, pixel_tolerance(1, 4), method)
+
+    assert 2 <= len(simplified) < len(line) / 4
+    np.testing.assert_array_equal(simplified[0], line[0])
+    np.testing.assert_array_equal(simplified[-1], line[-1])
+
+
+def test_simplify_coords_keeps_straight_line_endpoints_only():
+    line = [[x, 0.0] for x in np.linspace(0, 10, 100)]
+
+    assert simplify_coords(line, pixel_tolerance(1, 20)).tolist() == [[0.0, 0.0], [10.0, 0.0]]
+
+
+def test_simplify_coords_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        simplify_coords([[0, 0], [1, 1], [2, 0]], 0.1, method="bogus")
+
+
+def test_simplify_geojson_drops_sub_pixel_polygons_without_mutation():
+    data = _collection()
+    original = copy.deepcopy(data)
+
+    simplified = simplify_geojson(data, pixel_tolerance(1, 4))
+
+    assert data == original
+    kinds = [feature["properties"]["kind"] for feature in simplified["features"]]
+    assert kinds == ["line", "big", "point"]
+    ring = simplified["features"][1]["geometry"]["coordinates"][0]
+    assert 4 <= len(ring) < 257
+    assert ring[0] == ring[-1]
+    assert simplified["features"][0]["properties"] is data["features"][0]["properties"]
+
+
+def test_pyramid_detail_increases_with_zoom():
+    pyramid = build_lod_pyramid(_collection(), bands=[(0, 4), (4, 10), (10, None)])
+
+    sizes = [
+        len(band["features"][0]["geometry"]["coordinates"]) for _, _, band in pyramid
+    ]
+    assert sizes[0] < sizes[1] < sizes[2] == 2_000
+    assert [(low, high) for low, high, _ in pyramid] == [(0, 4), (4, 10), (10, None)]
+
+
+def test_add_simplified_geojson_wires_zoom_banded_layers():
+    m = Map()
+    simplified = m.add_simplified_geojson(
+        _collection(),
+        layers=[{"id": "outline", "type": "line", "paint": {"line-color": "#000"}}],
+        name="shapes",
+        bands=[(0, 6), (6, None)],
+    )
+
+    assert isinstance(simplified, SimplifiedGeoJson)
+    assert [source["name"] for source in m.sources] == ["shapes_z0", "shapes_z6"]
+    assert simplified.layer_ids == ["outline_z0", "outline_z6"]
+    low, high = (layer["definition"] for layer in m.layers)
+    assert (low["source"], low["minzoom"], low["maxzoom"]) == ("shapes_z0", 0, 6)
+    assert (high["source"], high["minzoom"]) == ("shapes_z6", 6)
+    assert "maxzoom" not in high
+    assert '"id": "outline_z6"' in m.render()
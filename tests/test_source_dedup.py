@@ -0,0 +1,111 @@
+"""Tests for emitting identical source payloads only once."""
+
+import copy
+import json
+
+from maplibreum.core import FeatureGroup, Map
+
+
+def _collection(count, offset=0):
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [i + offset, i * 0.5]},
+                "properties": {"id": i},
+            }
+            for i in range(count)
+        ],
+    }
+
+
+LAST_POINT = '"coordinates": [299, 149.5]'
+
+
+def test_same_object_is_emitted_once():
+    data = _collection(300)
+    m = Map()
+    m.add_source("clustered", {"type": "geojson", "data": data, "cluster": True})
+    m.add_source("plain", {"type": "geojson", "data": data})
+
+    html = m.render()
+
+    assert html.count(LAST_POINT) == 1
+    assert "maplibreumSharedData.push(" in html
+    assert 'Object.assign({"type": "geojson", "cluster": true}, {data: maplibreumSharedData[0]})' in html
+    assert "data: maplibreumSharedData[0]" in html.split('map.addSource("plain"')[1]
+    assert "".join(m.render_iter()) == html
+
+
+def test_equal_content_is_detected_by_hash():
+    m = Map()
+    m.add_source("a", _collection(300))
+    m.add_source("b", _collection(300))
+    m.add_source("c", _collection(300, offset=1))
+
+    html = m.render()
+
+    assert html.count(LAST_POINT) == 1
+    assert html.count('"coordinates": [300, 149.5]') == 1
+    assert html.count("maplibreumSharedData.push(") == 1
+
+
+def test_unique_sources_render_unchanged_and_precision_splits_groups():
+    m = Map()
+    m.add_source("only", _collection(3))
+    assert "maplibreumSharedData" not in m.render()
+
+    data = _collection(300)
+    m = Map()
+    m.add_source("rounded", data, coordinate_precision=0)
+    m.add_source("exact", data)
+    html = m.render()
+    assert "maplibreumSharedData" not in html
+    assert html.count(LAST_POINT) == 1
+
+
+def test_feature_groups_share_payloads():
+    data = _collection(300)
+    m = Map()
+    for name in ("first", "second"):
+        group = FeatureGroup(name=name)
+        group.add_source(f"{name}_points", copy.deepcopy(data))
+        group.add_to(m)
+
+    assert m.render().count(LAST_POINT) == 1
+
+
+def test_invalidated_in_place_edits_split_and_join_groups():
+    m = Map()
+    a, b = _collection(300), _collection(300)
+    m.add_source("a", a)
+    m.add_source("b", b)
+    assert "maplibreumSharedData" in m.render()
+
+    b["features"][0]["properties"]["id"] = -1
+    m.invalidate("b")
+    html = m.render()
+    assert "maplibreumSharedData" not in html
+    assert '"id": -1' in html
+
+    a["features"][0]["properties"]["id"] = -1
+    m.invalidate("a")
+    assert m.render().count('"id": -1') == 1
+
+
+def test_identical_sidecars_share_one_file(tmp_path):
+    m = Map()
+    m.add_source("a", _collection(300))
+    m.add_source("b", _collection(300))
+    data = _collection(300, offset=5)
+    m.add_source("c", data)
+    m.add_source("d", data)
+
+    m.save(tmp_path / "map.html", data_dir="data", inline_threshold=0)
+
+    assert sorted(p.name for p in (tmp_path / "data").iterdir()) == ["a.geojson", "c.geojson"]
+    html = (tmp_path / "map.html").read_text(encoding="utf-8")
+    assert html.count('"data": "data/a.geojson"') == 2
+    assert html.count('"data": "data/c.geojson"') == 2
+    assert json.loads((tmp_path / "data" / "c.geojson").read_text()) == data
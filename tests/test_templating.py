@@ -0,0 +1,71 @@
+"""Tests for the shared template registry."""
+
+import threading
+
+from maplibreum import templating
+from maplibreum.core import Map
+from maplibreum.experimental import MapSynchronizer
+
+
+def test_maps_share_the_compiled_template():
+    first = Map()
+    second = Map()
+
+    assert first.template is second.template
+    assert first.template is templating.get_template("map_template.html")
+
+
+def test_map_env_changes_stay_with_that_map():
+    custom = Map()
+    other = Map()
+
+    custom.env.globals["profile_mark"] = lambda kind, name=None: f"<!-- {kind} -->"
+
+    assert custom.env is not templating.get_environment()
+    assert custom.template is not other.template
+    assert "<!-- runtime -->" in custom.render()
+    assert "<!-- runtime -->" not in other.render()
+    assert other.template is templating.get_template("map_template.html")
+    assert templating.get_environment().globals["profile_mark"] is not (
+        custom.env.globals["profile_mark"]
+    )
+
+
+def test_reload_templates_recompiles_on_next_lookup():
+    before = templating.get_template("map_template.html")
+    env_before = templating.get_environment()
+
+    templating.reload_templates()
+
+    after = templating.get_template("map_template.html")
+    assert after is not before
+    assert templating.get_environment() is not env_before
+    assert Map().template is after
+    assert "maplibregl.Map" in Map().render()
+
+
+def test_concurrent_lookups_compile_once():
+    templating.reload_templates()
+    results = []
+
+    def lookup():
+        results.append(templating.get_template("map_template.html"))
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(template) for template in results}) == 1
+
+
+def test_sync_maps_script_uses_shared_registry():
+    primary = Map()
+    secondary = Map()
+    MapSynchronizer([primary, secondary]).add_to(primary)
+
+    assert templating.get_template("sync_maps.js") is templating.get_template(
+        "sync_maps.js"
+    )
+    assert primary.map_id in primary._on_load_callbacks[-1]
@@ -0,0 +1,112 @@
+"""Tests for writing static vector tile pyramids."""
+
+import gzip
+import json
+
+import numpy as np
+import pytest
+
+from maplibreum.mvt import decode_tile, encode_geometry, encode_tile
+from maplibreum.tiling import TileIndex, iter_tile_pyramid, write_tile_pyramid
+
+
+def _data(count=200, seed=0):
+    rng = np.random.default_rng(seed)
+    features = []
+    for i in range(count):
+        start = rng.uniform([-20, -10], [20, 30])
+        if i % 3 == 0:
+            geometry = {"type": "Point", "coordinates": start.tolist()}
+        else:
+            line = start + np.cumsum(rng.normal(0, 0.5, (6, 2)), axis=0)
+            geometry = {"type": "LineString", "coordinates": line.tolist()}
+        features.append(
+            {
+                "type": "Feature",
+                "id": i,
+                "geometry": geometry,
+                "properties": {"index": i, "name": f"f{i % 7}", "even": i % 2 == 0},
+            }
+        )
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _tiles(directory):
+    return {
+        tuple(int(part) for part in path.relative_to(directory).with_suffix("").parts): (
+            path.read_bytes()
+        )
+        for path in directory.rglob("*.pbf")
+    }
+
+
+def test_pyramid_is_identical_with_and_without_workers(tmp_path):
+    data = _data()
+    serial = write_tile_pyramid(data, tmp_path / "serial", 0, 6, workers=1)
+    parallel = write_tile_pyramid(data, tmp_path / "parallel", 0, 6, workers=2)
+
+    assert serial == parallel
+    tiles = _tiles(tmp_path / "serial")
+    assert tiles == _tiles(tmp_path / "parallel")
+    assert serial["tile_count"] == len(tiles)
+    assert serial["total_bytes"] == sum(map(len, tiles.values()))
+    assert {z for z, _, _ in tiles} == set(range(7))
+
+
+def test_pyramid_metadata(tmp_path):
+    metadata = write_tile_pyramid(_data(), tmp_path, 2, 5, layer_name="things", workers=1)
+
+    assert json.loads((tmp_path / "metadata.json").read_text()) == metadata
+    assert metadata["minzoom"] == 2 and metadata["maxzoom"] == 5
+    assert metadata["vector_layers"][0]["id"] == "things"
+    assert metadata["vector_layers"][0]["fields"] == {
+        "index": "Number",
+        "name": "String",
+        "even": "Boolean",
+    }
+    west, south, east, north = metadata["bounds"]
+    assert west < -15 and east > 15 and south < 0 and north > 25
+    assert {z for z, _, _ in _tiles(tmp_path)} == {2, 3, 4, 5}
+
+
+def test_iter_tile_pyramid_matches_index(tmp_path):
+    data = _data(60)
+    index = TileIndex(data, max_zoom=5)
+    tiles = {(z, x, y): body for z, x, y, body in iter_tile_pyramid(data, 0, 5)}
+
+    assert tiles == _tiles(write_tile_pyramid(data, tmp_path, 0, 5, workers=1) and tmp_path)
+    for (z, x, y), body in tiles.items():
+        layer = decode_tile(body)["features"]
+        assert len(layer["features"]) == len(index.get_tile(z, x, y))
+    root = decode_tile(tiles[(0, 0, 0)])["features"]["features"]
+    assert sorted(feature["id"] for feature in root) == list(range(60))
+
+
+def test_compressed_pyramid(tmp_path):
+    metadata = write_tile_pyramid(_data(30), tmp_path, 0, 3, workers=1, compress=True)
+
+    for body in _tiles(tmp_path).values():
+        assert decode_tile(gzip.decompress(body))["features"]["features"]
+    assert metadata["tile_count"] == len(_tiles(tmp_path))
+
+
+def test_pyramid_rejects_bad_zoom_range(tmp_path):
+    with pytest.raises(ValueError):
+        write_tile_pyramid(_data(5), tmp_path, 4, 2)
+
+
+def test_encode_tile_restarts_cursor_per_feature():
+    square = [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]
+    features = [
+        {"type": 2, "geometry": [np.array([[100, 100], [200, 50]])]},
+        {"type": 3, "geometry": [[np.array(square)]]},
+        {"type": 1, "geometry": [np.array([[7, 9]]), np.array([[1, 2]])]},
+    ]
+    decoded = decode_tile(encode_tile({"batch": features}))["batch"]["features"]
+
+    assert [feature["geometry"] for feature in decoded] == [
+        [[[100, 100], [200, 50]]],
+        [[[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]],
+        [[[7, 9]], [[1, 2]]],
+    ]
+    assert encode_geometry(1, features[2]["geometry"])[0] == (2 << 3) | 1
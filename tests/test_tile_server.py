@@ -0,0 +1,139 @@
+"""Tests for the GeoJSON tile index, MVT codec and local tile server."""
+
+import gzip
+import json
+import urllib.request
+
+import numpy as np
+import pytest
+
+from maplibreum.mvt import LINESTRING, POINT, POLYGON, decode_tile, encode_tile
+from maplibreum.server import TileServer
+from maplibreum.sources import GeoJSONSource
+from maplibreum.tiling import TileIndex
+
+DATA = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "id": 7,
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [[[-10, -10], [10, -10], [10, 10], [-10, 10], [-10, -10]]],
+            },
+            "properties": {"name": "square", "area": 1.5, "rank": -3, "open": True},
+        },
+        {
+            "type": "Feature",
+            "geometry": {"type": "LineString", "coordinates": [[-100, 40], [100, -40]]},
+            "properties": {"kind": "road"},
+        },
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [5, 5]},
+            "properties": {"kind": "shop"},
+        },
+    ],
+}
+
+
+def test_codec_round_trip_and_winding():
+    tile = encode_tile(
+        {
+            "shapes": [
+                {
+                    "type": POLYGON,
+                    # Counter-clockwise exterior in tile space; must be rewound.
+                    "geometry": [[np.array([[0, 0], [0, 10], [10, 10], [10, 0], [0, 0]])]],
+                    "properties": {"nested": {"a": 1}, "skip": None, "big": 2**40},
+                    "id": 3,
+                },
+                {"type": LINESTRING, "geometry": [[[1, 1], [5, 5], [9, 1]]]},
+                {"type": POINT, "geometry": [[[2, 3], [4, 5]]]},
+            ]
+        }
+    )
+
+    layer = decode_tile(tile)["shapes"]
+    polygon, line, points = layer["features"]
+    assert layer["extent"] == 4096
+    assert polygon["id"] == 3
+    assert polygon["properties"] == {"nested": '{"a":1}', "big": 2**40}
+    assert polygon["geometry"] == [[[10, 0], [10, 10], [0, 10], [0, 0], [10, 0]]]
+    assert line["geometry"] == [[[1, 1], [5, 5], [9, 1]]]
+    assert points["geometry"] == [[[2, 3]], [[4, 5]]]
+
+
+def test_index_slices_and_drills_down():
+    index = TileIndex(GeoJSONSource(DATA), max_zoom=8, index_max_zoom=2, index_max_points=0)
+
+    root = index.get_tile(0, 0, 0)
+    assert [feature["type"] for feature in root] == [POLYGON, LINESTRING, POINT]
+    assert root[0]["properties"]["name"] == "square"
+    assert index.bounds == pytest.approx([-100, -40, 100, 40])
+
+    # Drilled below index_max_zoom on demand; the square covers this tile.
+    deep = index.get_tile(8, 130, 125)
+    assert [feature["type"] for feature in deep] == [POLYGON]
+    ring = deep[0]["geometry"][0][0]
+    assert ring.min() < 0 and ring.max() > 4096  # clipped to the buffer
+    assert index.get_tile(8, 0, 0) is None
+    assert index.get_tile(9, 0, 0) is None
+
+
+def test_point_batches_are_sliced_column_wise():
+    rng = np.random.default_rng(0)
+    coords = rng.uniform([-170, -80], [170, 80], size=(5_000, 2))
+    data = {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": list(c)},
+                "properties": {"i": i},
+            }
+            for i, c in enumerate(coords)
+        ],
+    }
+    index = TileIndex(data, max_zoom=6, index_max_points=100)
+
+    inside = set()
+    for x in range(4):
+        for y in range(4):
+            for feature in index.get_tile(2, x, y) or []:
+                point = feature["geometry"][0][0]
+                if 0 <= point[0] < 4096 and 0 <= point[1] < 4096:
+                    inside.add(feature["properties"]["i"])
+    assert len(inside) == 5_000
+
+
+def test_server_serves_gzipped_tiles_and_tilejson():
+    with TileServer(DATA, layer_name="things", max_zoom=6, cache_size=2) as server:
+        request = urllib.request.Request(
+            f"{server.url}/0/0/0.pbf", headers={"Accept-Encoding": "gzip"}
+        )
+        with urllib.request.urlopen(request) as response:
+            assert response.headers["Content-Encoding"] == "gzip"
+            assert response.headers["Access-Control-Allow-Origin"] == "*"
+            layers = decode_tile(gzip.decompress(response.read()))
+        assert len(layers["things"]["features"]) == 3
+
+        with urllib.request.urlopen(f"{server.url}/0/0/0.pbf") as response:
+            assert "Content-Encoding" not in response.headers
+            assert decode_tile(response.read()) == layers
+        assert server.hits == 1
+
+        with urllib.request.urlopen(f"{server.url}/6/0/0.pbf") as response:
+            assert response.status == 204
+        with urllib.request.urlopen(f"{server.url}/tiles.json") as response:
+            layers = json.load(response)["vector_layers"]
+            assert layers == [{"id": "things", "fields": TileIndex(DATA).fields}]
+            assert layers[0]["fields"]["open"] == "Boolean"
+
+        source = server.source(attribution="local").to_dict()
+        assert source["tiles"] == [f"{server.url}/{{z}}/{{x}}/{{y}}.pbf"]
+        assert source["maxzoom"] == 6
+        assert source["attribution"] == "local"
+    with pytest.raises(RuntimeError):
+        server.url